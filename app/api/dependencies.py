@@ -1,7 +1,9 @@
+import asyncio
 from fastapi import HTTPException, status, Depends
 from typing import AsyncGenerator
 
 from app.core.database.db_interface import DatabaseInterface
+from app.core.database.async_db_interface import AsyncDatabaseInterface
 import app.core.secret_handler as secrets
 from app.core.services.process_reddit_posts import RedditPostProcessor
 from app.core.services.process_asset import AssetProcessor
@@ -19,7 +21,10 @@ app_config = get_config()
 async def get_db() -> AsyncGenerator[DatabaseInterface, None]:
     db = None
     try:
-        db = DatabaseInterface(
+        # Connecting may block (pool warm up, SSH tunnel), so keep it off
+        # the event loop
+        db = await asyncio.to_thread(
+            DatabaseInterface,
             host=secret_config.get("MYSQL_HOST"),
             user=secret_config.get("MYSQL_USERNAME"),
             password=secret_config.get("MYSQL_KEY"),
@@ -27,7 +32,9 @@ async def get_db() -> AsyncGenerator[DatabaseInterface, None]:
             is_ssh_tunnel=True if secret_config.get("ENVIRONMENT")
             == "local" else False,
         )
-        yield db
+        # Repeated reads within one request are served from the cache
+        with db.request_scope():
+            yield db
     except Exception as e:
         logger.error(
             f"Failed to initialize or connect DatabaseInterface: {e}",
@@ -39,6 +46,34 @@ async def get_db() -> AsyncGenerator[DatabaseInterface, None]:
         )
 
 
+async def get_async_db() -> AsyncGenerator[AsyncDatabaseInterface, None]:
+    """
+    Dependency to provide an AsyncDatabaseInterface. Its queries are awaited
+    on the shared aiomysql pool, so concurrent requests overlap their DB
+    waits instead of blocking the event loop.
+    """
+    try:
+        db = await AsyncDatabaseInterface.create(
+            host=secret_config.get("MYSQL_HOST"),
+            user=secret_config.get("MYSQL_USERNAME"),
+            password=secret_config.get("MYSQL_KEY"),
+            database=secret_config.get("MYSQL_DBNAME"),
+            is_ssh_tunnel=True if secret_config.get("ENVIRONMENT")
+            == "local" else False,
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to initialize or connect AsyncDatabaseInterface: {e}",
+            exc_info=True
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database service not available."
+        )
+    with db.request_scope():
+        yield db
+
+
 async def get_reddit_post_processor(
     db: DatabaseInterface = Depends(get_db)
 ) -> RedditPostProcessor:
@@ -1,14 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.endpoints import (
     url2db_ep,
     reddit_url2portfolio_ep
 )
+from app.core.database.async_db_interface import close_async_pools
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_async_pools()
+
 
 app = FastAPI(
     title="btc-instead-api",
     description="API to trigger core processing pipelines for btc instea.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
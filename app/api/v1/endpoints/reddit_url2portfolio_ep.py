@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException, status, Body, Depends
 
 from app.core.utils.utils import set_logger
@@ -6,12 +8,14 @@ from app.core.pipelines.api_pipelines import (
     redditpost_url_evaluation_pipeline
 )
 from app.api.dependencies import (
+    get_db,
     get_reddit_post_processor,
     get_portfolio_processor,
     get_asset_processor,
     get_crypto_currency_fetcher,
     get_reddit_fetcher
 )
+from app.core.database.db_interface import DatabaseInterface
 from app.core.services.process_reddit_posts import RedditPostProcessor
 from app.core.services.process_portfolio import PortfolioProcessor
 from app.core.services.process_asset import AssetProcessor
@@ -32,6 +36,7 @@ router = APIRouter()
 )
 async def run_reddit_url_evaluation_pipeline(
     payload: PipelineRequest = Body(...),
+    db: DatabaseInterface = Depends(get_db),
     rp_processor: RedditPostProcessor = Depends(get_reddit_post_processor),
     portfolio_processor: PortfolioProcessor = Depends(get_portfolio_processor),
     asset_processor: AssetProcessor = Depends(get_asset_processor),
@@ -51,9 +56,12 @@ async def run_reddit_url_evaluation_pipeline(
     try:
         logger.info(f"API: Starting Reddit URL evaluation for: {payload.url}")
         
-        # Execute the complete evaluation pipeline
-        pipeline_result = await redditpost_url_evaluation_pipeline(
+        # Execute the complete evaluation pipeline. It blocks throughout,
+        # so it runs in a worker thread on the interface of the processors
+        pipeline_result = await asyncio.to_thread(
+            redditpost_url_evaluation_pipeline,
             url=str(payload.url),
+            db_interface=db,
             rp_processor=rp_processor,
             portfolio_processor=portfolio_processor,
             asset_processor=asset_processor,
@@ -6,11 +6,11 @@ from app.core.pipelines.api_pipelines import (
     redditpost_url2db_pipeline
 )
 from app.api.dependencies import (
-    get_db,
+    get_async_db,
     get_reddit_fetcher
  )
-from app.core.database.db_interface import \
-    DatabaseInterface
+from app.core.database.async_db_interface import \
+    AsyncDatabaseInterface
 from app.core.fetcher.reddit import RedditFetcher
 
 logger = set_logger(name=__name__)
@@ -26,7 +26,7 @@ router = APIRouter()
 )
 async def run_redditpost_url2db_pipeline(
     payload: PipelineRequest = Body(...),
-    db: DatabaseInterface = Depends(get_db),
+    db: AsyncDatabaseInterface = Depends(get_async_db),
     fetcher: RedditFetcher = Depends(get_reddit_fetcher)
 ):
     """
@@ -18,6 +18,150 @@ MYSQL_TABLES = {
         }
     }
 
+# backend: "mysql" or "sqlite" (embedded, for single-node runs and
+# benchmarks). sqlite_path is only used by the sqlite backend.
+DATABASE = {
+    "backend": "mysql",
+    "sqlite_path": "data/btc_instead.sqlite3"
+}
+
+MYSQL_POOL = {
+    "min_size": 1,
+    "max_size": 5,
+    "idle_timeout": 300,
+    "pre_ping": True,
+    "ping_interval": 30,
+    "acquire_timeout": 10
+}
+
+SSH_TUNNEL = {
+    "keepalive_interval": 30
+}
+
+# Bump schema_version whenever the table layout changes so cached
+# column metadata (in memory and on disk) is reloaded.
+SCHEMA_CACHE = {
+    "schema_version": 1,
+    "use_snapshot": False,
+    "snapshot_dir": "data/cache"
+}
+
+# Read-through cache for whitelisted SELECTs (execute_query cache_table).
+# ttl: seconds per table key; tables without a TTL are only cached for the
+# duration of one request (DatabaseInterface.request_scope()).
+QUERY_CACHE = {
+    "enabled": True,
+    "max_entries": 1024,
+    "ttl": {
+        "reddit_posts": 30,
+        "portfolios": 30,
+        "purchases": 30,
+        "crypto_currency_prices": 300,
+        "crypto_assets": 300
+    }
+}
+
+ASSET_REGISTRY = {
+    "refresh_interval": 300
+}
+
+# Snapshot of CoinMarketCap /listings/latest shared by all CMC lookups.
+# ttl: seconds until the snapshot is downloaded again. error_ttl: seconds
+# a failed download is not retried, the lookups get the stale (or an empty)
+# snapshot meanwhile.
+CMC_LISTINGS = {
+    "ttl": 300,
+    "error_ttl": 60,
+    "limit": 5000
+}
+
+# Token buckets per external provider. rate: requests per second, burst:
+# requests allowed at once, default_retry_after: back-off in seconds after
+# a 429 without Retry-After. lock_dir: directory of the lock files that
+# share the buckets between processes (None: per process only).
+RATE_LIMITS = {
+    "lock_dir": None,
+    "providers": {
+        "coin_gecko": {"rate": 25 / 60, "burst": 5},
+        "coin_market_cap": {"rate": 25 / 60, "burst": 5},
+        "frankfurter": {"rate": 5, "burst": 10},
+        "reddit": {"rate": 90 / 60, "burst": 10},
+        "gemini": {"rate": 14 / 60, "burst": 2}
+    }
+}
+
+# Shared HTTP sessions (app.core.utils.http_client). timeout: (connect,
+# read) seconds; retries: extra attempts on connection errors, timeouts and
+# retry_statuses, with jittered exponential backoff (backoff_factor *
+# 2 ** attempt, capped at backoff_max seconds).
+HTTP_CLIENT = {
+    "timeout": (5, 30),
+    "retries": 3,
+    "retry_statuses": [429, 500, 502, 503, 504],
+    "backoff_factor": 0.5,
+    "backoff_max": 30,
+    "pool_maxsize": 10
+}
+
+# Hedged current-price requests: the secondary provider is asked once the
+# primary has not answered after hedge_delay seconds (0: race both right
+# away); the first valid price wins. With adaptive_order the provider that
+# won most recently (EWMA with ewma_alpha) becomes the primary.
+HEDGED_REQUESTS = {
+    "enabled": True,
+    "hedge_delay": 1.0,
+    "adaptive_order": True,
+    "ewma_alpha": 0.2
+}
+
+# Fuzzy resolver of LLM-extracted coin names/symbols to provider coin IDs.
+# A coin with the extracted symbol beats any match by name alone; among
+# coins sharing a symbol a name with a trigram similarity of at least
+# min_name_similarity (0-1) wins, else the biggest market cap. Name-only
+# matches need min_name_similarity and min_confidence (0-1). With
+# use_listings_rank the market cap rank is the CMC listings order,
+# otherwise the CMC ID.
+# max_posting: name trigrams in more names don't select candidates.
+COIN_RESOLVER = {
+    "min_confidence": 0.4,
+    "min_name_similarity": 0.8,
+    "cache_size": 4096,
+    "max_posting": 250,
+    "use_listings_rank": True
+}
+
+# Coin mappings refreshed by refresh_coin_mapping_pipeline: versioned
+# SQLite artifacts in dir, the current one named by dir/CURRENT (without
+# one the CSV files in data/ are used). Running processes check for a new
+# version every check_interval seconds. A refresh delisting more than
+# max_delisted_share of a provider's coins is rejected for that provider.
+MAPPING_ARTIFACT = {
+    "dir": "data/coin_mapping",
+    "keep_versions": 3,
+    "check_interval": 60,
+    "max_delisted_share": 0.2
+}
+
+# On-disk cache of API responses that don't change: prices and exchange
+# rates of past dates are kept permanently, those of today for today_ttl
+# seconds. Least recently used entries are evicted above max_bytes.
+RESPONSE_CACHE = {
+    "enabled": True,
+    "path": "data/cache/responses.sqlite3",
+    "max_bytes": 256 * 1024 * 1024,
+    "today_ttl": 300
+}
+
+# Async price fetcher: max. requests in flight per provider and request
+# timeout in seconds.
+ASYNC_FETCHER = {
+    "concurrency": {
+        "coin_gecko": 5,
+        "coin_market_cap": 5
+    },
+    "timeout": 30
+}
+
 DEBUG = {
     'is_debug': False,
     'print_debug': False
@@ -36,6 +180,20 @@ LOGGING = {
 CONFIG = {
     "mysql": MYSQL_TABLES,
     "mysql_column_format": MYSQL_COLUMN_FORMAT,
+    "database": DATABASE,
+    "mysql_pool": MYSQL_POOL,
+    "ssh_tunnel": SSH_TUNNEL,
+    "schema_cache": SCHEMA_CACHE,
+    "query_cache": QUERY_CACHE,
+    "asset_registry": ASSET_REGISTRY,
+    "cmc_listings": CMC_LISTINGS,
+    "rate_limits": RATE_LIMITS,
+    "async_fetcher": ASYNC_FETCHER,
+    "http_client": HTTP_CLIENT,
+    "hedged_requests": HEDGED_REQUESTS,
+    "response_cache": RESPONSE_CACHE,
+    "coin_resolver": COIN_RESOLVER,
+    "mapping_artifact": MAPPING_ARTIFACT,
     "reddit_fetcher": REDDIT_FETCHER_CONFIG,
     "logging": LOGGING,
     "debug": DEBUG
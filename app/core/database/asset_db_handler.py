@@ -1,7 +1,10 @@
+import pymysql
+
 from app.core.utils.utils import set_logger
 from app.core.app_config import get_config
 from app.core.database.queries import (
-    INSERT_CRYPTO_CURRENCY_PRICE_TEMPLATE
+    INSERT_CRYPTO_CURRENCY_PRICE_TEMPLATE,
+    GET_CRYPTO_CURRENCY_PRICES_BY_KEYS_TEMPLATE
 )
 
 app_config = get_config()
@@ -51,7 +54,8 @@ def cc_price_is_tracked_in_db(
     """
     result = db_interface.execute_query(
         sql_query,
-        (name.lower(), abbreviation.lower(), iso_week, iso_year)
+        (name.lower(), abbreviation.lower(), iso_week, iso_year),
+        cache_table=PRICE_TABLE_NAME_KEY
     )
     return len(result) > 0
 
@@ -123,14 +127,33 @@ def get_tracked_crypto_currency_in_db(
     sql_query += ";"
 
     result = db_interface.execute_query(sql_query)
-    return [
-        {
-            "name": row[1],
-            "abbreviation": row[2],
-            "coin_market_cap": row[3],
-            "coin_gecko": row[4]
-        } for row in result
-    ]
+    return [_tracked_crypto_currency_from_row(row) for row in result]
+
+
+def iter_tracked_crypto_currency_in_db(
+        db_interface,
+        chunk_size: int = 1000
+):
+    """
+    Streaming variant of get_tracked_crypto_currency_in_db. Yields lists of
+    up to chunk_size tracked crypto currency dictionaries.
+    """
+    sql_query = f"""
+        SELECT * FROM {
+            db_interface.tables[COIN_ASSET_TABLE_NAME_KEY].name
+            }
+    """
+    for rows in db_interface.stream_query(sql_query, chunk_size=chunk_size):
+        yield [_tracked_crypto_currency_from_row(row) for row in rows]
+
+
+def _tracked_crypto_currency_from_row(row: tuple) -> dict:
+    return {
+        "name": row[1],
+        "abbreviation": row[2],
+        "coin_market_cap": row[3],
+        "coin_gecko": row[4]
+    }
 
 
 def get_coin_ids_for_providers(
@@ -161,6 +184,37 @@ def get_coin_ids_for_providers(
     }
 
 
+def get_tracked_crypto_currency_from_db(
+        db_interface,
+        name: str,
+        abbreviation: str
+) -> dict | None:
+    """
+    Get a single tracked crypto currency (table:CCAssets) in the same format
+    as get_tracked_crypto_currency_in_db, or None if it is not tracked.
+    """
+    sql_query = f"""
+        SELECT name, abbreviation, cmc_id, coin_gecko_id FROM `{
+            db_interface.tables[COIN_ASSET_TABLE_NAME_KEY].name
+            }`
+        WHERE abbreviation = %s AND name = %s
+        LIMIT 1
+    """
+    result = db_interface.execute_query(
+        sql_query,
+        (abbreviation, name)
+    )
+    if not result:
+        return None
+    row = result[0]
+    return {
+        "name": row[0],
+        "abbreviation": row[1],
+        "coin_market_cap": row[2],
+        "coin_gecko": row[3]
+    }
+
+
 def insert_crypto_currency_price_to_db(
         db_interface,
         name: str,
@@ -207,9 +261,100 @@ def insert_crypto_currency_price_to_db(
         logger.error(
             f"""Error inserting {abbreviation} price to DB: {e}"""
         )
+        # Let an open transaction roll back instead of committing the rest
+        if db_interface.in_transaction:
+            raise
     return processed_finished
 
 
+def _serialize_crypto_currency_price(price_row: dict) -> tuple:
+    """
+    Validates one price row and returns it in the column order of
+    INSERT_CRYPTO_CURRENCY_PRICE_TEMPLATE. Raises ValueError if it is
+    incomplete.
+    """
+    missing = [
+        key for key in
+        ("name", "abbreviation", "price", "date", "iso_week", "iso_year")
+        if price_row.get(key) is None
+    ]
+    if missing:
+        raise ValueError(f"Missing values: {missing}")
+    return (
+        price_row["name"].lower(),
+        price_row["abbreviation"].lower(),
+        float(price_row["price"]),
+        price_row.get("currency", "usd").lower(),
+        price_row["date"],
+        int(price_row["iso_week"]),
+        int(price_row["iso_year"])
+    )
+
+
+def insert_crypto_currency_prices_to_db(
+        db_interface,
+        price_rows: list[dict],
+        chunk_size: int = 500
+) -> dict:
+    """
+    Upsert many crypto currency prices at once with a multi-row
+    INSERT ... ON DUPLICATE KEY UPDATE in a single transaction.
+    If the batch is rejected, the rows are retried one by one (each behind
+    a savepoint, still in one transaction) so a single bad row does not
+    drop the others.
+    Input:
+        db_interface: Database interface to execute queries.
+        price_rows: Dictionaries with name, abbreviation, price, date,
+            iso_week, iso_year and optionally currency (default "usd").
+        chunk_size: Number of rows per statement.
+    Output:
+        {"uploaded": [price_row, ...],
+         "failed": [{"row": price_row, "error": str}, ...]}
+    """
+    report = {"uploaded": [], "failed": []}
+    valid_rows = []
+    for price_row in price_rows:
+        try:
+            valid_rows.append(
+                (price_row, _serialize_crypto_currency_price(price_row)))
+        except (ValueError, TypeError, AttributeError) as e:
+            report["failed"].append({"row": price_row, "error": str(e)})
+    if not valid_rows:
+        return report
+
+    final_query = INSERT_CRYPTO_CURRENCY_PRICE_TEMPLATE.format(
+        table_name=db_interface.tables[PRICE_TABLE_NAME_KEY].name)
+    try:
+        with db_interface.transaction():
+            db_interface.execute_many(
+                final_query,
+                [values for _, values in valid_rows],
+                chunk_size=chunk_size
+            )
+        report["uploaded"] = [price_row for price_row, _ in valid_rows]
+    except pymysql.Error as e:
+        logger.warning(
+            f"Bulk price upsert failed ({e}). Retrying row by row.")
+        with db_interface.transaction():
+            for price_row, values in valid_rows:
+                db_interface.execute_query("SAVEPOINT price_row")
+                try:
+                    db_interface.execute_query(final_query, values)
+                    db_interface.execute_query(
+                        "RELEASE SAVEPOINT price_row")
+                    report["uploaded"].append(price_row)
+                except pymysql.Error as e_row:
+                    db_interface.execute_query(
+                        "ROLLBACK TO SAVEPOINT price_row")
+                    report["failed"].append(
+                        {"row": price_row, "error": str(e_row)})
+    logger.info(
+        f"""Upserted {len(report['uploaded'])} prices into
+        {db_interface.tables[PRICE_TABLE_NAME_KEY].name},
+        {len(report['failed'])} failed (PyMySQL).""")
+    return report
+
+
 def get_asset_price_from_db_by_iso_week_year(
         db_interface,
         name: str,
@@ -231,13 +376,68 @@ def get_asset_price_from_db_by_iso_week_year(
     result = db_interface.execute_query(
         sql_query,
         (name.lower(), abbreviation.lower(), iso_week, iso_year),
-        dictionary_cursor=dictionary_cursor
+        dictionary_cursor=dictionary_cursor,
+        cache_table=PRICE_TABLE_NAME_KEY
     )
     if not result:
         return None
     return result[0]  # Return the first matching record
 
 
+def get_price_key(
+        name: str,
+        abbreviation: str,
+        iso_week: int,
+        iso_year: int
+) -> tuple:
+    """
+    Normalized (name, abbreviation, iso_week, iso_year) key of a CCPrices
+    row, matching how insert_crypto_currency_price_to_db stores it.
+    """
+    return (name.lower(), abbreviation.lower(), int(iso_week), int(iso_year))
+
+
+def get_asset_prices_from_db_by_keys(
+        db_interface,
+        price_keys: list[tuple],
+        chunk_size: int = 500
+) -> dict[tuple, dict]:
+    """
+    Get the prices of many assets with one query per chunk of keys.
+    Input:
+        db_interface: Database interface to execute queries.
+        price_keys: List of (name, abbreviation, iso_week, iso_year) tuples.
+    Output:
+        A dictionary mapping the normalized key (see get_price_key) to the
+        matching CCPrices row (as dict). Keys without a price are missing.
+    """
+    normalized_keys = list(dict.fromkeys(
+        get_price_key(*price_key) for price_key in price_keys
+    ))
+    prices = {}
+    for start in range(0, len(normalized_keys), chunk_size):
+        chunk = normalized_keys[start:start + chunk_size]
+        sql_query = GET_CRYPTO_CURRENCY_PRICES_BY_KEYS_TEMPLATE.format(
+            table_name=db_interface.tables[PRICE_TABLE_NAME_KEY].name,
+            placeholders=", ".join(["(%s, %s, %s, %s)"] * len(chunk))
+        )
+        params = [value for price_key in chunk for value in price_key]
+        result = db_interface.execute_query(
+            sql_query,
+            params,
+            dictionary_cursor=True,
+            cache_table=PRICE_TABLE_NAME_KEY
+        )
+        for row in result:
+            prices[get_price_key(
+                row["name"],
+                row["abbreviation"],
+                row["iso_week"],
+                row["iso_year"]
+            )] = row
+    return prices
+
+
 def get_single_asset_from_db(
         name: str,
         db_interface: object,
@@ -0,0 +1,115 @@
+import threading
+import time
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+from app.core.database.asset_db_handler import (
+    get_tracked_crypto_currency_in_db,
+    get_tracked_crypto_currency_from_db
+)
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+PROVIDERS = ["coin_gecko", "coin_market_cap"]
+
+
+class AssetRegistry:
+    """
+    In-memory copy of the CCAssets table, indexed by (name, abbreviation)
+    and by provider coin ID. The table is loaded once and reloaded every
+    refresh_interval seconds to pick up assets tracked by other processes.
+    Lookups that miss fall back to a single-row query, so an asset tracked
+    elsewhere since the last refresh is never tracked twice.
+    """
+    def __init__(self, refresh_interval: float = 300):
+        self.refresh_interval = refresh_interval
+        self._by_name_abbreviation: dict[tuple, dict] = {}
+        self._by_provider_id: dict[str, dict[str, dict]] = {
+            provider: {} for provider in PROVIDERS
+        }
+        self._loaded_at = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(name: str, abbreviation: str) -> tuple:
+        # MySQL compares CCAssets.name/abbreviation case-insensitively
+        return (name.lower(), abbreviation.lower())
+
+    def refresh(self, db_interface):
+        """Reloads the whole CCAssets table."""
+        assets = get_tracked_crypto_currency_in_db(db_interface)
+        with self._lock:
+            self._by_name_abbreviation = {}
+            self._by_provider_id = {provider: {} for provider in PROVIDERS}
+            for asset in assets:
+                self._index(asset)
+            self._loaded_at = time.monotonic()
+        logger.info(f"Loaded {len(assets)} tracked assets into registry.")
+
+    def _ensure_fresh(self, db_interface):
+        with self._lock:
+            is_fresh = self._loaded_at is not None and \
+                time.monotonic() - self._loaded_at < self.refresh_interval
+        if not is_fresh:
+            self.refresh(db_interface)
+
+    def _index(self, asset: dict):
+        self._by_name_abbreviation[
+            self._key(asset["name"], asset["abbreviation"])] = asset
+        for provider in PROVIDERS:
+            if asset.get(provider):
+                self._by_provider_id[provider][str(asset[provider])] = asset
+
+    def get(self, db_interface, name: str, abbreviation: str) -> dict | None:
+        """
+        Returns the tracked asset as
+        {"name", "abbreviation", "coin_market_cap", "coin_gecko"} or None.
+        """
+        self._ensure_fresh(db_interface)
+        with self._lock:
+            asset = self._by_name_abbreviation.get(
+                self._key(name, abbreviation))
+        if asset is not None:
+            return asset
+        asset = get_tracked_crypto_currency_from_db(
+            db_interface, name=name, abbreviation=abbreviation)
+        if asset is not None:
+            with self._lock:
+                self._index(asset)
+        return asset
+
+    def get_by_provider_id(
+        self,
+        db_interface,
+        provider: str,
+        coin_id: str
+    ) -> dict | None:
+        """Returns the tracked asset with the given provider coin ID."""
+        self._ensure_fresh(db_interface)
+        with self._lock:
+            return self._by_provider_id[provider].get(str(coin_id))
+
+    def register(self, name: str, abbreviation: str, provider_coin_id: dict):
+        """Adds a newly tracked asset without reloading the table."""
+        with self._lock:
+            self._index({
+                "name": name,
+                "abbreviation": abbreviation,
+                "coin_market_cap": provider_coin_id.get("coin_market_cap"),
+                "coin_gecko": provider_coin_id.get("coin_gecko")
+            })
+
+
+_registries: dict[str, AssetRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_asset_registry(db_interface) -> AssetRegistry:
+    """Returns the process-wide registry for the interface's database."""
+    with _registries_lock:
+        registry = _registries.get(db_interface.database_name)
+        if registry is None:
+            registry = AssetRegistry(**app_config.get("asset_registry", {}))
+            _registries[db_interface.database_name] = registry
+        return registry
@@ -0,0 +1,381 @@
+import asyncio
+import contextvars
+import os
+from contextlib import asynccontextmanager, contextmanager
+
+import aiomysql
+import pymysql
+
+from app.core.app_config import get_config
+from app.core.utils.utils import set_logger
+from .connection_handler import get_connection_args
+from .connection_pool import get_pool_key
+from .db_interface import build_db_config, build_tables
+from .schema_cache import schema_cache
+from .query_cache import (
+    query_cache,
+    make_cache_key,
+    get_written_table
+)
+from .ssh_tunnel import get_tunnel_manager
+
+logger = set_logger(name=__name__)
+app_config = get_config()
+
+# {pool key: (event loop, aiomysql pool, (host, port))}. aiomysql pools are
+# bound to the loop they were created on, so a pool is only reused on the
+# same loop.
+_async_pools = {}
+# Tasks closing replaced pools, referenced until they are done
+_closing_pools = set()
+
+
+def _get_reusable_pool(key, loop, address) -> aiomysql.Pool | None:
+    entry = _async_pools.get(key)
+    if entry is not None and entry[0] is loop and not entry[1].closed \
+            and entry[2] == address:
+        return entry[1]
+    return None
+
+
+async def get_async_pool(db_config: dict, **pool_settings) -> aiomysql.Pool:
+    """
+    Returns the process-wide aiomysql pool for db_config on the running
+    event loop, creating it on first use. Pool sizes default to
+    app_config["mysql_pool"]; idle_timeout maps to aiomysql's pool_recycle.
+    A restarted SSH tunnel listens on a new local port, so the pool of the
+    previous address is closed and replaced.
+    """
+    key = get_pool_key(db_config)
+    loop = asyncio.get_running_loop()
+    if db_config.get('is_ssh_tunnel', False):
+        # Starting the tunnel blocks, so keep it off the event loop
+        host, port = await asyncio.to_thread(
+            get_tunnel_manager().get_local_address, db_config)
+        connection_args = get_connection_args(db_config, host=host, port=port)
+    else:
+        connection_args = get_connection_args(db_config)
+    address = (connection_args['host'], connection_args['port'])
+    pool = _get_reusable_pool(key, loop, address)
+    if pool is not None:
+        return pool
+
+    settings = dict(app_config.get('mysql_pool', {}))
+    settings.update(pool_settings)
+    pool = await aiomysql.create_pool(
+        minsize=settings.get('min_size', 1),
+        maxsize=settings.get('max_size', 5),
+        pool_recycle=settings.get('idle_timeout', -1),
+        host=connection_args['host'],
+        port=connection_args['port'],
+        user=connection_args['user'],
+        password=connection_args['password'],
+        db=connection_args['database'],
+        charset=connection_args['charset'],
+        connect_timeout=connection_args['connect_timeout'],
+        autocommit=False
+    )
+    # Another task may have created a pool while this one was connecting
+    existing = _get_reusable_pool(key, loop, address)
+    if existing is not None:
+        pool.close()
+        await pool.wait_closed()
+        return existing
+    stale = _async_pools.get(key)
+    _async_pools[key] = (loop, pool, address)
+    if stale is not None and stale[0] is loop and not stale[1].closed:
+        logger.warning(
+            f"Database address of {db_config.get('database')} changed from "
+            f"{stale[2]} to {address}. Closing the previous async pool.")
+        # Free connections close now, acquired ones on release
+        stale[1].close()
+        task = loop.create_task(stale[1].wait_closed())
+        _closing_pools.add(task)
+        task.add_done_callback(_closing_pools.discard)
+    logger.info(
+        f"Created async connection pool for {db_config.get('database')} "
+        "(aiomysql).")
+    return pool
+
+
+async def close_async_pools():
+    """Closes the pools created on the running event loop."""
+    loop = asyncio.get_running_loop()
+    for key, (pool_loop, pool, _) in list(_async_pools.items()):
+        if pool_loop is not loop:
+            continue
+        _async_pools.pop(key, None)
+        pool.close()
+        await pool.wait_closed()
+
+
+class AsyncDatabaseInterface:
+    """
+    asyncio counterpart of DatabaseInterface on top of aiomysql. Exposes the
+    same surface (tables, execute_query, execute_many, transaction,
+    call_on_commit) as coroutines, so the FastAPI endpoints can await their
+    queries instead of blocking the event loop. Create instances with
+    `await AsyncDatabaseInterface.create(...)`.
+    """
+    def __init__(
+        self,
+        host: str = os.getenv("MYSQL_HOST"),
+        port: int = os.getenv("MYSQL_PORT"),
+        user: str = os.getenv("MYSQL_USERNAME"),
+        password: str = os.getenv("MYSQL_KEY"),
+        database: str = os.getenv("MYSQL_DBNAME"),
+        is_ssh_tunnel: bool = False,
+        connection_timeout: int = 10,
+        pool_config: dict = None
+    ):
+        self.db_config = build_db_config(
+            host=host,
+            port=port,
+            user=user,
+            password=password,
+            database=database,
+            is_ssh_tunnel=is_ssh_tunnel,
+            connection_timeout=connection_timeout
+        )
+        self.database_name = database
+        self.pool_config = pool_config or {}
+        self.pool = None
+        # (connection, on_commit callbacks) pinned by transaction(), per task
+        self._transaction = contextvars.ContextVar(
+            f"transaction_{id(self)}", default=None)
+        # Query results cached for the current request, see request_scope()
+        self._request_cache = None
+        self.tables = build_tables()
+
+    @classmethod
+    async def create(cls, **kwargs) -> "AsyncDatabaseInterface":
+        db_interface = cls(**kwargs)
+        await db_interface.connect()
+        return db_interface
+
+    async def connect(self):
+        self.pool = await get_async_pool(self.db_config, **self.pool_config)
+        await self.prepare_tables()
+
+    async def prepare_tables(self, refresh: bool = False):
+        """
+        Loads the column metadata of all tables, served from the same
+        process-wide schema cache as the sync interface.
+        """
+        table_names = [table.name for table in self.tables.values()]
+        columns_by_table = None
+        if not refresh:
+            columns_by_table = schema_cache.get(
+                self.database_name, table_names)
+        if columns_by_table is None:
+            columns_by_table = \
+                await self.get_column_names_and_datatypes_for_tables(
+                    table_names)
+            if columns_by_table:
+                schema_cache.put(self.database_name, columns_by_table)
+        for key, table in self.tables.items():
+            column_info = columns_by_table.get(table.name) \
+                if columns_by_table else None
+            if column_info:
+                self.tables[key].set_columns(column_info)
+            else:
+                logger.error(f"""Could not prepare table
+                {self.tables[key].name}
+                due to missing column info.""")
+
+    @contextmanager
+    def request_scope(self):
+        """Same as DatabaseInterface.request_scope()."""
+        self._request_cache = {}
+        try:
+            yield self
+        finally:
+            self._request_cache = None
+
+    @property
+    def in_transaction(self) -> bool:
+        """True if the current task is inside transaction()."""
+        return self._transaction.get() is not None
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Unit of work: pins one pooled connection to the current task.
+        Commits once on success, rolls back on error and joins an outer
+        transaction when nested. Same semantics as
+        DatabaseInterface.transaction().
+        """
+        if self.in_transaction:
+            yield self
+            return
+        if self.pool is None or self.pool.closed:
+            await self.connect()
+        connection = await self.pool.acquire()
+        token = self._transaction.set((connection, []))
+        try:
+            yield self
+            await connection.commit()
+            logger.debug("Committed transaction (aiomysql).")
+        except BaseException as e:
+            logger.warning(
+                f"Rolling back transaction due to error: {e} (aiomysql)")
+            if isinstance(e, (pymysql.OperationalError,
+                              pymysql.InterfaceError)):
+                # Closed connections are dropped by the pool on release
+                connection.close()
+            else:
+                try:
+                    await connection.rollback()
+                except pymysql.Error as e_rb:
+                    logger.error(
+                        f"Error during rollback (aiomysql): {e_rb}")
+                    connection.close()
+            raise
+        finally:
+            on_commit = self._transaction.get()[1]
+            self._transaction.reset(token)
+            self.pool.release(connection)
+        for callback in on_commit:
+            callback()
+
+    def call_on_commit(self, callback):
+        """
+        Runs callback once the current transaction has committed, or right
+        away when no transaction is open.
+        """
+        transaction = self._transaction.get()
+        if transaction is not None:
+            transaction[1].append(callback)
+        else:
+            callback()
+
+    @asynccontextmanager
+    async def _cursor(self, dictionary_cursor: bool = False):
+        """
+        Yields a cursor on the pinned transaction connection if there is one,
+        otherwise on a pooled connection that is committed on exit.
+        """
+        cursor_type = aiomysql.DictCursor if \
+            dictionary_cursor else aiomysql.Cursor
+        transaction = self._transaction.get()
+        if transaction is not None:
+            async with transaction[0].cursor(cursor_type) as cursor:
+                yield cursor
+            return
+        if self.pool is None or self.pool.closed:
+            await self.connect()
+        async with self.pool.acquire() as connection:
+            try:
+                async with connection.cursor(cursor_type) as cursor:
+                    yield cursor
+                await connection.commit()
+            except BaseException as e:
+                if isinstance(e, (pymysql.OperationalError,
+                                  pymysql.InterfaceError)):
+                    connection.close()
+                else:
+                    await connection.rollback()
+                raise
+
+    async def execute_query(
+            self,
+            query: str,
+            params: tuple = None,
+            dictionary_cursor: bool = False,
+            cache_table: str = None
+    ):
+        """
+        Async version of DatabaseInterface.execute_query, sharing its
+        query cache.
+        """
+        cache_key = None
+        if cache_table is not None:
+            cache_key = make_cache_key(
+                self.database_name, self.tables[cache_table].name,
+                query, params, dictionary_cursor)
+            hit, result = query_cache.get(cache_key, self._request_cache)
+            if hit:
+                return result
+            generation = query_cache.generation(cache_key)
+        try:
+            async with self._cursor(dictionary_cursor) as cursor:
+                await cursor.execute(query, params)
+                result = await cursor.fetchall()
+        except pymysql.Error as err:
+            logger.error(f"Error executing query: {err} (aiomysql)")
+            raise
+        finally:
+            if cache_key is None:
+                self._invalidate_cached_reads(query)
+        if cache_key is not None and not self.in_transaction:
+            query_cache.put(
+                cache_key, cache_table, result, generation,
+                self._request_cache)
+        return result
+
+    def _invalidate_cached_reads(self, query: str):
+        """Drops cached reads of the table query writes to, if any."""
+        table_name = get_written_table(query)
+        if table_name is None:
+            return
+        query_cache.invalidate(
+            self.database_name, table_name, self._request_cache)
+        if self.in_transaction:
+            self.call_on_commit(lambda: query_cache.invalidate(
+                self.database_name, table_name, self._request_cache))
+
+    async def execute_many(
+            self,
+            query: str,
+            params_seq: list[tuple],
+            chunk_size: int = 500
+    ) -> int:
+        """
+        Async version of DatabaseInterface.execute_many. Returns the summed
+        affected row count.
+        """
+        params_seq = list(params_seq)
+        if not params_seq:
+            return 0
+        try:
+            async with self._cursor() as cursor:
+                affected_rows = 0
+                for start in range(0, len(params_seq), chunk_size):
+                    affected_rows += await cursor.executemany(
+                        query, params_seq[start:start + chunk_size]) or 0
+                return affected_rows
+        except pymysql.Error as err:
+            logger.error(f"Error executing bulk query: {err} (aiomysql)")
+            raise
+        finally:
+            self._invalidate_cached_reads(query)
+
+    async def get_column_names_and_datatypes_for_tables(
+            self,
+            table_names: list[str]
+    ) -> dict[str, dict[str, str]] | None:
+        query = f"""
+            SELECT
+                TABLE_NAME,
+                COLUMN_NAME,
+                COLUMN_TYPE
+            FROM
+                INFORMATION_SCHEMA.COLUMNS
+            WHERE
+                TABLE_SCHEMA = %s
+            AND TABLE_NAME IN ({','.join(['%s'] * len(table_names))})
+            ORDER BY
+                TABLE_NAME, ORDINAL_POSITION;
+            """
+        columns_by_table = {}
+        try:
+            rows = await self.execute_query(
+                query, (self.database_name, *table_names))
+        except pymysql.Error as e:
+            logger.error(f"""DB Error retrieving column
+            info for {table_names} (aiomysql): {e}""")
+            return None
+        for table_name, column_name, column_type in rows:
+            columns_by_table.setdefault(
+                table_name, {})[column_name] = column_type
+        return columns_by_table
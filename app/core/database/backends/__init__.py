@@ -0,0 +1,18 @@
+from .base import DatabaseBackend
+from .mysql_backend import MySQLBackend
+from .sqlite_backend import SQLiteBackend
+
+BACKENDS = {
+    MySQLBackend.name: MySQLBackend,
+    SQLiteBackend.name: SQLiteBackend
+}
+
+
+def get_backend(name: str) -> DatabaseBackend:
+    """Returns the backend registered under name ("mysql" or "sqlite")."""
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(
+            f"Unknown database backend: {name}. "
+            f"Available backends: {list(BACKENDS)}")
+    return backend_class()
@@ -0,0 +1,76 @@
+class DatabaseBackend:
+    """
+    Everything DatabaseInterface needs that differs between database
+    engines: how connections are pooled, how cursors are created and how
+    the schema and query plans are introspected. Queries themselves are
+    written once in MySQL syntax (queries.py); backends that speak another
+    dialect translate them in their cursor.
+    """
+    name: str = None
+
+    def create_pool(self, db_config: dict, **pool_settings):
+        """Returns a ConnectionPool (acquire/release/warm_up) for db_config."""
+        raise NotImplementedError
+
+    def cursor(
+        self,
+        connection,
+        dictionary_cursor: bool = False,
+        server_side: bool = False
+    ):
+        """
+        Returns a DB-API cursor on connection. Rows are tuples, or dicts if
+        dictionary_cursor is set. server_side requests an unbuffered cursor
+        where the engine distinguishes between the two.
+        """
+        raise NotImplementedError
+
+    def get_columns(
+        self,
+        cursor,
+        database: str,
+        table_names: list[str]
+    ) -> dict[str, dict[str, str]]:
+        """Returns {table_name: {column_name: lowercase column type}}."""
+        raise NotImplementedError
+
+    def get_data_type(
+        self,
+        cursor,
+        database: str,
+        table_name: str,
+        column_name: str
+    ) -> str | None:
+        """Returns the bare data type of a column, e.g. "varchar"."""
+        raise NotImplementedError
+
+    def get_indexes(
+        self,
+        cursor,
+        database: str,
+        table_name: str,
+        unique_only: bool = False
+    ) -> dict[str, list[str]]:
+        """
+        Returns {index_name: [columns in index order]} of a table, only the
+        unique ones (including the primary key) with unique_only.
+        """
+        raise NotImplementedError
+
+    def get_create_table(self, cursor, table_name: str) -> str | None:
+        """Returns the DDL of a table as stored by the server, else None."""
+        raise NotImplementedError
+
+    def explain(self, cursor, query: str, params: tuple = None) -> list[dict]:
+        """
+        Returns the query plan as one dict per accessed table with the keys
+        of MySQL's EXPLAIN output: table, type ("ALL" and "index" are full
+        scans), key and rows.
+        """
+        raise NotImplementedError
+
+
+def rows_as_dicts(cursor) -> list[dict]:
+    """Fetches all rows of a tuple cursor as {column: value} dicts."""
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -0,0 +1,107 @@
+import pymysql.cursors
+
+from app.core.database.connection_pool import get_pool
+from .base import DatabaseBackend, rows_as_dicts
+
+
+class MySQLBackend(DatabaseBackend):
+    """PyMySQL on a MySQL server, optionally through an SSH tunnel."""
+    name = "mysql"
+
+    def create_pool(self, db_config: dict, **pool_settings):
+        return get_pool(db_config, **pool_settings)
+
+    def cursor(
+        self,
+        connection,
+        dictionary_cursor: bool = False,
+        server_side: bool = False
+    ):
+        if server_side:
+            cursor_type = pymysql.cursors.SSDictCursor if \
+                dictionary_cursor else pymysql.cursors.SSCursor
+        else:
+            cursor_type = pymysql.cursors.DictCursor if \
+                dictionary_cursor else pymysql.cursors.Cursor
+        return connection.cursor(cursor_type)
+
+    def get_columns(
+        self,
+        cursor,
+        database: str,
+        table_names: list[str]
+    ) -> dict[str, dict[str, str]]:
+        query = f"""
+            SELECT
+                TABLE_NAME,
+                COLUMN_NAME,
+                COLUMN_TYPE
+            FROM
+                INFORMATION_SCHEMA.COLUMNS
+            WHERE
+                TABLE_SCHEMA = %s
+            AND TABLE_NAME IN ({','.join(['%s'] * len(table_names))})
+            ORDER BY
+                TABLE_NAME, ORDINAL_POSITION;
+            """
+        cursor.execute(query, (database, *table_names))
+        columns_by_table = {}
+        for table_name, column_name, column_type in cursor.fetchall():
+            columns_by_table.setdefault(
+                table_name, {})[column_name] = column_type
+        return columns_by_table
+
+    def get_data_type(
+        self,
+        cursor,
+        database: str,
+        table_name: str,
+        column_name: str
+    ) -> str | None:
+        query = """
+            SELECT DATA_TYPE
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s
+            """
+        cursor.execute(query, (database, table_name, column_name))
+        result = cursor.fetchone()
+        return result[0] if result else None
+
+    def get_indexes(
+        self,
+        cursor,
+        database: str,
+        table_name: str,
+        unique_only: bool = False
+    ) -> dict[str, list[str]]:
+        cursor.execute(
+            """
+            SELECT INDEX_NAME, COLUMN_NAME, NON_UNIQUE
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+            ORDER BY INDEX_NAME, SEQ_IN_INDEX
+            """,
+            (database, table_name)
+        )
+        indexes = {}
+        for index_name, column_name, non_unique in cursor.fetchall():
+            if unique_only and int(non_unique):
+                continue
+            indexes.setdefault(index_name, []).append(column_name)
+        return indexes
+
+    def get_create_table(self, cursor, table_name: str) -> str | None:
+        cursor.execute(f"SHOW CREATE TABLE {table_name}")
+        row = cursor.fetchone()
+        return None if row is None else row[1]
+
+    def explain(self, cursor, query: str, params: tuple = None) -> list[dict]:
+        cursor.execute(f"EXPLAIN {query}", params)
+        return [
+            {
+                "table": row.get("table"),
+                "type": row.get("type"),
+                "key": row.get("key"),
+                "rows": row.get("rows")
+            } for row in rows_as_dicts(cursor)
+        ]
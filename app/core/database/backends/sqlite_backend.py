@@ -0,0 +1,289 @@
+import datetime as dt
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from functools import lru_cache
+
+import pymysql
+
+from app.core.utils.utils import set_logger
+from app.core.database.connection_pool import get_pool
+from .base import DatabaseBackend, rows_as_dicts
+
+logger = set_logger(name=__name__)
+
+# Requires SQLite >= 3.35 for ON CONFLICT DO UPDATE without conflict target
+
+_AUTO_INCREMENT_PRIMARY_KEY = re.compile(
+    r"\bINT(?:EGER)?\s+(?:NOT\s+NULL\s+)?AUTO_INCREMENT\s+PRIMARY\s+KEY\b",
+    re.IGNORECASE)
+_ON_DUPLICATE_KEY_UPDATE = re.compile(
+    r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_VALUES_FUNCTION = re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE)
+# (a, b) IN ((%s, %s), (%s, %s))
+_ROW_VALUE_IN = re.compile(
+    r"\(([\w\s,]+)\)\s+IN\s+\(((?:\s*\([^()]*\)\s*,?)+)\)", re.IGNORECASE)
+_ROW_VALUE = re.compile(r"\(([^()]*)\)")
+
+
+def _expand_row_value_in(match: re.Match) -> str:
+    """
+    Rewrites a row-value IN list as OR-ed equality groups. SQLite only
+    accepts subqueries on the right of a row-value IN and does not use
+    indexes for IN (VALUES ...), but it does for OR-ed equalities.
+    """
+    columns = [column.strip() for column in match.group(1).split(",")]
+    groups = []
+    for row in _ROW_VALUE.findall(match.group(2)):
+        values = [value.strip() for value in row.split(",")]
+        groups.append("(" + " AND ".join(
+            f"{column} = {value}" for column, value in zip(columns, values)
+        ) + ")")
+    return "(" + " OR ".join(groups) + ")"
+
+
+@lru_cache(maxsize=1024)
+def translate_query(query: str) -> str:
+    """
+    Translates a MySQL query (as written in queries.py and the db handlers)
+    to SQLite:
+      - %s placeholders become ?
+      - INSERT ... ON DUPLICATE KEY UPDATE col = VALUES(col) becomes
+        INSERT ... ON CONFLICT DO UPDATE SET col = excluded.col, which like
+        MySQL updates on a conflict with any primary or unique key
+      - (a, b) IN ((...), (...)) becomes OR-ed equality groups
+      - INT AUTO_INCREMENT PRIMARY KEY becomes INTEGER PRIMARY KEY
+        AUTOINCREMENT
+    """
+    query = _AUTO_INCREMENT_PRIMARY_KEY.sub(
+        "INTEGER PRIMARY KEY AUTOINCREMENT", query)
+    match = _ON_DUPLICATE_KEY_UPDATE.search(query)
+    if match:
+        query = query[:match.start()] + "ON CONFLICT DO UPDATE SET" + \
+            _VALUES_FUNCTION.sub(r"excluded.\1", query[match.end():])
+    query = _ROW_VALUE_IN.sub(_expand_row_value_in, query)
+    return query.replace("%s", "?")
+
+
+def _convert_date(value: bytes):
+    try:
+        return dt.date.fromisoformat(value.decode()[:10])
+    except ValueError:
+        return value.decode()
+
+
+def _convert_datetime(value: bytes):
+    try:
+        return dt.datetime.fromisoformat(value.decode())
+    except ValueError:
+        return value.decode()
+
+
+# Store dates like MySQL prints them and read DATE/DATETIME columns back as
+# date/datetime objects, as PyMySQL does
+sqlite3.register_adapter(dt.date, lambda value: value.isoformat())
+sqlite3.register_adapter(dt.datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+
+
+@contextmanager
+def _pymysql_errors():
+    """
+    Re-raises sqlite3 errors as their PyMySQL counterparts, so the error
+    handling written against PyMySQL works for both backends.
+    """
+    try:
+        yield
+    except sqlite3.IntegrityError as e:
+        raise pymysql.IntegrityError(str(e)) from e
+    except sqlite3.OperationalError as e:
+        raise pymysql.OperationalError(str(e)) from e
+    except sqlite3.ProgrammingError as e:
+        raise pymysql.ProgrammingError(str(e)) from e
+    except sqlite3.Error as e:
+        raise pymysql.DatabaseError(str(e)) from e
+
+
+class SQLiteCursor:
+    """
+    DB-API cursor wrapper that accepts the MySQL queries of this app and
+    returns rows in the same shape as the PyMySQL cursors.
+    """
+    def __init__(self, cursor: sqlite3.Cursor, dictionary_cursor: bool = False):
+        self._cursor = cursor
+        self.dictionary_cursor = dictionary_cursor
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def execute(self, query: str, params=None) -> int:
+        with _pymysql_errors():
+            self._cursor.execute(translate_query(query), tuple(params or ()))
+        return self._cursor.rowcount
+
+    def executemany(self, query: str, params_seq) -> int:
+        with _pymysql_errors():
+            self._cursor.executemany(
+                translate_query(query),
+                [tuple(params) for params in params_seq])
+        return self._cursor.rowcount
+
+    def _convert(self, rows: list) -> list:
+        if not self.dictionary_cursor or not rows:
+            return rows
+        columns = [description[0] for description in self.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def fetchone(self):
+        with _pymysql_errors():
+            row = self._cursor.fetchone()
+        if row is None:
+            return None
+        return self._convert([row])[0]
+
+    def fetchmany(self, size: int = None) -> list:
+        with _pymysql_errors():
+            rows = self._cursor.fetchmany(size or self._cursor.arraysize)
+        return self._convert(rows)
+
+    def fetchall(self) -> list:
+        with _pymysql_errors():
+            rows = self._cursor.fetchall()
+        return self._convert(rows)
+
+    def close(self):
+        self._cursor.close()
+
+
+def open_sqlite_connection(db_config: dict) -> sqlite3.Connection:
+    """
+    Opens the SQLite database file db_config["database"] in WAL mode, so
+    readers on other pooled connections are not blocked by a writer.
+    """
+    path = db_config["database"]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(
+        path,
+        timeout=db_config.get("connection_timeout", 10),
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        # Pooled connections move between threads, one user at a time
+        check_same_thread=False
+    )
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    logger.info(f"Connected to SQLite DB: {path}.")
+    return connection
+
+
+class SQLiteBackend(DatabaseBackend):
+    """
+    Embedded SQLite database for single-node runs, local profiling and
+    benchmarks. Runs the same tables and queries as MySQL without a server.
+    """
+    name = "sqlite"
+
+    def create_pool(self, db_config: dict, **pool_settings):
+        pool_settings.update({
+            "connect": open_sqlite_connection,
+            "pre_ping": False
+        })
+        return get_pool(db_config, **pool_settings)
+
+    def cursor(
+        self,
+        connection,
+        dictionary_cursor: bool = False,
+        server_side: bool = False
+    ):
+        # SQLite cursors step through the result lazily anyway
+        return SQLiteCursor(connection.cursor(), dictionary_cursor)
+
+    def get_columns(
+        self,
+        cursor,
+        database: str,
+        table_names: list[str]
+    ) -> dict[str, dict[str, str]]:
+        columns_by_table = {}
+        for table_name in table_names:
+            cursor.execute(f"PRAGMA table_info({table_name})")
+            # (cid, name, type, notnull, dflt_value, pk)
+            for row in cursor.fetchall():
+                columns_by_table.setdefault(
+                    table_name, {})[row[1]] = row[2].lower()
+        return columns_by_table
+
+    def get_data_type(
+        self,
+        cursor,
+        database: str,
+        table_name: str,
+        column_name: str
+    ) -> str | None:
+        columns = self.get_columns(cursor, database, [table_name])
+        column_type = columns.get(table_name, {}).get(column_name)
+        return column_type.split("(")[0] if column_type else None
+
+    def get_indexes(
+        self,
+        cursor,
+        database: str,
+        table_name: str,
+        unique_only: bool = False
+    ) -> dict[str, list[str]]:
+        cursor.execute(f"PRAGMA index_list({table_name})")
+        # (seq, name, unique, origin, partial)
+        index_names = [
+            row[1] for row in cursor.fetchall() if row[2] or not unique_only
+        ]
+        indexes = {}
+        for index_name in index_names:
+            cursor.execute(f"PRAGMA index_info({index_name})")
+            # (seqno, cid, name)
+            indexes[index_name] = [
+                row[2] for row in sorted(cursor.fetchall())
+            ]
+        return indexes
+
+    def get_create_table(self, cursor, table_name: str) -> str | None:
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (table_name,))
+        row = cursor.fetchone()
+        return None if row is None else row[0]
+
+    def explain(self, cursor, query: str, params: tuple = None) -> list[dict]:
+        cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        plan = []
+        for row in rows_as_dicts(cursor):
+            match = re.match(
+                r"(SCAN|SEARCH) (\w+)(?: USING (?:COVERING )?"
+                r"(?:INDEX (\w+)|(INTEGER PRIMARY KEY)))?",
+                row["detail"])
+            if match is None:
+                continue
+            access, table, index_name, primary_key = match.groups()
+            if access == "SEARCH":
+                access_type = "ref"
+            else:
+                access_type = "index" if index_name else "ALL"
+            plan.append({
+                "table": table,
+                "type": access_type,
+                "key": index_name or ("PRIMARY" if primary_key else None),
+                "rows": None
+            })
+        return plan
@@ -1,130 +1,113 @@
 import pymysql
 import pymysql.cursors
 import logging
-import os
-from sshtunnel import SSHTunnelForwarder
 
 import app.core.secret_handler as secrets
 from app.core.utils.utils import set_logger
 from app.core.app_config import get_config
+from .ssh_tunnel import get_tunnel_manager
 
 app_config = get_config()
 logger = set_logger(__name__)
 secrets_config = secrets.get_config()
 
 
+def get_connection_args(
+        db_config: dict,
+        host: str = None,
+        port: int = None
+) -> dict:
+    """Builds the keyword arguments for pymysql.connect from db_config."""
+    return {
+        'host': host if host else db_config.get('db_host'),
+        'port': port if port else db_config.get('db_port', 3306),
+        'user': db_config.get('db_username'),
+        'password': db_config.get('db_password'),
+        'database': db_config.get('database'),
+        'charset': db_config.get('charset', 'utf8mb4'),
+        'connect_timeout': db_config.get('connect_timeout', 10)
+    }
+
+
+def open_connection(db_config: dict):
+    """
+    Opens a new PyMySQL connection for db_config. If the config requires an
+    SSH tunnel, the connection goes through the shared tunnel of the
+    process-wide SSHTunnelManager.
+    """
+    db_target_name = db_config.get('database', 'N/A')
+    if not db_config.get('is_ssh_tunnel', False):
+        connection = pymysql.connect(**get_connection_args(db_config))
+        logging.info(f"Connected to DB: {db_target_name} (PyMySQL).")
+        return connection
+
+    tunnel_manager = get_tunnel_manager()
+    local_host, local_port = tunnel_manager.get_local_address(db_config)
+    try:
+        connection = pymysql.connect(**get_connection_args(
+            db_config, host=local_host, port=local_port))
+    except pymysql.OperationalError as e:
+        # The tunnel may have died without the transport noticing yet
+        logging.warning(
+            f"Connection through SSH tunnel failed ({e}). "
+            "Restarting tunnel and retrying once.")
+        tunnel_manager.restart(db_config)
+        local_host, local_port = tunnel_manager.get_local_address(db_config)
+        connection = pymysql.connect(**get_connection_args(
+            db_config, host=local_host, port=local_port))
+    logging.info(
+        f"Connected to DB: {db_target_name} through SSH tunnel "
+        f"({local_host}:{local_port}) (PyMySQL).")
+    return connection
+
+
 class DatabaseConnection:
     def __init__(
             self,
             config,
-            dictionary_cursor=False
+            dictionary_cursor=False,
+            pool=None,
+            server_side=False,
+            backend=None
     ):
         self.db_config = config
         self.dictionary_cursor = dictionary_cursor
+        # Unbuffered cursor: rows are streamed from the server on fetch
+        self.server_side = server_side
+        # Creates the cursors for non-MySQL backends (see backends package)
+        self.backend = backend
+        self.pool = pool
+        self.pooled_connection = None
         self.connection = None
         self.cursor = None
-        self.tunnel = None
 
         logging.info(
             "DatabaseConnection context manager initialized (PyMySQL).")
 
-    def _start_tunnel(self):
-        """Starts the SSH tunnel if not already active."""
-        if self.tunnel and self.tunnel.is_active:
-            logging.debug("SSH tunnel already active.")
-            return True
-
-        logging.info("Attempting to start SSH tunnel...")
-        required_ssh_keys = [
-            'ssh_host',
-            'ssh_port',
-            'ssh_private_key_path',
-            'ssh_user']
-        if not all(k in self.db_config for k in required_ssh_keys):
-            logging.error("Missing required SSH configuration keys for tunnel.")
-            return False
-
-        try:
-            ssh_key_path = os.path.expanduser(
-                    self.db_config['ssh_private_key_path'])
-            if not os.path.exists(ssh_key_path):
-                logging.error(
-                        f"SSH private key not found at: {ssh_key_path}")
-                return False
-
-            self.tunnel = SSHTunnelForwarder(
-                ssh_address_or_host=(
-                        self.db_config['ssh_host'],
-                        int(self.db_config.get('ssh_port', 22))),
-                ssh_username=self.db_config['ssh_user'],
-                ssh_pkey=ssh_key_path,
-                remote_bind_address=(
-                        self.db_config['db_host'],
-                        int(self.db_config.get('db_port', 3306))),
-                local_bind_address=('127.0.0.1', 0)
-            )
-            self.tunnel.start()
-            logging.info(
-                f"""SSH tunnel established.
-                Local bind port: {self.tunnel.local_bind_port}""")
-            return True
-        except Exception as e:
-            logging.error(f"Failed to start SSH tunnel: {e}")
-            self.tunnel = None
-            return False
-
     def __enter__(self):
-
-        pymysql_connection_args = {}
-        db_target_name = self.db_config.get('database', 'N/A')
-
         try:
-            if self.db_config.get('is_ssh_tunnel', False):
-                # --- SSH Tunnel Connection ---
-                logging.info(
-                    f"Attempting SSH tunnel setup for DB:"
-                    f" {db_target_name} (PyMySQL)"
-                )
-                if not self._start_tunnel():
-                    # If tunnel fails to start, raise an error
-                    raise ConnectionError("Failed to establish SSH tunnel.")
+            if self.pool is not None:
+                # --- Pooled Connection ---
+                self.pooled_connection = self.pool.acquire()
+                self.connection = self.pooled_connection.connection
+            else:
+                self.connection = open_connection(self.db_config)
 
-                # Connect PyMySQL to the local end of the tunnel
-                pymysql_connection_args = {
-                    'host': self.db_config.get('db_host'),
-                    'port': self.tunnel.local_bind_port,
-                    'user': self.db_config.get('db_username'),
-                    'password': self.db_config.get('db_password'),
-                    'database': self.db_config.get('database'),
-                    'charset': self.db_config.get('charset', 'utf8mb4'),
-                    'connect_timeout': self.db_config.get('connect_timeout', 10)
-                }
-                logging.info(
-                    f"Attempting to connect PyMySQL to local tunnel endpoint "
-                    f"({self.db_config.get('db_host')}:{self.tunnel.local_bind_port}) for DB:"
-                    f" {db_target_name}"
+            if self.backend is not None:
+                self.cursor = self.backend.cursor(
+                    self.connection,
+                    dictionary_cursor=self.dictionary_cursor,
+                    server_side=self.server_side
                 )
-
             else:
-                # --- Direct Connection ---
-                logging.info(
-                    f"Attempting direct connection to DB: {db_target_name} (PyMySQL)")
-                pymysql_connection_args = {
-                    'host': self.db_config.get('db_host'),
-                    'port': self.db_config.get('db_port', 3306),
-                    'user': self.db_config.get('db_username'),
-                    'password': self.db_config.get('db_password'),
-                    'database': self.db_config.get('database'),
-                    'charset': self.db_config.get('charset', 'utf8mb4'),
-                    'connect_timeout': self.db_config.get('connect_timeout', 10)
-                }
-            self.connection = pymysql.connect(**pymysql_connection_args)
-            logging.info(f"Connected to DB: {db_target_name} (PyMySQL).")
-
-            # Determine cursor type based on flag
-            cursor_type = pymysql.cursors.DictCursor if \
-                self.dictionary_cursor else pymysql.cursors.Cursor
-            self.cursor = self.connection.cursor(cursor_type)
+                # Determine cursor type based on flags
+                if self.server_side:
+                    cursor_type = pymysql.cursors.SSDictCursor if \
+                        self.dictionary_cursor else pymysql.cursors.SSCursor
+                else:
+                    cursor_type = pymysql.cursors.DictCursor if \
+                        self.dictionary_cursor else pymysql.cursors.Cursor
+                self.cursor = self.connection.cursor(cursor_type)
             logging.info(" -> Connection established, cursor created (PyMySQL).")
             return self.cursor
 
@@ -139,6 +122,9 @@ class DatabaseConnection:
         logging.info(
             f"Exiting DatabaseConnection context ({log_prefix}). Exception Type: {exc_type}."
         )
+        # Broken connections must not go back into the pool
+        discard = exc_type is not None and issubclass(
+            exc_type, (pymysql.OperationalError, pymysql.InterfaceError))
         if self.connection:
             try:
                 if self.cursor:
@@ -158,22 +144,18 @@ class DatabaseConnection:
 
             except pymysql.Error as e_cr:
                 logging.error(f"Error during commit/rollback (PyMySQL): {e_cr}")
+                discard = True
             finally:
-                try:
-                    self.connection.close()
-                    logging.info(" -> Connection closed (PyMySQL).")
-                except pymysql.Error as e_con:
-                    logging.error(f"Error closing connection (PyMySQL): {e_con}")
-                finally:
-                    self.connection = None
-                    self.cursor = None
-        if self.tunnel and self.tunnel.is_active:
-            logging.info("Stopping SSH tunnel...")
-            try:
-                self.tunnel.stop()
-                logging.info(" -> SSH tunnel stopped.")
-            except Exception as e_tun:
-                logging.error(f"Error stopping SSH tunnel: {e_tun}")
-            finally:
-                self.tunnel = None
+                if self.pooled_connection is not None:
+                    self.pool.release(self.pooled_connection, discard=discard)
+                    logging.info(" -> Connection returned to pool (PyMySQL).")
+                else:
+                    try:
+                        self.connection.close()
+                        logging.info(" -> Connection closed (PyMySQL).")
+                    except pymysql.Error as e_con:
+                        logging.error(f"Error closing connection (PyMySQL): {e_con}")
+                self.connection = None
+                self.cursor = None
+                self.pooled_connection = None
         return False
@@ -0,0 +1,218 @@
+import atexit
+import threading
+import time
+from collections import deque
+
+import pymysql
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+from .connection_handler import open_connection
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PooledConnection:
+    """A raw PyMySQL connection plus the bookkeeping the pool needs."""
+    def __init__(self, connection):
+        self.connection = connection
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.connection.close()
+        except pymysql.Error as e:
+            logger.debug(f"Error closing pooled connection (PyMySQL): {e}")
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections for one database config.
+    Connections are opened with connect(db_config), PyMySQL's
+    open_connection by default.
+    Connections are created lazily up to max_size, kept open while idle for
+    up to idle_timeout seconds (min_size of them are never pruned) and pinged
+    on checkout when they have been idle longer than ping_interval.
+    """
+    def __init__(
+        self,
+        db_config: dict,
+        min_size: int = 1,
+        max_size: int = 5,
+        idle_timeout: float = 300,
+        pre_ping: bool = True,
+        ping_interval: float = 30,
+        acquire_timeout: float = 10,
+        connect=None
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(
+                f"Invalid pool size: min_size={min_size}, "
+                f"max_size={max_size}")
+        self.db_config = db_config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self.ping_interval = ping_interval
+        self.acquire_timeout = acquire_timeout
+        self.connect = connect or open_connection
+        self._idle: deque[PooledConnection] = deque()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def warm_up(self):
+        """Opens connections until min_size connections exist."""
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                pooled = self._create()
+            except Exception:
+                self._forget()
+                raise
+            self.release(pooled)
+
+    def acquire(self) -> PooledConnection:
+        """
+        Borrows a connection from the pool. Blocks for up to acquire_timeout
+        seconds if max_size connections are already in use.
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            pooled = None
+            with self._condition:
+                if self._closed:
+                    raise ConnectionError("Connection pool is closed.")
+                stale = self._prune_idle()
+                while True:
+                    if self._idle:
+                        # LIFO keeps the most recently used connections hot
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ConnectionError(
+                            "Timed out waiting for a free database "
+                            f"connection (max_size={self.max_size}).")
+                    self._condition.wait(remaining)
+            for stale_connection in stale:
+                stale_connection.close()
+
+            if pooled is None:
+                try:
+                    return self._create()
+                except Exception:
+                    self._forget()
+                    raise
+            if self._is_alive(pooled):
+                return pooled
+            logger.warning("Discarding dead pooled connection (PyMySQL).")
+            pooled.close()
+            self._forget()
+
+    def release(self, pooled: PooledConnection, discard: bool = False):
+        """Returns a borrowed connection to the pool."""
+        with self._condition:
+            if not discard and not self._closed:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+                self._condition.notify()
+                return
+        pooled.close()
+        self._forget()
+
+    def close_all(self):
+        """Closes every idle connection and rejects further checkouts."""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for pooled in idle:
+            pooled.close()
+
+    def _create(self) -> PooledConnection:
+        return PooledConnection(self.connect(self.db_config))
+
+    def _forget(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _prune_idle(self) -> list[PooledConnection]:
+        """Removes connections idle past idle_timeout. Caller holds lock."""
+        stale = []
+        now = time.monotonic()
+        # The oldest idle connections sit at the left end of the deque
+        while self._idle and self._size > self.min_size and \
+                now - self._idle[0].last_used > self.idle_timeout:
+            stale.append(self._idle.popleft())
+            self._size -= 1
+        return stale
+
+    def _is_alive(self, pooled: PooledConnection) -> bool:
+        if not self.pre_ping:
+            return True
+        if time.monotonic() - pooled.last_used < self.ping_interval:
+            return True
+        try:
+            pooled.connection.ping(reconnect=False)
+            return True
+        except pymysql.Error:
+            return False
+
+
+def get_pool_key(db_config: dict) -> tuple:
+    return (
+        db_config.get('backend', 'mysql'),
+        db_config.get('db_host'),
+        db_config.get('db_port'),
+        db_config.get('db_username'),
+        db_config.get('database'),
+        db_config.get('is_ssh_tunnel', False)
+    )
+
+
+def get_pool(db_config: dict, **pool_settings) -> ConnectionPool:
+    """
+    Returns the process-wide pool for db_config, creating it on first use.
+    Interfaces pointing at the same database share one pool.
+    """
+    key = get_pool_key(db_config)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            settings = dict(app_config.get('mysql_pool', {}))
+            settings.update(pool_settings)
+            pool = ConnectionPool(db_config, **settings)
+            _pools[key] = pool
+        return pool
+
+
+@atexit.register
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
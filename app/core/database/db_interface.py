@@ -1,7 +1,16 @@
 import pymysql
 import os
+import threading
+from contextlib import contextmanager
 from app.core.app_config import get_config
 from .connection_handler import DatabaseConnection
+from .backends import get_backend
+from .schema_cache import schema_cache
+from .query_cache import (
+    query_cache,
+    make_cache_key,
+    get_written_table
+)
 import app.core.secret_handler as secrets
 from app.core.utils.utils import set_logger
 
@@ -23,6 +32,69 @@ class Table:
         return [col for col, dtype in self.columns.items() if dtype == "json"]
 
 
+def build_db_config(
+        host: str = None,
+        port: int = None,
+        user: str = None,
+        password: str = None,
+        database: str = None,
+        is_ssh_tunnel: bool = False,
+        connection_timeout: int = 10) -> dict:
+    """Connection settings shared by the sync and async interfaces."""
+    db_config = {
+        'db_host': host,
+        'db_port': int(port),
+        'db_username': user,
+        'db_password': password,
+        'database': database,
+        'is_ssh_tunnel': is_ssh_tunnel,
+        'connection_timeout': connection_timeout,
+    }
+    if is_ssh_tunnel:
+        db_config.update({
+            'ssh_host': secret_config.get('DROPLET_SSH_HOST'),
+            'ssh_port': int(secret_config.get('SSH_TUNNEL_PORT')),
+            'ssh_private_key_path': secret_config.get(
+                'SSH_PRIVATE_KEY_PATH'),
+            'ssh_user': secret_config.get('DROPLET_SSH_USER'),
+        })
+    return db_config
+
+
+def build_sqlite_db_config(
+        path: str,
+        connection_timeout: int = 10) -> dict:
+    """Connection settings of the embedded SQLite backend."""
+    return {
+        'backend': 'sqlite',
+        'database': path,
+        'connection_timeout': connection_timeout,
+    }
+
+
+def build_tables() -> dict[str, Table]:
+    """Returns the app tables keyed by their app_config key."""
+    return {
+        "reddit_posts": Table(
+            app_config.get('mysql').get('tables').get('reddit_posts'),
+        ),
+        "portfolios": Table(
+            app_config.get('mysql').get('tables').get('portfolios'),
+        ),
+        "purchases": Table(
+            app_config.get('mysql').get('tables').get('purchases'),
+        ),
+        "crypto_currency_prices": Table(
+            app_config.get('mysql').get('tables').get(
+                    'crypto_currency_prices'),
+        ),
+        "crypto_assets": Table(
+            app_config.get('mysql').get('tables').get(
+                    'crypto_assets')
+        )
+    }
+
+
 class DatabaseInterface:
     def __init__(
         self,
@@ -32,37 +104,41 @@ class DatabaseInterface:
         password: str = os.getenv("MYSQL_KEY"),
         database: str = os.getenv("MYSQL_DBNAME"),
         is_ssh_tunnel: bool = False,
-        connection_timeout: int = 10
+        connection_timeout: int = 10,
+        pool_config: dict = None,
+        backend: str = None,
+        sqlite_path: str = None
     ):
-        self.set_db_config(
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database,
-            is_ssh_tunnel=is_ssh_tunnel,
-            connection_timeout=connection_timeout
-        )
-        self.database_name = database
-        self.tables = {
-            "reddit_posts": Table(
-                    app_config.get('mysql').get('tables').get('reddit_posts'),
-                    ),
-            "portfolios": Table(
-                app_config.get('mysql').get('tables').get('portfolios'),
-            ),
-            "purchases": Table(
-                app_config.get('mysql').get('tables').get('purchases'),
-            ),
-            "crypto_currency_prices": Table(
-                app_config.get('mysql').get('tables').get(
-                        'crypto_currency_prices'),
-            ),
-            "crypto_assets": Table(
-                app_config.get('mysql').get('tables').get(
-                        'crypto_assets')
+        # Backend and SQLite file default to app_config["database"]
+        database_config = app_config.get('database', {})
+        self.backend = get_backend(
+            backend or database_config.get('backend', 'mysql'))
+        if self.backend.name == "sqlite":
+            sqlite_path = sqlite_path or database_config.get('sqlite_path')
+            self.db_config = build_sqlite_db_config(
+                sqlite_path, connection_timeout=connection_timeout)
+            self.database_name = os.path.splitext(
+                os.path.basename(sqlite_path))[0]
+        else:
+            self.set_db_config(
+                host=host,
+                port=port,
+                user=user,
+                password=password,
+                database=database,
+                is_ssh_tunnel=is_ssh_tunnel,
+                connection_timeout=connection_timeout
             )
-        }
+            self.database_name = database
+        # Pool settings default to app_config["mysql_pool"]
+        self.pool = self.backend.create_pool(
+            self.db_config, **(pool_config or {}))
+        self.pool.warm_up()
+        # Connection pinned by transaction(), per thread
+        self._local = threading.local()
+        # Query results cached for the current request, see request_scope()
+        self._request_cache = None
+        self.tables = build_tables()
         self.prepare_tables()
 
     def set_db_config(
@@ -74,31 +150,35 @@ class DatabaseInterface:
             database: str = None,
             is_ssh_tunnel: bool = False,
             connection_timeout: int = 10):
-        db_config = {
-            'db_host': host,
-            'db_port': int(port),
-            'db_username': user,
-            'db_password': password,
-            'database': database,
-            'is_ssh_tunnel': is_ssh_tunnel,
-            'connection_timeout': connection_timeout,
-        }
-        if is_ssh_tunnel:
-            db_config.update({
-                'ssh_host': secret_config.get('DROPLET_SSH_HOST'),
-                'ssh_port': int(secret_config.get('SSH_TUNNEL_PORT')),
-                'ssh_private_key_path': secret_config.get(
-                    'SSH_PRIVATE_KEY_PATH'),
-                'ssh_user': secret_config.get('DROPLET_SSH_USER'),
-            })
-        self.db_config = db_config
-        
-    def prepare_tables(self):
-        # Logic unchanged, relies on get_column_name_and_datatype_from_table
-        for key, table in self.tables.items():
-            column_info = self.get_column_name_and_datatype_from_table(
-                self.tables[key].name
+        self.db_config = build_db_config(
+            host=host,
+            port=port,
+            user=user,
+            password=password,
+            database=database,
+            is_ssh_tunnel=is_ssh_tunnel,
+            connection_timeout=connection_timeout
+        )
+
+    def prepare_tables(self, refresh: bool = False):
+        """
+        Loads the column metadata of all tables. Served from the process-wide
+        schema cache unless refresh is set or the cache has no entry yet.
+        """
+        table_names = [table.name for table in self.tables.values()]
+        columns_by_table = None
+        if not refresh:
+            columns_by_table = schema_cache.get(
+                self.database_name, table_names)
+        if columns_by_table is None:
+            columns_by_table = self.get_column_names_and_datatypes_for_tables(
+                table_names
             )
+            if columns_by_table:
+                schema_cache.put(self.database_name, columns_by_table)
+        for key, table in self.tables.items():
+            column_info = columns_by_table.get(table.name) \
+                if columns_by_table else None
             if column_info:
                 self.tables[key].set_columns(column_info)
             else:
@@ -106,103 +186,284 @@ class DatabaseInterface:
                 {self.tables[key].name}
                 due to missing column info.""")
 
+    def refresh_schema(self):
+        """Re-reads the table metadata from the database."""
+        self.prepare_tables(refresh=True)
+
+    @contextmanager
+    def request_scope(self):
+        """
+        Caches the results of whitelisted reads (execute_query with
+        cache_table) for the duration of the block, on top of the
+        process-wide TTL cache. Used for one API request.
+        """
+        self._request_cache = {}
+        try:
+            yield self
+        finally:
+            self._request_cache = None
+
+    @property
+    def in_transaction(self) -> bool:
+        """True if the current thread is inside transaction()."""
+        return getattr(self._local, "connection", None) is not None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: pins one pooled connection to the current thread so
+        every execute_query/execute_many issued inside the block (including
+        the ones made by the db_handler functions) runs on it. Commits once
+        on success and rolls everything back on error. Nested calls join the
+        outer transaction.
+
+        Usage:
+            with db_interface.transaction():
+                insert_portfolio_to_db(db_interface, portfolio)
+                upload_purchase_to_db(db_interface, ...)
+        """
+        if self.in_transaction:
+            yield self
+            return
+        pooled_connection = self.pool.acquire()
+        self._local.connection = pooled_connection.connection
+        self._local.on_commit = []
+        discard = False
+        try:
+            yield self
+            pooled_connection.connection.commit()
+            logger.debug("Committed transaction (PyMySQL).")
+        except BaseException as e:
+            logger.warning(
+                f"Rolling back transaction due to error: {e} (PyMySQL)")
+            discard = isinstance(
+                e, (pymysql.OperationalError, pymysql.InterfaceError))
+            try:
+                pooled_connection.connection.rollback()
+            except pymysql.Error as e_rb:
+                logger.error(f"Error during rollback (PyMySQL): {e_rb}")
+                discard = True
+            raise
+        finally:
+            on_commit = self._local.on_commit
+            self._local.connection = None
+            self._local.on_commit = []
+            self.pool.release(pooled_connection, discard=discard)
+        for callback in on_commit:
+            callback()
+
+    def call_on_commit(self, callback):
+        """
+        Runs callback once the current transaction has committed (dropped
+        on rollback), or right away when no transaction is open. Used to
+        keep in-memory caches in sync with the database.
+        """
+        if self.in_transaction:
+            self._local.on_commit.append(callback)
+        else:
+            callback()
+
+    @contextmanager
+    def _cursor(self, dictionary_cursor: bool = False):
+        """
+        Yields a cursor on the pinned transaction connection if there is one,
+        otherwise on a pooled connection that is committed on exit.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            with DatabaseConnection(
+                self.db_config,
+                dictionary_cursor=dictionary_cursor,
+                pool=self.pool,
+                backend=self.backend
+            ) as cursor:
+                yield cursor
+            return
+        cursor = self.backend.cursor(
+            connection, dictionary_cursor=dictionary_cursor)
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
     def execute_query(
             self,
             query: str,
             params: tuple = None,
-            dictionary_cursor: bool = False
+            dictionary_cursor: bool = False,
+            cache_table: str = None
     ):
+        """
+        Executes query and returns all rows. Pass cache_table (a key of
+        self.tables) only for idempotent SELECTs on that table: the result
+        is then served from the query cache until its TTL expires or a
+        write to the table invalidates it. Writes invalidate automatically.
+        """
+        cache_key = None
+        if cache_table is not None:
+            cache_key = make_cache_key(
+                self.database_name, self.tables[cache_table].name,
+                query, params, dictionary_cursor)
+            hit, result = query_cache.get(cache_key, self._request_cache)
+            if hit:
+                return result
+            generation = query_cache.generation(cache_key)
+        try:
+            with self._cursor(dictionary_cursor) as cursor:
+                cursor.execute(query, params)
+                result = cursor.fetchall()
+        except pymysql.Error as err:
+            logger.error(f"Error executing query: {err} (PyMySQL)")
+            raise
+        finally:
+            if cache_key is None:
+                self._invalidate_cached_reads(query)
+        # Reads inside a transaction may see writes that are rolled back
+        if cache_key is not None and not self.in_transaction:
+            query_cache.put(
+                cache_key, cache_table, result, generation,
+                self._request_cache)
+        return result
+
+    def _invalidate_cached_reads(self, query: str):
+        """Drops cached reads of the table query writes to, if any."""
+        table_name = get_written_table(query)
+        if table_name is None:
+            return
+        query_cache.invalidate(
+            self.database_name, table_name, self._request_cache)
+        if self.in_transaction:
+            # Other readers may cache the old rows until the commit
+            self.call_on_commit(lambda: query_cache.invalidate(
+                self.database_name, table_name, self._request_cache))
+
+    def execute_many(
+            self,
+            query: str,
+            params_seq: list[tuple],
+            chunk_size: int = 500
+    ) -> int:
+        """
+        Executes query once per parameter tuple with cursor.executemany on a
+        single connection and commits once (or joins the open transaction).
+        PyMySQL rewrites INSERT ... VALUES statements into multi-row inserts,
+        so each chunk is one round trip. Returns the summed affected row
+        count.
+        """
+        params_seq = list(params_seq)
+        if not params_seq:
+            return 0
+        try:
+            with self._cursor() as cursor:
+                affected_rows = 0
+                for start in range(0, len(params_seq), chunk_size):
+                    affected_rows += cursor.executemany(
+                        query, params_seq[start:start + chunk_size]) or 0
+                return affected_rows
+        except pymysql.Error as err:
+            logger.error(f"Error executing bulk query: {err} (PyMySQL)")
+            raise
+        finally:
+            self._invalidate_cached_reads(query)
+
+    def stream_query(
+            self,
+            query: str,
+            params: tuple = None,
+            dictionary_cursor: bool = False,
+            chunk_size: int = 1000
+    ):
+        """
+        Like execute_query, but yields the result in lists of up to
+        chunk_size rows read from an unbuffered server-side cursor
+        (SSCursor/SSDictCursor), so memory stays constant however large
+        the result is. The stream always runs on its own pooled connection,
+        even inside transaction(), because the connection cannot serve other
+        queries until the result is consumed. Keep the consumer of a stream
+        short-lived: the server holds the result open until it is read.
+
+        Usage:
+            for rows in db_interface.stream_query(query, chunk_size=500):
+                ...
+        """
         try:
             with DatabaseConnection(
                 self.db_config,
-                dictionary_cursor=dictionary_cursor
+                dictionary_cursor=dictionary_cursor,
+                pool=self.pool,
+                server_side=True,
+                backend=self.backend
             ) as cursor:
                 cursor.execute(query, params)
-                return cursor.fetchall()
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
         except pymysql.Error as err:
-            logger.error(f"Error executing query: {err} (PyMySQL)")
+            logger.error(f"Error streaming query: {err} (PyMySQL)")
             raise
 
     def get_column_name_and_datatype_from_table(self, table_name):
-        # Query remains the same
-        query = """
-            SELECT
-                COLUMN_NAME,
-                COLUMN_TYPE
-            FROM
-                INFORMATION_SCHEMA.COLUMNS
-            WHERE
-                TABLE_SCHEMA = %s
-            AND TABLE_NAME = %s
-            ORDER BY
-                ORDINAL_POSITION;
-            """
+        columns_by_table = self.get_column_names_and_datatypes_for_tables(
+            [table_name])
+        if columns_by_table is None:
+            return None
+        column_info = columns_by_table.get(table_name, {})
+        if column_info:
+            logger.info(
+                f"""Fetched {len(column_info)}
+                columns for table {table_name}.""")
+        else:
+            logger.warning(
+                f"""No columns found for table
+                '{self.database_name}.{table_name}'.""")
+        return column_info
 
-        column_info = {}
+    def get_column_names_and_datatypes_for_tables(
+            self,
+            table_names: list[str]
+    ) -> dict[str, dict[str, str]] | None:
+        """
+        Same as get_column_name_and_datatype_from_table but for several
+        tables in a single schema query.
+        """
         try:
-            with DatabaseConnection(self.db_config, dictionary_cursor=False)\
-                    as cursor:
+            with self._cursor() as cursor:
                 logger.info(
-                    f"""Executing schema query for table:
-                    {self.database_name}.{table_name} (PyMySQL)""")
-                # %s placeholder is standard for PyMySQL too
-                cursor.execute(query, (self.database_name, table_name))
-                results = cursor.fetchall()
-
-                if results:
-                    # Access results by index for default cursor
-                    for row in results:
-                        column_info[row[0]] = row[1]
-                    logger.info(
-                        f"""Fetched {len(results)}
-                        columns for table {table_name}.""")
-                else:
-                    logger.warning(
-                        f"""No columns found for table
-                        '{self.database_name}.{table_name}'.""")
-
-        # Changed: Catch PyMySQL specific errors
+                    f"""Executing schema query for tables:
+                    {self.database_name}.{table_names} ({self.backend.name})""")
+                return self.backend.get_columns(
+                    cursor, self.database_name, table_names)
         except pymysql.Error as e:
             logger.error(f"""DB Error retrieving column
-            info for {table_name} (PyMySQL): {e}""")
+            info for {table_names} ({self.backend.name}): {e}""")
             return None
         except Exception as ex:
             logger.error(
-                f"Non-DB error retrieving column info for {table_name}: {ex}")
+                f"Non-DB error retrieving column info for {table_names}: {ex}")
             return None
-        return column_info
 
     def get_datatype_of_column(
         self,
         tablename: str,
         column_name: str
     ):
-        query = """
-            SELECT DATA_TYPE
-            FROM information_schema.COLUMNS
-            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s
-            """
         try:
-            # Use context manager, request dictionary cursor for easy access
-            with DatabaseConnection(
-                    self.db_config, dictionary_cursor=True) as cursor:
-                cursor.execute(
-                    query, (self.database_name, tablename, column_name))
-                result = cursor.fetchone()
-            if result:
-                # Access result by key 'DATA_TYPE' because of DictCursor
-                data_type = result['DATA_TYPE']
+            with self._cursor() as cursor:
+                data_type = self.backend.get_data_type(
+                    cursor, self.database_name, tablename, column_name)
+            if data_type:
                 logger.info(f"Data type of column {column_name}: {data_type}")
                 return data_type
             else:
                 logger.warning(
                     f"No data type found for column {column_name}.")
                 return None
-        # Changed: Catch general PyMySQL errors
         except pymysql.Error as e:
             logger.error(
                 f"""Error getting data type for
-                column {column_name} (PyMySQL): {e}""")
+                column {column_name} ({self.backend.name}): {e}""")
             raise
         except Exception as e:
             logger.error(
@@ -210,6 +471,33 @@ class DatabaseInterface:
                 data type for column {column_name}: {e}""")
             raise
 
+    def get_indexes(
+        self,
+        table_name: str,
+        unique_only: bool = False
+    ) -> dict[str, list[str]]:
+        """
+        Returns {index_name: [columns in index order]} of a table, only the
+        unique ones with unique_only.
+        """
+        with self._cursor() as cursor:
+            return self.backend.get_indexes(
+                cursor, self.database_name, table_name,
+                unique_only=unique_only)
+
+    def get_create_table(self, table_name: str) -> str | None:
+        """Returns the DDL of a table as stored by the database."""
+        with self._cursor() as cursor:
+            return self.backend.get_create_table(cursor, table_name)
+
+    def explain(self, query: str, params: tuple = None) -> list[dict]:
+        """
+        Returns the query plan of query, one dict (table, type, key, rows)
+        per accessed table in the shape of MySQL's EXPLAIN.
+        """
+        with self._cursor() as cursor:
+            return self.backend.explain(cursor, query, params)
+
     def get_values_from_column(
             self,
             table_name: str,
@@ -225,7 +513,7 @@ class DatabaseInterface:
         query += ";"
 
         try:
-            with DatabaseConnection(self.db_config) as cursor:
+            with self._cursor() as cursor:
                 cursor.execute(query)
                 results = cursor.fetchall()
                 if results:
@@ -246,3 +534,20 @@ class DatabaseInterface:
             logger.error(
                 f"Non-DB error executing query: {query}, Error: {e}")
             raise
+
+    def iter_values_from_column(
+            self,
+            table_name: str,
+            column_name: str,
+            chunk_size: int = 1000):
+        """
+        Streaming variant of get_values_from_column. Yields lists of up to
+        chunk_size non-null values.
+        """
+        query = f"""
+            SELECT {column_name}
+            FROM {table_name}
+            WHERE {column_name} IS NOT NULL
+            """
+        for rows in self.stream_query(query, chunk_size=chunk_size):
+            yield [row[0] for row in rows]
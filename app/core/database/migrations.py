@@ -0,0 +1,462 @@
+"""
+Versioned schema migrations for the btc instead tables.
+
+Run all pending migrations:
+    python -m app.core.database.migrations
+Check the query plans of the templates in queries.py for full scans:
+    python -m app.core.database.migrations --check
+Log the DDL of the tables as stored by the database, to compare the
+templates below with an existing (production) schema:
+    python -m app.core.database.migrations --show-schema
+
+Migrations are applied in version order and recorded in the
+SchemaMigrations table. Add new migrations to the end of MIGRATIONS and
+bump app_config["schema_cache"]["schema_version"] so cached column
+metadata is reloaded.
+"""
+import argparse
+import datetime as dt
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+import app.core.database.queries as queries
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+MIGRATIONS_TABLE_NAME = "SchemaMigrations"
+
+CREATE_MIGRATIONS_TABLE_TEMPLATE = """
+    CREATE TABLE IF NOT EXISTS {table_name} (
+        version INT NOT NULL PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at DATETIME NOT NULL
+    )
+"""
+
+CREATE_REDDIT_POSTS_TABLE_TEMPLATE = """
+    CREATE TABLE IF NOT EXISTS {table_name} (
+        post_id VARCHAR(16) NOT NULL PRIMARY KEY,
+        title TEXT,
+        username VARCHAR(64),
+        created_utc DOUBLE,
+        created_date DATE,
+        score INT,
+        upvote_ratio DOUBLE,
+        num_comments INT,
+        permalink VARCHAR(512),
+        user_url VARCHAR(512),
+        subreddit VARCHAR(64),
+        post_text MEDIUMTEXT,
+        is_self TINYINT(1),
+        stickied TINYINT(1),
+        spoiler TINYINT(1),
+        locked TINYINT(1),
+        is_gallery TINYINT(1),
+        is_direct_image_post TINYINT(1),
+        flair_text VARCHAR(255),
+        inline_images_in_text JSON,
+        markdown_image_urls JSON,
+        gallery_img_urls JSON,
+        image_post_url JSON,
+        processed TINYINT(1) NOT NULL DEFAULT 0,
+        is_portfolio TINYINT(1) NOT NULL DEFAULT 0,
+        failed TINYINT(1) NOT NULL DEFAULT 0
+    )
+"""
+
+CREATE_PORTFOLIOS_TABLE_TEMPLATE = """
+    CREATE TABLE IF NOT EXISTS {table_name} (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        source VARCHAR(32) NOT NULL,
+        source_id VARCHAR(64) NOT NULL,
+        total_investment DOUBLE,
+        start_value DOUBLE,
+        current_value DOUBLE,
+        profit_percentage DOUBLE,
+        profit_total DOUBLE,
+        btci_current_value DOUBLE,
+        btci_profit_percentage DOUBLE,
+        btci_profit_total DOUBLE,
+        created_date DATE,
+        updated_date DATE,
+        btci_start_amount DOUBLE,
+        CONSTRAINT uq_portfolios_source UNIQUE (source, source_id)
+    )
+"""
+
+CREATE_PURCHASES_TABLE_TEMPLATE = """
+    CREATE TABLE IF NOT EXISTS {table_name} (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        source VARCHAR(32) NOT NULL,
+        source_id VARCHAR(64) NOT NULL,
+        name VARCHAR(128) NOT NULL,
+        abbreviation VARCHAR(32) NOT NULL,
+        amount DOUBLE,
+        purchase_price_per_unit DOUBLE,
+        purchase_date DATE,
+        total_purchase_value DOUBLE,
+        CONSTRAINT uq_purchases_source_asset
+            UNIQUE (source, source_id, name, abbreviation, purchase_date)
+    )
+"""
+
+CREATE_CRYPTO_CURRENCY_PRICES_TABLE_TEMPLATE = """
+    CREATE TABLE IF NOT EXISTS {table_name} (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(128) NOT NULL,
+        abbreviation VARCHAR(32) NOT NULL,
+        price DOUBLE,
+        currency VARCHAR(8),
+        date DATE,
+        iso_week INT NOT NULL,
+        iso_year INT NOT NULL,
+        CONSTRAINT uq_ccprices_asset_week
+            UNIQUE (name, abbreviation, iso_week, iso_year)
+    )
+"""
+
+CREATE_CRYPTO_ASSETS_TABLE_TEMPLATE = """
+    CREATE TABLE IF NOT EXISTS {table_name} (
+        id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(128) NOT NULL,
+        abbreviation VARCHAR(32) NOT NULL,
+        cmc_id VARCHAR(128),
+        coin_gecko_id VARCHAR(128),
+        CONSTRAINT uq_ccassets_asset UNIQUE (name, abbreviation)
+    )
+"""
+
+
+class Index:
+    """A (possibly covering) secondary index on one of the app tables."""
+    def __init__(
+        self,
+        table_key: str,
+        name: str,
+        columns: list[str],
+        unique: bool = False
+    ):
+        self.table_key = table_key
+        self.name = name
+        self.columns = columns
+        self.unique = unique
+
+
+class Migration:
+    """
+    One schema version: table DDL templates (formatted with the table name
+    of table_key) followed by the indexes to create.
+    """
+    def __init__(
+        self,
+        version: int,
+        description: str,
+        tables: list[tuple[str, str]] = None,
+        indexes: list[Index] = None
+    ):
+        self.version = version
+        self.description = description
+        self.tables = tables or []
+        self.indexes = indexes or []
+
+
+MIGRATIONS = [
+    Migration(
+        version=1,
+        description="Create tables",
+        tables=[
+            ("reddit_posts", CREATE_REDDIT_POSTS_TABLE_TEMPLATE),
+            ("portfolios", CREATE_PORTFOLIOS_TABLE_TEMPLATE),
+            ("purchases", CREATE_PURCHASES_TABLE_TEMPLATE),
+            ("crypto_currency_prices",
+             CREATE_CRYPTO_CURRENCY_PRICES_TABLE_TEMPLATE),
+            ("crypto_assets", CREATE_CRYPTO_ASSETS_TABLE_TEMPLATE),
+        ]
+    ),
+    Migration(
+        version=2,
+        description="Add hot path indexes",
+        indexes=[
+            # Covers the weekly price lookups including the price itself
+            Index("crypto_currency_prices", "ix_ccprices_asset_week_price",
+                  ["name", "abbreviation", "iso_week", "iso_year", "price"]),
+            Index("purchases", "ix_purchases_source",
+                  ["source", "source_id", "purchase_date"]),
+            Index("portfolios", "ix_portfolios_source",
+                  ["source", "source_id", "created_date"]),
+            Index("reddit_posts", "ix_reddit_posts_processed_created",
+                  ["processed", "created_utc"]),
+            Index("crypto_assets", "ix_ccassets_abbreviation_name",
+                  ["abbreviation", "name"]),
+        ]
+    ),
+    Migration(
+        version=3,
+        description="Add covering index for reddit post status checks",
+        indexes=[
+            # Serves GET_REDDIT_POST_STATUSES_TEMPLATE from the index alone
+            Index("reddit_posts", "ix_reddit_posts_status",
+                  ["post_id", "processed", "is_portfolio", "failed"]),
+        ]
+    ),
+    Migration(
+        version=4,
+        description="Ensure the unique keys of the upserts",
+        indexes=[
+            # The ON DUPLICATE KEY UPDATE templates in queries.py and the
+            # CCAssets lookups rely on these keys. Tables created before
+            # version 1 may lack them.
+            Index("portfolios", "uq_portfolios_source",
+                  ["source", "source_id"], unique=True),
+            Index("purchases", "uq_purchases_source_asset",
+                  ["source", "source_id", "name", "abbreviation",
+                   "purchase_date"], unique=True),
+            Index("crypto_currency_prices", "uq_ccprices_asset_week",
+                  ["name", "abbreviation", "iso_week", "iso_year"],
+                  unique=True),
+            Index("crypto_assets", "uq_ccassets_asset",
+                  ["name", "abbreviation"], unique=True),
+        ]
+    ),
+]
+
+# Table and format arguments needed to EXPLAIN the templates in queries.py
+QUERY_PLAN_CHECKS = {
+    "UPDATE_PORTFOLIO_STATUS_OF_POST_TEMPLATE": {
+        "table_key": "reddit_posts"},
+    "UPDATE_PORTFOLIO_TEMPLATE": {
+        "table_key": "portfolios"},
+    "GET_PURCHASES_BY_SOURCE_ID_TEMPLATE": {
+        "table_key": "purchases"},
+    "GET_PORTFOLIO_BY_SOURCE_ID_TEMPLATE": {
+        "table_key": "portfolios"},
+    "GET_CRYPTO_CURRENCY_PRICES_BY_KEYS_TEMPLATE": {
+        "table_key": "crypto_currency_prices",
+        "format": {"placeholders": "(%s, %s, %s, %s)"}},
+    "GET_UNPROCESSED_REDDIT_POSTS_TEMPLATE": {
+        "table_key": "reddit_posts",
+        "params": (10,)},
+    "STREAM_UNPROCESSED_REDDIT_POSTS_TEMPLATE": {
+        "table_key": "reddit_posts"},
+    "GET_REDDIT_POST_STATUSES_TEMPLATE": {
+        "table_key": "reddit_posts",
+        "format": {"placeholders": "%s, %s"}},
+    "GET_UNPROCESSED_REDDIT_POST_IDS_TEMPLATE": {
+        "table_key": "reddit_posts",
+        "params": (10,)},
+}
+
+# EXPLAIN access types that read the whole table or index
+FULL_SCAN_TYPES = {"ALL", "index"}
+
+
+class MigrationRunner:
+    def __init__(self, db_interface):
+        self.db_interface = db_interface
+
+    def ensure_migrations_table(self):
+        self.db_interface.execute_query(
+            CREATE_MIGRATIONS_TABLE_TEMPLATE.format(
+                table_name=MIGRATIONS_TABLE_NAME)
+        )
+
+    def get_applied_versions(self) -> set[int]:
+        self.ensure_migrations_table()
+        result = self.db_interface.execute_query(
+            f"SELECT version FROM {MIGRATIONS_TABLE_NAME}"
+        )
+        return {row[0] for row in result}
+
+    def get_current_version(self) -> int:
+        return max(self.get_applied_versions(), default=0)
+
+    def get_pending_migrations(
+        self,
+        target_version: int = None
+    ) -> list[Migration]:
+        applied_versions = self.get_applied_versions()
+        return [
+            migration for migration in
+            sorted(MIGRATIONS, key=lambda m: m.version)
+            if migration.version not in applied_versions
+            and (target_version is None or migration.version <= target_version)
+        ]
+
+    def migrate(self, target_version: int = None) -> list[int]:
+        """
+        Applies all pending migrations up to target_version.
+        Returns the applied versions.
+        """
+        applied = []
+        for migration in self.get_pending_migrations(target_version):
+            logger.info(
+                f"Applying migration {migration.version}: "
+                f"{migration.description}")
+            for table_key, template in migration.tables:
+                self.db_interface.execute_query(template.format(
+                    table_name=self.db_interface.tables[table_key].name))
+            for index in migration.indexes:
+                self.create_index(index)
+            self.db_interface.execute_query(
+                f"""INSERT INTO {MIGRATIONS_TABLE_NAME}
+                (version, description, applied_at) VALUES (%s, %s, %s)""",
+                (migration.version, migration.description,
+                 dt.datetime.now())
+            )
+            applied.append(migration.version)
+        if applied:
+            self.db_interface.refresh_schema()
+            logger.info(f"Applied migrations: {applied}")
+        else:
+            logger.info("Database schema is up to date.")
+        return applied
+
+    def create_index(self, index: Index):
+        """
+        Creates the index unless an index with the same name, or one that
+        starts with the same columns, already exists. A unique index is
+        only skipped for a unique index on the same columns; rows that
+        would violate it raise ValueError before anything is created.
+        """
+        table_name = self.db_interface.tables[index.table_key].name
+        indexes = self.db_interface.get_indexes(
+            table_name, unique_only=index.unique)
+        for name, columns in indexes.items():
+            if index.unique:
+                covers = sorted(columns) == sorted(index.columns)
+            else:
+                covers = columns[:len(index.columns)] == index.columns
+            if name == index.name or covers:
+                logger.info(
+                    f"Index {name} on {table_name} already covers "
+                    f"{index.columns}. Skipping {index.name}.")
+                return
+        if index.unique:
+            self.check_duplicates(table_name, index)
+        self.db_interface.execute_query(
+            f"""CREATE {'UNIQUE ' if index.unique else ''}INDEX {index.name}
+            ON {table_name} ({', '.join(index.columns)})"""
+        )
+        logger.info(f"Created index {index.name} on {table_name}.")
+
+    def check_duplicates(self, table_name: str, index: Index):
+        """Raises ValueError if rows of the table share the index columns."""
+        columns = ", ".join(index.columns)
+        duplicates = self.db_interface.execute_query(
+            f"""SELECT {columns}, COUNT(*) FROM {table_name}
+            GROUP BY {columns} HAVING COUNT(*) > 1 LIMIT 5"""
+        )
+        if duplicates:
+            raise ValueError(
+                f"Cannot create unique index {index.name} on {table_name}: "
+                f"duplicate rows for {index.columns}, e.g. "
+                f"{list(duplicates)}. Merge them and migrate again.")
+
+    def get_schema(self) -> dict[str, str | None]:
+        """{table name: DDL as stored by the database} of the app tables."""
+        table_keys = {
+            table_key for migration in MIGRATIONS
+            for table_key, _ in migration.tables
+        }
+        return {
+            self.db_interface.tables[table_key].name:
+                self.db_interface.get_create_table(
+                    self.db_interface.tables[table_key].name)
+            for table_key in sorted(table_keys)
+        }
+
+    def check_query_plans(self) -> list[dict]:
+        """
+        Runs EXPLAIN on every query template in queries.py that reads from
+        or updates a table and flags the ones that scan a whole table.
+        """
+        report = []
+        for template_name, template in sorted(vars(queries).items()):
+            if not template_name.endswith("_TEMPLATE") or \
+                    template.strip().upper().startswith("INSERT"):
+                continue
+            check = QUERY_PLAN_CHECKS.get(template_name)
+            if check is None:
+                logger.warning(
+                    f"No query plan check configured for {template_name}.")
+                report.append({
+                    "template": template_name,
+                    "checked": False,
+                    "full_scan": None
+                })
+                continue
+            table_name = self.db_interface.tables[check["table_key"]].name
+            query = template.format(
+                table_name=table_name, **check.get("format", {}))
+            params = check.get("params") or \
+                ("",) * query.count("%s")
+            plan = self.db_interface.explain(query, params)
+            for row in plan:
+                full_scan = row.get("type") in FULL_SCAN_TYPES
+                report.append({
+                    "template": template_name,
+                    "checked": True,
+                    "table": row.get("table"),
+                    "type": row.get("type"),
+                    "key": row.get("key"),
+                    "rows": row.get("rows"),
+                    "full_scan": full_scan
+                })
+                if full_scan:
+                    logger.warning(
+                        f"{template_name} scans {row.get('table')} "
+                        f"(type={row.get('type')}, rows={row.get('rows')}).")
+        return report
+
+
+def main():
+    from app.core.database.db_interface import DatabaseInterface
+    import app.core.secret_handler as secrets
+
+    parser = argparse.ArgumentParser(
+        description="Apply schema migrations or check query plans.")
+    parser.add_argument(
+        "--check", action="store_true",
+        help="Run EXPLAIN on the query templates instead of migrating.")
+    parser.add_argument(
+        "--show-schema", action="store_true",
+        help="Log the DDL of the tables as stored by the database.")
+    parser.add_argument(
+        "--target", type=int, default=None,
+        help="Migrate up to this version (default: latest).")
+    parser.add_argument(
+        "--backend", choices=["mysql", "sqlite"], default=None,
+        help="Database backend (default: app_config['database']).")
+    parser.add_argument(
+        "--sqlite-path", default=None,
+        help="SQLite database file for the sqlite backend.")
+    args = parser.parse_args()
+
+    secret_config = secrets.get_config()
+    db_interface = DatabaseInterface(
+        host=secret_config.get("MYSQL_HOST"),
+        user=secret_config.get("MYSQL_USERNAME"),
+        password=secret_config.get("MYSQL_KEY"),
+        database=secret_config.get("MYSQL_DBNAME"),
+        is_ssh_tunnel=True
+        if secret_config.get("ENVIRONMENT") == "local" else False,
+        backend=args.backend,
+        sqlite_path=args.sqlite_path
+    )
+    runner = MigrationRunner(db_interface)
+    if args.show_schema:
+        for table_name, ddl in runner.get_schema().items():
+            logger.info(f"{table_name}:\n{ddl}")
+        return
+    if args.check:
+        report = runner.check_query_plans()
+        full_scans = [entry for entry in report if entry["full_scan"]]
+        for entry in report:
+            logger.info(entry)
+        raise SystemExit(1 if full_scans else 0)
+    runner.migrate(target_version=args.target)
+
+
+if __name__ == "__main__":
+    main()
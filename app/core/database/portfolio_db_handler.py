@@ -25,17 +25,22 @@ def portfolio_already_exists(
     """
     Check if the portfolio already exists in the database.
     """
-    sql_query = f"""
-        SELECT * FROM {db_interface.tables["portfolios"].name}
-        WHERE source = %s AND source_id = %s
-    """
     result = db_interface.execute_query(
-        sql_query,
-        (source, source_id)
+        _portfolio_exists_query(db_interface),
+        (source, source_id),
+        cache_table="portfolios"
     )
     return len(result) > 0
 
 
+def _portfolio_exists_query(db_interface) -> str:
+    return f"""
+        SELECT 1 FROM {db_interface.tables["portfolios"].name}
+        WHERE source = %s AND source_id = %s
+        LIMIT 1
+    """
+
+
 def upload_purchase_to_db(
         db_interface: DatabaseInterface,
         source: str,
@@ -77,6 +82,9 @@ def upload_purchase_to_db(
             f"Error inserting purchase: {e}",
             exc_info=True
         )
+        # Let an open transaction roll back instead of committing the rest
+        if db_interface.in_transaction:
+            raise
         error = True
     return error
 
@@ -100,7 +108,8 @@ def get_purchases_for_portfolio(
     purchases = db_interface.execute_query(
         sql_query,
         (source, source_id),
-        dictionary_cursor=True
+        dictionary_cursor=True,
+        cache_table="purchases"
     )
     if not purchases:
         logger.warning(
@@ -128,7 +137,8 @@ def get_portfolio_by_source_id(
     portfolio = db_interface.execute_query(
         sql_query,
         (source, source_id),
-        dictionary_cursor=True
+        dictionary_cursor=True,
+        cache_table="portfolios"
     )
     if not portfolio:
         logger.warning(
@@ -112,3 +112,34 @@ GET_PORTFOLIO_BY_SOURCE_ID_TEMPLATE = """
     WHERE source = %s AND source_id = %s
     ORDER BY created_date DESC
 """
+
+GET_CRYPTO_CURRENCY_PRICES_BY_KEYS_TEMPLATE = """
+    SELECT * FROM {table_name}
+    WHERE (name, abbreviation, iso_week, iso_year) IN ({placeholders})
+"""
+
+GET_UNPROCESSED_REDDIT_POSTS_TEMPLATE = """
+    SELECT * FROM {table_name}
+    WHERE processed = 0
+    ORDER BY created_utc ASC
+    LIMIT %s
+"""
+
+STREAM_UNPROCESSED_REDDIT_POSTS_TEMPLATE = """
+    SELECT * FROM {table_name}
+    WHERE processed = 0
+    ORDER BY created_utc ASC
+"""
+
+GET_REDDIT_POST_STATUSES_TEMPLATE = """
+    SELECT post_id, processed, is_portfolio, failed
+    FROM {table_name}
+    WHERE post_id IN ({placeholders})
+"""
+
+GET_UNPROCESSED_REDDIT_POST_IDS_TEMPLATE = """
+    SELECT post_id FROM {table_name}
+    WHERE processed = 0
+    ORDER BY created_utc ASC
+    LIMIT %s
+"""
@@ -0,0 +1,171 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+# INSERT INTO t / UPDATE t / DELETE FROM t / REPLACE INTO t
+_WRITE_STATEMENT = re.compile(
+    r"^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|UPDATE|DELETE\s+FROM|REPLACE\s+INTO)"
+    r"\s+`?(\w+)`?",
+    re.IGNORECASE)
+_SCHEMA_STATEMENT = re.compile(
+    r"^\s*(?:CREATE|ALTER|DROP|TRUNCATE|RENAME)\b", re.IGNORECASE)
+
+# Marker for "invalidate every table of the database"
+ALL_TABLES = "*"
+
+
+def get_written_table(query: str) -> str | None:
+    """
+    Returns the table a write statement modifies, ALL_TABLES for schema
+    changes and None for reads.
+    """
+    match = _WRITE_STATEMENT.match(query)
+    if match:
+        return match.group(1)
+    if _SCHEMA_STATEMENT.match(query):
+        return ALL_TABLES
+    return None
+
+
+def make_cache_key(
+    database: str,
+    table_name: str,
+    query: str,
+    params,
+    dictionary_cursor: bool
+) -> tuple:
+    return (
+        database,
+        table_name.lower(),
+        " ".join(query.split()),
+        tuple(params) if params is not None else None,
+        dictionary_cursor
+    )
+
+
+def _copy_result(result):
+    # Dict rows are mutable, so every caller gets its own copy
+    return [dict(row) if isinstance(row, dict) else row for row in result]
+
+
+class QueryCache:
+    """
+    Read-through cache for whitelisted, idempotent SELECTs, keyed by
+    database, table, query and parameters. Results live in two tiers: the
+    process-wide LRU below, where entries expire after the TTL of their
+    table, and an optional request scope (a plain dict owned by the
+    caller) that keeps them for the rest of the request. A write to a
+    table drops that table's entries from both tiers.
+    """
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_entries: int = 1024,
+        ttl: dict[str, float] = None
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        # {table key: seconds}; tables without a TTL are request-scoped only
+        self.ttl = ttl or {}
+        self._entries: OrderedDict[tuple, tuple[float, object]] = \
+            OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation, so a read that raced a write is not
+        # cached: {(database, table name or ALL_TABLES): generation}
+        self._generations: dict[tuple, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, request_scope: dict = None) -> tuple[bool, object]:
+        """Returns (hit, result)."""
+        if not self.enabled:
+            return False, None
+        if request_scope is not None and key in request_scope:
+            with self._lock:
+                self.hits += 1
+            return True, _copy_result(request_scope[key])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                result = entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+        if request_scope is not None:
+            request_scope[key] = result
+        return True, _copy_result(result)
+
+    def generation(self, key: tuple) -> tuple[int, int]:
+        """Current invalidation generation of the table of a cache key."""
+        with self._lock:
+            return (
+                self._generations.get((key[0], ALL_TABLES), 0),
+                self._generations.get((key[0], key[1]), 0)
+            )
+
+    def put(
+        self,
+        key: tuple,
+        table_key: str,
+        result,
+        generation: tuple[int, int],
+        request_scope: dict = None
+    ):
+        """
+        Stores the result of a read that started at generation (see
+        generation()). Dropped if the table was written in the meantime.
+        """
+        if not self.enabled or self.generation(key) != generation:
+            return
+        result = _copy_result(result)
+        if request_scope is not None:
+            request_scope[key] = result
+        ttl = self.ttl.get(table_key)
+        if not ttl:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(
+        self,
+        database: str,
+        table_name: str = ALL_TABLES,
+        request_scope: dict = None
+    ):
+        """Drops the cached results of one table (or all) of a database."""
+        table_name = table_name.lower()
+
+        def matches(key):
+            return key[0] == database and \
+                (table_name == ALL_TABLES or key[1] == table_name)
+
+        if request_scope is not None:
+            for key in [key for key in request_scope if matches(key)]:
+                del request_scope[key]
+        with self._lock:
+            generation_key = (database, table_name)
+            self._generations[generation_key] = \
+                self._generations.get(generation_key, 0) + 1
+            for key in [key for key in self._entries if matches(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+query_cache = QueryCache(**app_config.get("query_cache", {}))
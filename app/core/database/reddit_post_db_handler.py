@@ -4,20 +4,20 @@ from app.core.utils.utils import set_logger
 from app.core.entities.reddit_post import RedditPost
 from app.core.database.queries import (
     INSERT_REDDIT_POST_UPDATE_TEMPLATE,
-    UPDATE_PORTFOLIO_STATUS_OF_POST_TEMPLATE
+    UPDATE_PORTFOLIO_STATUS_OF_POST_TEMPLATE,
+    GET_UNPROCESSED_REDDIT_POSTS_TEMPLATE,
+    STREAM_UNPROCESSED_REDDIT_POSTS_TEMPLATE,
+    GET_REDDIT_POST_STATUSES_TEMPLATE,
+    GET_UNPROCESSED_REDDIT_POST_IDS_TEMPLATE
 )
 logger = set_logger(name=__name__)
 
 
 def get_unprocessed_reddit_posts(db_interface, n_posts):
-    # Query remains the same
-    query = f"""
-        SELECT * FROM {db_interface.tables["reddit_posts"].name}
-        WHERE processed = 0
-        ORDER BY created_utc ASC
-        LIMIT {n_posts};
-        """
-    results = db_interface.execute_query(query)
+    query = GET_UNPROCESSED_REDDIT_POSTS_TEMPLATE.format(
+        table_name=db_interface.tables["reddit_posts"].name
+    )
+    results = db_interface.execute_query(query, (int(n_posts),))
     if results:
         logger.info(
             f"""Fetched {len(results)} unprocessed reddit posts
@@ -32,6 +32,90 @@ def get_unprocessed_reddit_posts(db_interface, n_posts):
         return []
 
 
+def get_unprocessed_reddit_post_ids(db_interface, n_posts) -> list[str]:
+    """
+    IDs of the n_posts oldest unprocessed posts. Reads only the
+    (processed, created_utc) index, which also holds the post_id.
+    """
+    query = GET_UNPROCESSED_REDDIT_POST_IDS_TEMPLATE.format(
+        table_name=db_interface.tables["reddit_posts"].name
+    )
+    results = db_interface.execute_query(query, (int(n_posts),))
+    return [row[0] for row in results]
+
+
+def _get_reddit_post_statuses_query(db_interface, n_post_ids: int) -> str:
+    return GET_REDDIT_POST_STATUSES_TEMPLATE.format(
+        table_name=db_interface.tables["reddit_posts"].name,
+        placeholders=','.join(['%s'] * n_post_ids)
+    )
+
+
+def _reddit_post_status_from_row(row: tuple) -> dict:
+    return {
+        "processed": bool(row[1]),
+        "is_portfolio": bool(row[2]),
+        "failed": bool(row[3])
+    }
+
+
+def get_reddit_post_statuses(
+        db_interface,
+        post_ids: list[str],
+        chunk_size: int = 500,
+        use_cache: bool = True
+) -> dict[str, dict]:
+    """
+    Returns {post_id: {"processed", "is_portfolio", "failed"}} for the
+    given posts without loading their text or image columns. Posts that are
+    not in the database are missing from the result. Pass use_cache=False
+    to read statuses that may have changed earlier in the same request.
+    """
+    statuses = {}
+    post_ids = list(dict.fromkeys(post_ids))
+    for start in range(0, len(post_ids), chunk_size):
+        chunk = tuple(post_ids[start:start + chunk_size])
+        results = db_interface.execute_query(
+            _get_reddit_post_statuses_query(db_interface, len(chunk)),
+            chunk,
+            cache_table="reddit_posts" if use_cache else None
+        )
+        for row in results:
+            statuses[row[0]] = _reddit_post_status_from_row(row)
+    return statuses
+
+
+def iter_unprocessed_reddit_posts(db_interface, chunk_size: int = 500):
+    """
+    Streams all unprocessed reddit posts (oldest first) and yields them as
+    lists of up to chunk_size RedditPost objects. Memory use is bounded by
+    chunk_size instead of the number of unprocessed posts.
+    """
+    query = STREAM_UNPROCESSED_REDDIT_POSTS_TEMPLATE.format(
+        table_name=db_interface.tables["reddit_posts"].name
+    )
+    n_posts = 0
+    for rows in db_interface.stream_query(query, chunk_size=chunk_size):
+        n_posts += len(rows)
+        yield [RedditPost.from_db_row(row) for row in rows]
+    logger.info(
+        f"""Streamed {n_posts} unprocessed reddit posts
+        from {db_interface.tables["reddit_posts"].name} (PyMySQL).""")
+
+
+def iter_reddit_posts(db_interface, chunk_size: int = 500):
+    """
+    Streams the whole reddit posts table for backfill and reprocessing
+    jobs. Yields lists of up to chunk_size RedditPost objects.
+    """
+    query = f"""
+        SELECT * FROM {db_interface.tables["reddit_posts"].name}
+        ORDER BY created_utc ASC
+    """
+    for rows in db_interface.stream_query(query, chunk_size=chunk_size):
+        yield [RedditPost.from_db_row(row) for row in rows]
+
+
 def delete_reddit_posts(db_interface, post_ids: list[str]):
     if not post_ids:
         logger.warning("No post IDs provided for deletion.")
@@ -71,6 +155,35 @@ def update_portfolio_status_in_db(
         logger.error(
             f"""Failed to update is_portfolio
             for post_id: {post_id}. Error: {e}""")
+        # Let an open transaction roll back instead of committing the rest
+        if db_interface.in_transaction:
+            raise
+
+
+def _serialize_reddit_post(reddit_post: dict, json_columns: list[str]) -> tuple:
+    """
+    Dumps the JSON columns of a fetched reddit post and returns the value
+    tuple in the column order of INSERT_REDDIT_POST_UPDATE_TEMPLATE.
+    """
+    processed_post = reddit_post.copy()
+    for column in json_columns:
+        if column in processed_post and\
+                processed_post[column] is not None:
+            # Ensure data is not already a string before dumping
+            if not isinstance(processed_post[column], str):
+                processed_post[column] = json.dumps(
+                        processed_post[column])
+    return (
+        processed_post.get('post_id'), processed_post.get('title'), processed_post.get('username'),
+        processed_post.get('created_utc'), processed_post.get('created_date'), processed_post.get('score'),
+        processed_post.get('upvote_ratio'), processed_post.get('num_comments'),
+        processed_post.get('permalink'), processed_post.get('user_url'), processed_post.get('subreddit'),
+        processed_post.get('post_text'), processed_post.get('is_self'), processed_post.get('stickied'),
+        processed_post.get('spoiler'), processed_post.get('locked'), processed_post.get('is_gallery'),
+        processed_post.get('is_direct_image_post'), processed_post.get('flair_text'),
+        processed_post.get('inline_images_in_text'), processed_post.get('markdown_image_urls'),
+        processed_post.get('gallery_img_urls'), processed_post.get('image_post_url')
+    )
 
 
 def insert_reddit_posts_to_db(
@@ -78,31 +191,13 @@ def insert_reddit_posts_to_db(
     reddit_post: dict
 ):
     logger.debug("Starting to insert reddit post into DB.")
-    processed_post = reddit_post.copy()
     if db_interface.tables["reddit_posts"].columns:
         json_columns = db_interface.tables["reddit_posts"].\
                 get_json_columns()
-        for column in json_columns:
-            if column in processed_post and\
-                    processed_post[column] is not None:
-                # Ensure data is not already a string before dumping
-                if not isinstance(processed_post[column], str):
-                    processed_post[column] = json.dumps(
-                            processed_post[column])
     else:
         logger.error("Cannot insert reddit post: Table columns not loaded.")
         return None
-    post_data_tuple = (
-            processed_post.get('post_id'), processed_post.get('title'), processed_post.get('username'),
-            processed_post.get('created_utc'), processed_post.get('created_date'), processed_post.get('score'),
-            processed_post.get('upvote_ratio'), processed_post.get('num_comments'),
-            processed_post.get('permalink'), processed_post.get('user_url'), processed_post.get('subreddit'),
-            processed_post.get('post_text'), processed_post.get('is_self'), processed_post.get('stickied'),
-            processed_post.get('spoiler'), processed_post.get('locked'), processed_post.get('is_gallery'),
-            processed_post.get('is_direct_image_post'), processed_post.get('flair_text'),
-            processed_post.get('inline_images_in_text'), processed_post.get('markdown_image_urls'),
-            processed_post.get('gallery_img_urls'), processed_post.get('image_post_url')
-        )
+    post_data_tuple = _serialize_reddit_post(reddit_post, json_columns)
 
     if not post_data_tuple:
         logger.warning(
@@ -112,14 +207,86 @@ def insert_reddit_posts_to_db(
     # Query formatting remains the same
     final_query = INSERT_REDDIT_POST_UPDATE_TEMPLATE.format(
         table_name=db_interface.tables["reddit_posts"].name)
-    
-        
+
     _ = db_interface.execute_query(final_query, post_data_tuple)
     logger.info(
-        f"""Inserted reddit post {processed_post.get('post_id')}
+        f"""Inserted reddit post {reddit_post.get('post_id')}
         into {db_interface.tables["reddit_posts"].name} (PyMySQL).""")
 
 
+def get_existing_reddit_post_ids(
+        db_interface,
+        post_ids: list[str],
+        chunk_size: int = 500
+) -> set[str]:
+    """
+    Return the subset of post_ids that already exist in the database.
+    """
+    existing_ids = set()
+    for start in range(0, len(post_ids), chunk_size):
+        chunk = post_ids[start:start + chunk_size]
+        select_query = f"""
+            SELECT post_id FROM {db_interface.tables["reddit_posts"].name}
+            WHERE post_id IN ({','.join(['%s'] * len(chunk))})
+        """
+        results = db_interface.execute_query(select_query, chunk)
+        existing_ids.update(row[0] for row in results)
+    return existing_ids
+
+
+def insert_reddit_posts_bulk_to_db(
+    db_interface,
+    reddit_posts: list[dict],
+    chunk_size: int = 500
+) -> dict:
+    """
+    Upsert many fetched reddit posts at once. JSON columns are resolved
+    once per batch and the posts are written in chunks of chunk_size with a
+    multi-row INSERT ... ON DUPLICATE KEY UPDATE inside one transaction.
+    Args:
+        db_interface: Database interface to execute queries.
+        reddit_posts (list[dict]): Posts as returned by RedditFetcher.
+        chunk_size (int): Number of posts per statement.
+    Returns:
+        dict: {"inserted": int, "updated": int}
+    """
+    counts = {"inserted": 0, "updated": 0}
+    if not reddit_posts:
+        logger.warning("No reddit posts provided for bulk insert.")
+        return counts
+    if not db_interface.tables["reddit_posts"].columns:
+        logger.error("Cannot insert reddit posts: Table columns not loaded.")
+        return counts
+    json_columns = db_interface.tables["reddit_posts"].get_json_columns()
+
+    # Later duplicates of the same post win, like sequential upserts would
+    unique_posts = {}
+    for post in reddit_posts:
+        if post.get('post_id'):
+            unique_posts[post['post_id']] = post
+    post_ids = list(unique_posts)
+
+    post_data_tuples = [
+        _serialize_reddit_post(post, json_columns)
+        for post in unique_posts.values()
+    ]
+    final_query = INSERT_REDDIT_POST_UPDATE_TEMPLATE.format(
+        table_name=db_interface.tables["reddit_posts"].name)
+    with db_interface.transaction():
+        existing_ids = get_existing_reddit_post_ids(
+            db_interface, post_ids, chunk_size=chunk_size)
+        db_interface.execute_many(
+            final_query, post_data_tuples, chunk_size=chunk_size)
+
+    counts["updated"] = len(existing_ids)
+    counts["inserted"] = len(post_ids) - len(existing_ids)
+    logger.info(
+        f"""Bulk upserted {len(post_ids)} reddit posts into
+        {db_interface.tables["reddit_posts"].name}: {counts['inserted']}
+        inserted, {counts['updated']} updated (PyMySQL).""")
+    return counts
+
+
 def get_reddit_post_by_id_from_db(
         db_interface,
         post_id: str
@@ -128,16 +295,14 @@ def get_reddit_post_by_id_from_db(
         logger.warning("No post ID provided for retrieval.")
         return None
 
-    # Use a parameterized query to prevent SQL injection
-    select_query = f"""
-        SELECT * FROM {db_interface.tables["reddit_posts"].name}
-        WHERE post_id = %s
-    """
+    # Same query as get_reddit_posts([post_id]), so both share cache entries
+    select_query = _get_reddit_posts_query(db_interface, 1)
     logger.info(
         f"""Fetching reddit post by post_id from {
             db_interface.tables["reddit_posts"].name}
         (PyMySQL).""")
-    result = db_interface.execute_query(select_query, (post_id,))
+    result = db_interface.execute_query(
+        select_query, (post_id,), cache_table="reddit_posts")
     
     if result:
         return RedditPost.from_db_row(result[0])
@@ -154,17 +319,40 @@ def get_reddit_posts(
         logger.warning("No post IDs provided for retrieval.")
         return []
 
-    # Use a parameterized query to prevent SQL injection
-    select_query = f"""
-        SELECT * FROM {db_interface.tables["reddit_posts"].name}
-        WHERE post_id IN ({','.join(['%s'] * len(post_ids))})
-    """
+    select_query = _get_reddit_posts_query(db_interface, len(post_ids))
     logger.info(
         f"""Fetching reddit posts by post_id from {
             db_interface.tables["reddit_posts"].name}
         (PyMySQL).""")            
-    results = db_interface.execute_query(select_query, post_ids)
+    results = db_interface.execute_query(
+        select_query, tuple(post_ids), cache_table="reddit_posts")
     reddit_posts = []
     for post in results:
         reddit_posts.append(RedditPost.from_db_row(post))
     return reddit_posts
+
+
+def _get_reddit_posts_query(db_interface, n_post_ids: int) -> str:
+    # Use a parameterized query to prevent SQL injection
+    return f"""
+        SELECT * FROM {db_interface.tables["reddit_posts"].name}
+        WHERE post_id IN ({','.join(['%s'] * n_post_ids)})
+    """
+
+
+async def insert_reddit_posts_to_db_async(
+    db_interface,
+    reddit_post: dict
+):
+    """insert_reddit_posts_to_db for an AsyncDatabaseInterface."""
+    if not db_interface.tables["reddit_posts"].columns:
+        logger.error("Cannot insert reddit post: Table columns not loaded.")
+        return None
+    post_data_tuple = _serialize_reddit_post(
+        reddit_post, db_interface.tables["reddit_posts"].get_json_columns())
+    final_query = INSERT_REDDIT_POST_UPDATE_TEMPLATE.format(
+        table_name=db_interface.tables["reddit_posts"].name)
+    await db_interface.execute_query(final_query, post_data_tuple)
+    logger.info(
+        f"""Inserted reddit post {reddit_post.get('post_id')}
+        into {db_interface.tables["reddit_posts"].name} (aiomysql).""")
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import threading
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+
+class SchemaCache:
+    """
+    Process-wide cache of table column metadata ({column: column_type}),
+    keyed by database name and schema_version. Optionally mirrored to an
+    on-disk JSON snapshot so a fresh process does not need to query
+    INFORMATION_SCHEMA either. Entries are only valid for the
+    schema_version they were stored with, so raising it in-process reloads
+    the column metadata.
+    """
+    def __init__(
+        self,
+        schema_version: int = 1,
+        use_snapshot: bool = False,
+        snapshot_dir: str = "data/cache"
+    ):
+        self.schema_version = schema_version
+        self.use_snapshot = use_snapshot
+        self.snapshot_dir = snapshot_dir
+        # {(database, schema_version): {table: {column: column_type}}}
+        self._schemas: dict[tuple, dict[str, dict[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(columns_by_table: dict[str, dict[str, str]]) -> str:
+        """Stable hash over table names, column names and column types."""
+        payload = json.dumps(columns_by_table, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_snapshot_path(self, database: str) -> str:
+        return os.path.join(self.snapshot_dir, f"schema_{database}.json")
+
+    def get(
+        self,
+        database: str,
+        table_names: list[str]
+    ) -> dict[str, dict[str, str]] | None:
+        """
+        Returns the cached columns for all table_names or None if any of
+        them is unknown for this schema version.
+        """
+        with self._lock:
+            key = (database, self.schema_version)
+            schema = self._schemas.get(key)
+            if schema is None and self.use_snapshot:
+                schema = self._load_snapshot(database)
+                if schema is not None:
+                    self._schemas[key] = schema
+            if schema is None or \
+                    not all(name in schema for name in table_names):
+                return None
+            return {name: dict(schema[name]) for name in table_names}
+
+    def put(self, database: str, columns_by_table: dict[str, dict[str, str]]):
+        with self._lock:
+            schema = self._schemas.setdefault(
+                (database, self.schema_version), {})
+            schema.update(columns_by_table)
+            if self.use_snapshot:
+                self._write_snapshot(database, schema)
+
+    def invalidate(self, database: str = None):
+        """Drops cached metadata (and snapshot) for one or all databases."""
+        with self._lock:
+            databases = [database] if database else \
+                list({name for name, _ in self._schemas})
+            for key in list(self._schemas):
+                if key[0] in databases:
+                    self._schemas.pop(key)
+            for name in databases:
+                if self.use_snapshot:
+                    try:
+                        os.remove(self.get_snapshot_path(name))
+                    except FileNotFoundError:
+                        pass
+
+    def _load_snapshot(self, database: str):
+        path = self.get_snapshot_path(database)
+        try:
+            with open(path, "r") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable schema snapshot {path}: {e}")
+            return None
+        tables = snapshot.get("tables", {})
+        if snapshot.get("database") != database or \
+                snapshot.get("schema_version") != self.schema_version or \
+                snapshot.get("fingerprint") != self.fingerprint(tables):
+            logger.info(f"Schema snapshot {path} is stale. Ignoring it.")
+            return None
+        logger.info(f"Loaded schema snapshot for {database} from {path}.")
+        return tables
+
+    def _write_snapshot(self, database: str, schema: dict):
+        path = self.get_snapshot_path(database)
+        snapshot = {
+            "database": database,
+            "schema_version": self.schema_version,
+            "fingerprint": self.fingerprint(schema),
+            "tables": schema
+        }
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write schema snapshot {path}: {e}")
+
+
+schema_cache = SchemaCache(**app_config.get("schema_cache", {}))
@@ -0,0 +1,146 @@
+import atexit
+import os
+import threading
+from sshtunnel import SSHTunnelForwarder
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+REQUIRED_SSH_KEYS = [
+    'ssh_host',
+    'ssh_port',
+    'ssh_private_key_path',
+    'ssh_user'
+]
+
+
+def start_ssh_tunnel(db_config: dict, keepalive_interval: float = 0):
+    """
+    Starts an SSH tunnel to the database host described by db_config.
+    Returns the started SSHTunnelForwarder or None if it failed.
+    """
+    logger.info("Attempting to start SSH tunnel...")
+    if not all(k in db_config for k in REQUIRED_SSH_KEYS):
+        logger.error("Missing required SSH configuration keys for tunnel.")
+        return None
+
+    try:
+        ssh_key_path = os.path.expanduser(
+                db_config['ssh_private_key_path'])
+        if not os.path.exists(ssh_key_path):
+            logger.error(
+                    f"SSH private key not found at: {ssh_key_path}")
+            return None
+
+        tunnel = SSHTunnelForwarder(
+            ssh_address_or_host=(
+                    db_config['ssh_host'],
+                    int(db_config.get('ssh_port', 22))),
+            ssh_username=db_config['ssh_user'],
+            ssh_pkey=ssh_key_path,
+            remote_bind_address=(
+                    db_config['db_host'],
+                    int(db_config.get('db_port', 3306))),
+            local_bind_address=('127.0.0.1', 0),
+            set_keepalive=keepalive_interval
+        )
+        tunnel.start()
+        logger.info(
+            f"""SSH tunnel established.
+            Local bind port: {tunnel.local_bind_port}""")
+        return tunnel
+    except Exception as e:
+        logger.error(f"Failed to start SSH tunnel: {e}")
+        return None
+
+
+def stop_ssh_tunnel(tunnel):
+    """Stops an SSH tunnel if it is still active."""
+    if tunnel and tunnel.is_active:
+        logger.info("Stopping SSH tunnel...")
+        try:
+            tunnel.stop()
+            logger.info(" -> SSH tunnel stopped.")
+        except Exception as e_tun:
+            logger.error(f"Error stopping SSH tunnel: {e_tun}")
+
+
+class SSHTunnelManager:
+    """
+    Process-wide registry of long-lived SSH tunnels. One tunnel is opened
+    lazily per (ssh_host, db_host) pair and shared by every
+    DatabaseInterface and pooled connection that needs it. Tunnels are kept
+    alive with SSH keepalives and restarted when they drop.
+    """
+    def __init__(self, keepalive_interval: float = 30):
+        self.keepalive_interval = keepalive_interval
+        self._tunnels: dict[tuple, SSHTunnelForwarder] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _tunnel_key(db_config: dict) -> tuple:
+        return (
+            db_config.get('ssh_host'),
+            int(db_config.get('ssh_port', 22)),
+            db_config.get('db_host'),
+            int(db_config.get('db_port', 3306))
+        )
+
+    def get_local_address(self, db_config: dict) -> tuple[str, int]:
+        """
+        Returns the local (host, port) of the tunnel for db_config, starting
+        or restarting the tunnel if needed.
+        """
+        key = self._tunnel_key(db_config)
+        with self._lock:
+            tunnel = self._tunnels.get(key)
+            if tunnel is not None and not tunnel.is_active:
+                logger.warning(
+                    f"SSH tunnel to {key[0]} dropped. Restarting...")
+                stop_ssh_tunnel(tunnel)
+                tunnel = None
+            if tunnel is None:
+                tunnel = start_ssh_tunnel(
+                    db_config, keepalive_interval=self.keepalive_interval)
+                if tunnel is None:
+                    self._tunnels.pop(key, None)
+                    raise ConnectionError("Failed to establish SSH tunnel.")
+                self._tunnels[key] = tunnel
+            return tunnel.local_bind_host, tunnel.local_bind_port
+
+    def restart(self, db_config: dict):
+        """Forces the tunnel for db_config to be re-established on next use."""
+        key = self._tunnel_key(db_config)
+        with self._lock:
+            tunnel = self._tunnels.pop(key, None)
+        stop_ssh_tunnel(tunnel)
+
+    def stop_all(self):
+        with self._lock:
+            tunnels = list(self._tunnels.values())
+            self._tunnels.clear()
+        for tunnel in tunnels:
+            stop_ssh_tunnel(tunnel)
+
+
+_tunnel_manager = None
+_tunnel_manager_lock = threading.Lock()
+
+
+def get_tunnel_manager() -> SSHTunnelManager:
+    """Returns the process-wide SSHTunnelManager."""
+    global _tunnel_manager
+    with _tunnel_manager_lock:
+        if _tunnel_manager is None:
+            _tunnel_manager = SSHTunnelManager(
+                **app_config.get('ssh_tunnel', {}))
+        return _tunnel_manager
+
+
+@atexit.register
+def stop_all_tunnels():
+    if _tunnel_manager is not None:
+        _tunnel_manager.stop_all()
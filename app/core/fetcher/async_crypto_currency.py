@@ -0,0 +1,480 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import httpx
+import pandas as pd
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+from app.core.fetcher.crypto_currency import CryptoCurrencyFetcher
+from app.core.fetcher.provider_stats import provider_stats
+from app.core.utils.rate_limiter import get_rate_limiter
+from app.core.utils.http_client import backoff_delay
+from app.core.utils.response_cache import get_response_cache
+import app.core.secret_handler as secrets
+
+secret_config = secrets.get_config()
+logger = set_logger(name=__name__)
+app_config = get_config()
+
+
+# Runs the sync wrappers' coroutines when the caller is on an event loop
+_sync_runner = ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="async-fetcher")
+
+
+def run_sync(coroutine):
+    """
+    Runs coroutine to completion for a synchronous caller. asyncio.run
+    can't be used on a thread with a running event loop (e.g. a FastAPI
+    handler), so there the coroutine gets its own loop on a worker thread
+    while the caller waits. Async callers should await the coroutine.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    logger.warning(
+        "Sync fetcher wrapper called on a running event loop, which blocks "
+        "it until the requests finish. Await the _async method instead.")
+    return _sync_runner.submit(asyncio.run, coroutine).result()
+
+
+class _ProviderSession:
+    """
+    One httpx client plus one semaphore per provider, bounding the requests
+    in flight. Created per run, as semaphores are bound to an event loop.
+    """
+    def __init__(self, client: httpx.AsyncClient, concurrency: dict):
+        self.client = client
+        self._semaphores = {
+            provider: asyncio.Semaphore(limit)
+            for provider, limit in concurrency.items()
+        }
+
+    async def get_json(
+        self,
+        provider: str,
+        url: str,
+        params: dict = None,
+        headers: dict = None
+    ):
+        """
+        GET within the provider's concurrency and rate limits, retried like
+        http_client.request() on transport errors and retry statuses.
+        """
+        settings = app_config.get("http_client", {})
+        retries = settings.get("retries", 3)
+        retry_statuses = set(settings.get("retry_statuses", []))
+        rate_limiter = get_rate_limiter(provider)
+        async with self._semaphores.setdefault(
+                provider, asyncio.Semaphore(1)):
+            for attempt in range(retries + 1):
+                await rate_limiter.acquire_async()
+                try:
+                    response = await self.client.get(
+                        url, params=params, headers=headers)
+                except httpx.TransportError:
+                    if attempt == retries:
+                        raise
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+                back_off = rate_limiter.record_response(
+                    response.status_code, response.headers)
+                if response.status_code not in retry_statuses or \
+                        attempt == retries:
+                    break
+                if back_off is None:
+                    await asyncio.sleep(backoff_delay(attempt))
+            response.raise_for_status()
+            return response.json()
+
+
+class AsyncCryptoCurrencyFetcher(CryptoCurrencyFetcher):
+    """
+    CryptoCurrencyFetcher that runs many price requests concurrently with
+    httpx, bounded per provider by app_config ASYNC_FETCHER["concurrency"]
+    and by the provider rate limits. The coroutines (suffix _async) can be
+    awaited from async code; the wrappers without the suffix run them to
+    completion for the synchronous pipelines (see run_sync).
+    """
+    def __init__(
+        self,
+        concurrency: dict = None,
+        timeout: float = None
+    ):
+        super().__init__()
+        settings = app_config.get("async_fetcher", {})
+        self.concurrency = concurrency or settings.get("concurrency", {})
+        self.timeout = timeout or settings.get("timeout", 30)
+
+    @asynccontextmanager
+    async def _session(self):
+        async with httpx.AsyncClient(
+            timeout=self.timeout,
+            headers={'accept': 'application/json'}
+        ) as client:
+            yield _ProviderSession(client, self.concurrency)
+
+    async def _fetch_price_on_date(
+        self,
+        session: _ProviderSession,
+        coin_id: str,
+        date,
+        vs_currency: str
+    ) -> dict:
+        date_str = date.strftime(
+            app_config.get("mysql_column_format").get('date'))
+        result_dict = {
+            "coin_id": coin_id,
+            "date": date_str,
+            "price": None,
+            "is_error": False,
+            "error_message": None
+        }
+        url = self.request_info["coin_gecko"]["url"].format(coin_id=coin_id)
+        params = {
+            "localization": "false",
+            # Format date as required by CoinGecko API: dd-mm-yyyy
+            "date": date.strftime('%d-%m-%Y')
+        }
+        response_cache = get_response_cache()
+        try:
+            # The cache reads and writes SQLite, so keep it off the loop
+            data = await asyncio.to_thread(
+                response_cache.get, "coin_gecko", url, params)
+            if data is None:
+                data = await session.get_json("coin_gecko", url, params=params)
+                await asyncio.to_thread(
+                    response_cache.set, "coin_gecko", url, params, data,
+                    ttl=response_cache.ttl_for_date(date))
+            result_dict["price"] = \
+                data['market_data']['current_price'][vs_currency.lower()]
+        except httpx.HTTPError as e:
+            result_dict["is_error"] = True
+            result_dict["error_message"] = \
+                f"Error fetching data from CoinGecko: {e}"
+        except (KeyError, TypeError):
+            result_dict["is_error"] = True
+            result_dict["error_message"] = (
+                f"No data found for {coin_id} on {date_str}. "
+                "The coin may not have existed yet.")
+        return result_dict
+
+    async def iter_prices_on_dates_async(
+        self,
+        coin_id_dates: list[tuple],
+        vs_currency: str = 'usd'
+    ):
+        """
+        Fetches the CoinGecko price of every (coin_id, date) pair
+        concurrently and yields the results as they complete, as
+        {"coin_id", "date", "price", "is_error", "error_message"}.
+        """
+        async with self._session() as session:
+            tasks = [
+                asyncio.ensure_future(self._fetch_price_on_date(
+                    session, coin_id, date, vs_currency))
+                for coin_id, date in dict.fromkeys(coin_id_dates)
+            ]
+            try:
+                for next_result in asyncio.as_completed(tasks):
+                    yield await next_result
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def fetch_prices_on_dates_async(
+        self,
+        coin_id_dates: list[tuple],
+        vs_currency: str = 'usd'
+    ) -> list[dict]:
+        return [
+            result async for result in self.iter_prices_on_dates_async(
+                coin_id_dates, vs_currency=vs_currency)
+        ]
+
+    def fetch_prices_on_dates(
+        self,
+        coin_id_dates: list[tuple],
+        vs_currency: str = 'usd'
+    ) -> list[dict]:
+        """Sync wrapper of fetch_prices_on_dates_async."""
+        return run_sync(self.fetch_prices_on_dates_async(
+            coin_id_dates, vs_currency=vs_currency))
+
+    async def _fetch_price_range(
+        self,
+        session: _ProviderSession,
+        coin_id: str,
+        start_date,
+        end_date,
+        vs_currency: str
+    ) -> pd.DataFrame:
+        api_url, params = self.get_price_range_request(
+            coin_id, start_date, end_date, vs_currency)
+        response_cache = get_response_cache()
+        try:
+            data = await asyncio.to_thread(
+                response_cache.get, "coin_gecko", api_url, params)
+            if data is None:
+                data = await session.get_json(
+                    "coin_gecko", api_url, params=params)
+                await asyncio.to_thread(
+                    response_cache.set, "coin_gecko", api_url, params, data,
+                    ttl=self.get_price_range_ttl(params))
+        except httpx.HTTPError as e:
+            logger.warning(
+                f"Error fetching price range of {coin_id} from CoinGecko: {e}")
+            return pd.DataFrame(columns=["timestamp", "price"])
+        return self.parse_price_range(data, coin_id, params)
+
+    async def fetch_price_ranges_async(
+        self,
+        coin_ids: list[str],
+        start_date,
+        end_date,
+        vs_currency: str = 'usd'
+    ) -> dict[str, pd.DataFrame]:
+        """
+        fetch_cc_prices_for_date_range_from_coin_gecko for many coins at
+        once. Returns coin_id -> prices DataFrame (empty on error).
+        """
+        coin_ids = list(dict.fromkeys(coin_ids))
+        async with self._session() as session:
+            ranges = await asyncio.gather(*[
+                self._fetch_price_range(
+                    session, coin_id, start_date, end_date, vs_currency)
+                for coin_id in coin_ids
+            ])
+        return dict(zip(coin_ids, ranges))
+
+    def fetch_cc_data_for_last_52_weeks_for_coins(
+        self,
+        coin_ids: list[str],
+        vs_currency: str = 'usd'
+    ) -> dict[str, dict[tuple, dict]]:
+        """
+        fetch_cc_data_for_last_52_weeks_from_coin_gecko for many coins,
+        with the range requests running concurrently.
+        Returns coin_id -> weekly prices.
+        """
+        today = datetime.today()
+        ranges = run_sync(self.fetch_price_ranges_async(
+            coin_ids,
+            start_date=self.get_last_52_weeks_start(today),
+            end_date=today,
+            vs_currency=vs_currency
+        ))
+        return {
+            coin_id: self.get_last_52_weeks(
+                self.resample_prices_to_iso_weeks(prices), today)
+            for coin_id, prices in ranges.items()
+        }
+
+    async def _get_current_prices_from_coin_gecko(
+        self,
+        session: _ProviderSession,
+        coin_ids: list[str],
+        vs_currency: str
+    ) -> dict[str, float]:
+        request_info = self.request_info["coin_gecko_simple_price"]
+        coin_ids = list(dict.fromkeys(
+            coin_id for coin_id in coin_ids if coin_id))
+        chunks = [
+            coin_ids[start:start + request_info["max_ids"]]
+            for start in range(0, len(coin_ids), request_info["max_ids"])
+        ]
+        responses = await asyncio.gather(*[
+            session.get_json(
+                "coin_gecko",
+                request_info["url"],
+                params={
+                    "ids": ",".join(chunk),
+                    "vs_currencies": vs_currency.lower()
+                }
+            ) for chunk in chunks
+        ], return_exceptions=True)
+        prices = {}
+        for chunk, data in zip(chunks, responses):
+            if isinstance(data, Exception):
+                logger.warning(f"Error fetching data from CoinGecko: {data}")
+                continue
+            for coin_id in chunk:
+                price = data.get(coin_id, {}).get(vs_currency.lower())
+                if price is not None:
+                    prices[coin_id] = price
+        return prices
+
+    async def _get_current_prices_from_cmc(
+        self,
+        session: _ProviderSession,
+        slugs: list[str],
+        vs_currency: str
+    ) -> dict[str, float]:
+        # The listings snapshot may download, so keep it off the loop
+        prices, slugs = await asyncio.to_thread(
+            self.get_prices_from_cmc_listings, slugs, vs_currency)
+        request_info = self.request_info["coin_market_cap_quotes"]
+        chunks = [
+            slugs[start:start + request_info["max_ids"]]
+            for start in range(0, len(slugs), request_info["max_ids"])
+        ]
+        responses = await asyncio.gather(*[
+            session.get_json(
+                "coin_market_cap",
+                request_info["url"],
+                params={
+                    "slug": ",".join(chunk),
+                    "convert": vs_currency.upper()
+                },
+                headers={
+                    "X-CMC_PRO_API_KEY":
+                        secret_config.get("COINMARKETCAP_API_KEY")
+                }
+            ) for chunk in chunks
+        ], return_exceptions=True)
+        for chunk, data in zip(chunks, responses):
+            if isinstance(data, Exception):
+                logger.error(f"Error fetching data from CoinMarketCap: {data}")
+                continue
+            prices.update(self.parse_cmc_quotes(data, chunk, vs_currency))
+        return prices
+
+    async def _get_current_prices_by_index(
+        self,
+        session: _ProviderSession,
+        provider: str,
+        coin_ids: list[dict],
+        indexes: list[int],
+        vs_currency: str
+    ) -> dict[int, float]:
+        """Coroutine version of get_current_prices_by_index."""
+        if provider == "coin_gecko":
+            get_prices = self._get_current_prices_from_coin_gecko
+        else:
+            get_prices = self._get_current_prices_from_cmc
+        provider_ids = {
+            index: coin_ids[index].get(provider) for index in indexes
+        }
+        prices = await get_prices(
+            session,
+            [provider_id for provider_id in provider_ids.values()
+             if provider_id],
+            vs_currency
+        )
+        return {
+            index: prices[provider_id]
+            for index, provider_id in provider_ids.items()
+            if provider_id in prices
+        }
+
+    async def fetch_current_coin_prices_async(
+        self,
+        coin_ids: list[dict],
+        vs_currency='usd'
+    ) -> list[dict]:
+        """
+        fetch_current_coin_prices with the chunks of each provider requested
+        concurrently. With hedged requests enabled the providers race: the
+        next provider is started for the coins still missing after
+        hedge_delay seconds, or right away once the running ones have
+        finished. The first valid price per coin wins and the requests still
+        running at the end are cancelled. The sync fetchers race through
+        this coroutine too.
+        """
+        hedging = app_config.get("hedged_requests", {})
+        providers = self.get_provider_order()
+        pending = set(range(len(coin_ids)))
+        prices = {}
+        async with self._session() as session:
+            if not hedging.get("enabled"):
+                for provider in providers:
+                    if not pending:
+                        break
+                    provider_prices = await self._get_current_prices_by_index(
+                        session, provider, coin_ids, sorted(pending),
+                        vs_currency)
+                    prices.update(provider_prices)
+                    pending -= provider_prices.keys()
+                return self.build_current_price_results(coin_ids, prices)
+
+            hedge_delay = hedging.get("hedge_delay", 1.0)
+            won = {provider: 0 for provider in providers}
+            requested = {}
+            started_at = {}
+            tasks = {}
+
+            def start_next():
+                provider = providers[len(requested)]
+                requested[provider] = len(pending)
+                started_at[provider] = time.monotonic()
+                tasks[asyncio.ensure_future(
+                    self._get_current_prices_by_index(
+                        session, provider, coin_ids, sorted(pending),
+                        vs_currency)
+                )] = provider
+
+            try:
+                if pending:
+                    start_next()
+                while pending and tasks:
+                    can_hedge = len(requested) < len(providers)
+                    done, _ = await asyncio.wait(
+                        tasks,
+                        timeout=hedge_delay if can_hedge else None,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not done:
+                        start_next()
+                        continue
+                    for task in done:
+                        provider = tasks.pop(task)
+                        try:
+                            provider_prices = task.result()
+                        except Exception as e:
+                            logger.warning(
+                                f"Error fetching from {provider}: {e}")
+                            provider_prices = {}
+                        for index, price in provider_prices.items():
+                            if index in pending:
+                                pending.discard(index)
+                                prices[index] = price
+                                won[provider] += 1
+                        provider_stats.record(
+                            provider,
+                            won[provider] / max(requested[provider], 1),
+                            time.monotonic() - started_at[provider]
+                        )
+                    # Coins no unfinished provider has an ID for stay missing
+                    unfinished = [
+                        provider for provider in providers
+                        if provider not in requested
+                        or provider in tasks.values()
+                    ]
+                    pending = {
+                        index for index in pending if any(
+                            coin_ids[index].get(provider) for provider in unfinished)
+                    }
+                    if pending and not tasks and \
+                            len(requested) < len(providers):
+                        start_next()
+            finally:
+                for task, provider in tasks.items():
+                    # Lost the race. It took at least this long.
+                    task.cancel()
+                    provider_stats.record(
+                        provider, 0.0, time.monotonic() - started_at[provider])
+        return self.build_current_price_results(coin_ids, prices)
+
+    def fetch_current_coin_prices(
+        self,
+        coin_ids: list[dict],
+        vs_currency='usd'
+    ) -> list[dict]:
+        """Sync wrapper of fetch_current_coin_prices_async."""
+        return run_sync(self.fetch_current_coin_prices_async(
+            coin_ids, vs_currency=vs_currency))
@@ -0,0 +1,157 @@
+import threading
+import time
+from typing import NamedTuple
+
+import requests
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+from app.core.utils import http_client
+import app.core.secret_handler as secrets
+
+secret_config = secrets.get_config()
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+LISTINGS_URL = \
+    "https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest"
+
+
+class CMCListing(NamedTuple):
+    """The fields of a CoinMarketCap listing the app uses."""
+    id: int
+    name: str
+    symbol: str
+    slug: str
+    price: float | None
+
+
+class CMCListingsSnapshot:
+    """
+    In-memory snapshot of CoinMarketCap /listings/latest, indexed by slug,
+    symbol and CMC ID. One snapshot is downloaded per quote currency and
+    serves every lookup until it is older than ttl seconds. After a failed
+    download the previous snapshot, or an empty one, is served for
+    error_ttl seconds before the next attempt. Only the fields of
+    CMCListing are kept from the payload.
+    """
+    def __init__(
+        self,
+        ttl: float = 300,
+        limit: int = 5000,
+        error_ttl: float = 60
+    ):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.limit = limit
+        # {currency: (expires_at, by_slug, by_symbol, by_id)}
+        self._snapshots: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _download(self, vs_currency: str) -> list[CMCListing]:
+        response = http_client.get(
+            LISTINGS_URL,
+            provider="coin_market_cap",
+            headers={
+                "Accepts": "application/json",
+                "X-CMC_PRO_API_KEY":
+                    secret_config.get("COINMARKETCAP_API_KEY")
+            },
+            params={
+                "start": "1",
+                "limit": str(self.limit),
+                "convert": vs_currency
+            }
+        )
+        response.raise_for_status()
+        listings = []
+        for coin in response.json().get("data", []):
+            quote = (coin.get("quote") or {}).get(vs_currency) or {}
+            listings.append(CMCListing(
+                id=coin["id"],
+                name=coin["name"],
+                symbol=coin["symbol"],
+                slug=coin["slug"],
+                price=quote.get("price")
+            ))
+        return listings
+
+    def _get_snapshot(self, vs_currency: str) -> tuple:
+        vs_currency = vs_currency.upper()
+        # Held during the download, so concurrent lookups wait for one
+        # download instead of starting their own
+        with self._lock:
+            snapshot = self._snapshots.get(vs_currency)
+            if snapshot is not None and time.monotonic() < snapshot[0]:
+                return snapshot
+            try:
+                listings = self._download(vs_currency)
+            except (requests.exceptions.RequestException, KeyError) as e:
+                logger.error(f"Error fetching CoinMarketCap listings: {e}")
+                # A stale snapshot is better than none. Either is kept for
+                # error_ttl, so the next lookups don't download again.
+                snapshot = (
+                    time.monotonic() + self.error_ttl,
+                    *(snapshot[1:] if snapshot else ({}, {}, {})))
+                self._snapshots[vs_currency] = snapshot
+                return snapshot
+            by_slug = {}
+            by_symbol = {}
+            by_id = {}
+            for listing in listings:
+                by_slug[listing.slug] = listing
+                # Listings are ranked by market cap, the first one wins
+                by_symbol.setdefault(listing.symbol.upper(), []).append(
+                    listing)
+                by_id[listing.id] = listing
+            snapshot = (
+                time.monotonic() + self.ttl, by_slug, by_symbol, by_id)
+            self._snapshots[vs_currency] = snapshot
+            logger.info(
+                f"Loaded {len(listings)} CoinMarketCap listings "
+                f"({vs_currency}).")
+            return snapshot
+
+    def get_all(self, vs_currency: str = 'USD') -> list[CMCListing]:
+        """All listings, highest market cap first."""
+        return list(self._get_snapshot(vs_currency)[1].values())
+
+    def get_by_slug(
+        self,
+        slug: str,
+        vs_currency: str = 'USD'
+    ) -> CMCListing | None:
+        return self._get_snapshot(vs_currency)[1].get(slug)
+
+    def get_by_symbol(
+        self,
+        symbol: str,
+        vs_currency: str = 'USD'
+    ) -> list[CMCListing]:
+        """All listings with the symbol, highest market cap first."""
+        return self._get_snapshot(vs_currency)[2].get(symbol.upper(), [])
+
+    def get_by_id(
+        self,
+        cmc_id: int,
+        vs_currency: str = 'USD'
+    ) -> CMCListing | None:
+        return self._get_snapshot(vs_currency)[3].get(int(cmc_id))
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_cmc_listings() -> CMCListingsSnapshot:
+    """Returns the process-wide CoinMarketCap listings snapshot."""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = CMCListingsSnapshot(
+                **app_config.get("cmc_listings", {}))
+        return _snapshot
@@ -0,0 +1,266 @@
+import csv
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+POINTER_FILE = "CURRENT"
+
+
+class CoinMapping(NamedTuple):
+    """One row of a provider mapping file."""
+    abbreviation: str
+    name: str
+    coin_id: str
+
+
+class CoinMappingIndex:
+    """
+    Provider mapping file (coingecko_mapping.csv, coinmarketcap_mapping.csv)
+    indexed by (symbol, name), by symbol and by provider coin ID. Symbols
+    are compared upper-cased and names capitalized; the first row of the
+    file wins when several rows share a key, as in the former
+    pandas lookup.
+    """
+    def __init__(self, rows: list[CoinMapping]):
+        self._by_symbol_name: dict[tuple[str, str], CoinMapping] = {}
+        self._by_symbol: dict[str, CoinMapping] = {}
+        self._by_coin_id: dict[str, CoinMapping] = {}
+        for row in rows:
+            symbol = row.abbreviation.upper()
+            self._by_symbol_name.setdefault(
+                (symbol, row.name.capitalize()), row)
+            self._by_symbol.setdefault(symbol, row)
+            self._by_coin_id.setdefault(row.coin_id, row)
+        self.rows = rows
+        self.size = len(rows)
+
+    @classmethod
+    def from_csv(cls, path: str, id_column: str) -> "CoinMappingIndex":
+        """
+        Reads a mapping file. id_column is the column with the coin ID the
+        provider API expects ("id" for CoinGecko, "slug" for CMC). Rows
+        without a symbol or coin ID are skipped.
+        """
+        rows = []
+        with open(path, newline="", encoding="utf-8") as mapping_file:
+            for record in csv.DictReader(mapping_file):
+                abbreviation = (record.get("abbreviation") or "").strip()
+                coin_id = (record.get(id_column) or "").strip()
+                if not abbreviation or not coin_id:
+                    continue
+                rows.append(CoinMapping(
+                    abbreviation=abbreviation,
+                    name=(record.get("name") or "").strip(),
+                    coin_id=coin_id
+                ))
+        index = cls(rows)
+        logger.debug(f"Indexed {index.size} coins of {path}.")
+        return index
+
+    @classmethod
+    def from_artifact(cls, path: str, provider: str) -> "CoinMappingIndex":
+        """Reads the rows of a provider from a mapping artifact."""
+        index = cls(read_mapping_artifact(path, provider))
+        logger.debug(f"Indexed {index.size} {provider} coins of {path}.")
+        return index
+
+    def find(self, name: str, abbreviation: str) -> CoinMapping | None:
+        """
+        The row matching symbol and name, else the first row with the
+        symbol, else None.
+        """
+        symbol = abbreviation.upper()
+        return self._by_symbol_name.get((symbol, name.capitalize())) or \
+            self._by_symbol.get(symbol)
+
+    def find_coin_id(self, name: str, abbreviation: str) -> str | None:
+        row = self.find(name, abbreviation)
+        return None if row is None else row.coin_id
+
+    def get_by_symbol(self, abbreviation: str) -> CoinMapping | None:
+        return self._by_symbol.get(abbreviation.upper())
+
+    def get_by_coin_id(self, coin_id: str) -> CoinMapping | None:
+        return self._by_coin_id.get(coin_id)
+
+
+def diff_mappings(
+    current: list[CoinMapping],
+    new: list[CoinMapping]
+) -> tuple[list[CoinMapping], list[CoinMapping]]:
+    """The rows added in new and the rows delisted from current, by coin ID."""
+    current_ids = {row.coin_id for row in current}
+    new_ids = {row.coin_id for row in new}
+    return (
+        [row for row in new if row.coin_id not in current_ids],
+        [row for row in current if row.coin_id not in new_ids]
+    )
+
+
+def _artifact_settings() -> dict:
+    return app_config.get("mapping_artifact", {})
+
+
+def read_mapping_version(directory: str) -> str | None:
+    """The version named by the pointer file of directory, or None."""
+    try:
+        with open(os.path.join(directory, POINTER_FILE)) as pointer:
+            return pointer.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def get_artifact_path(directory: str, version: str) -> str:
+    return os.path.join(directory, f"coin_mapping_{version}.sqlite3")
+
+
+def write_mapping_artifact(
+    directory: str,
+    rows_by_provider: dict[str, list[CoinMapping]],
+    keep_versions: int = 3
+) -> str:
+    """
+    Writes the mapping rows as a new versioned SQLite artifact, then points
+    the pointer file at it. Both are written to temporary files and renamed,
+    so readers see either the previous or the new version, never a partial
+    one. Keeps the newest keep_versions artifacts. Returns the new version.
+    """
+    os.makedirs(directory, exist_ok=True)
+    version = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    if version == read_mapping_version(directory):
+        version = f"{version}_{os.getpid()}"
+    path = get_artifact_path(directory, version)
+    temp_path = f"{path}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.execute(
+            "CREATE TABLE coins (provider TEXT NOT NULL, "
+            "position INTEGER NOT NULL, abbreviation TEXT NOT NULL, "
+            "name TEXT NOT NULL, coin_id TEXT NOT NULL, "
+            "PRIMARY KEY (provider, position))")
+        for provider, rows in rows_by_provider.items():
+            connection.executemany(
+                "INSERT INTO coins VALUES (?, ?, ?, ?, ?)",
+                [(provider, position, *row)
+                 for position, row in enumerate(rows)])
+        connection.commit()
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+    os.replace(temp_path, path)
+
+    pointer_path = os.path.join(directory, POINTER_FILE)
+    with open(f"{pointer_path}.tmp", "w") as pointer:
+        pointer.write(version)
+        pointer.flush()
+        os.fsync(pointer.fileno())
+    os.replace(f"{pointer_path}.tmp", pointer_path)
+    logger.info(f"Coin mapping version {version} written to {path}.")
+
+    artifacts = sorted(
+        file_name for file_name in os.listdir(directory)
+        if file_name.startswith("coin_mapping_")
+        and file_name.endswith(".sqlite3"))
+    # The new version is always kept, even with keep_versions 0
+    for file_name in artifacts[:max(len(artifacts) - keep_versions, 0)]:
+        if file_name != os.path.basename(path):
+            os.remove(os.path.join(directory, file_name))
+    return version
+
+
+def read_mapping_artifact(path: str, provider: str) -> list[CoinMapping]:
+    """The rows of a provider in a mapping artifact, in their order."""
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        # Read through a memory map instead of copying pages
+        connection.execute("PRAGMA mmap_size=268435456")
+        return [
+            CoinMapping(*row) for row in connection.execute(
+                "SELECT abbreviation, name, coin_id FROM coins "
+                "WHERE provider = ? ORDER BY position", (provider,))
+        ]
+    finally:
+        connection.close()
+
+
+_version = None
+_version_checked_at = None
+_version_lock = threading.Lock()
+
+
+def get_mapping_version(refresh: bool = False) -> str | None:
+    """
+    The current mapping artifact version (None: use the CSV files). The
+    pointer file is read at most every check_interval seconds, so a
+    refresh is picked up by running processes without a restart.
+    """
+    global _version, _version_checked_at
+    settings = _artifact_settings()
+    with _version_lock:
+        if refresh or _version_checked_at is None or \
+                time.monotonic() - _version_checked_at >= \
+                settings.get("check_interval", 60):
+            _version = read_mapping_version(
+                settings.get("dir", "data/coin_mapping"))
+            _version_checked_at = time.monotonic()
+        return _version
+
+
+def _load_index(
+    provider: str,
+    csv_path: str,
+    id_column: str,
+    version: str | None
+) -> CoinMappingIndex:
+    if version is not None:
+        path = get_artifact_path(
+            _artifact_settings().get("dir", "data/coin_mapping"), version)
+        try:
+            index = CoinMappingIndex.from_artifact(path, provider)
+            if index.size:
+                return index
+        except sqlite3.Error as e:
+            logger.error(f"Error reading coin mapping {path}: {e}")
+    return CoinMappingIndex.from_csv(csv_path, id_column)
+
+
+# {provider: (version, index)}
+_indexes: dict[str, tuple[str | None, CoinMappingIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_coin_mapping_index(
+    provider: str,
+    csv_path: str,
+    id_column: str
+) -> CoinMappingIndex:
+    """
+    The process-wide index of a provider: from the current mapping artifact
+    if there is one with rows of the provider, else from csv_path. A new
+    artifact version replaces the index on the next lookup; lookups in
+    progress keep the index they hold.
+    """
+    version = get_mapping_version()
+    with _indexes_lock:
+        cached = _indexes.get(provider)
+        if cached is None or cached[0] != version:
+            cached = (
+                version, _load_index(provider, csv_path, id_column, version))
+            _indexes[provider] = cached
+        return cached[1]
+
+
+def clear_coin_mapping_indexes():
+    """Drops the indexes, so the next lookup reads the mappings again."""
+    with _indexes_lock:
+        _indexes.clear()
@@ -0,0 +1,325 @@
+import re
+from math import ceil
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+from app.core.fetcher.cmc_listings import get_cmc_listings
+from app.core.fetcher.coin_mapping import (
+    CoinMappingIndex,
+    get_coin_mapping_index,
+    get_mapping_version
+)
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+# Weights of the name similarity and the symbol match in a score
+NAME_WEIGHT = 0.65
+SYMBOL_WEIGHT = 0.35
+# Confidence factor when the best candidate only won on market cap rank
+TIE_FACTOR = 0.8
+
+
+class CoinMatch(NamedTuple):
+    """A resolved coin of one provider."""
+    coin_id: str
+    name: str
+    abbreviation: str
+    confidence: float
+
+
+def normalize_name(name: str) -> str:
+    """Lower-cased name with runs of other characters as single spaces."""
+    return _NON_ALPHANUMERIC.sub(" ", (name or "").lower()).strip()
+
+
+def trigrams(name: str) -> frozenset[str]:
+    """Character trigrams of a normalized name, padded at both ends."""
+    padded = f"  {name} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def dice(grams: frozenset, other: frozenset) -> float:
+    """Dice similarity of two trigram sets."""
+    if not grams or not other:
+        return 0.0
+    return 2 * len(grams & other) / (len(grams) + len(other))
+
+
+class _ProviderIndex:
+    """Trigram and symbol index over the rows of one mapping file."""
+    def __init__(self, index: CoinMappingIndex, rank_of):
+        self.rows = index.rows
+        self.names = [normalize_name(row.name) for row in self.rows]
+        self.grams = [trigrams(name) for name in self.names]
+        self.ranks = [
+            rank_of(row, name) for row, name in zip(self.rows, self.names)
+        ]
+        self.symbols = [row.abbreviation.upper() for row in self.rows]
+        self.by_symbol: dict[str, list[int]] = {}
+        self.by_symbol_name: dict[tuple[str, str], list[int]] = {}
+        self.postings: dict[str, list[int]] = {}
+        for position, symbol in enumerate(self.symbols):
+            self.by_symbol.setdefault(symbol, []).append(position)
+            self.by_symbol_name.setdefault(
+                (symbol, self.names[position]), []).append(position)
+            for gram in self.grams[position]:
+                self.postings.setdefault(gram, []).append(position)
+
+
+class CoinResolver:
+    """
+    Resolves the coin names and symbols the LLM extracts to provider coin
+    IDs, tolerating spelling variants ("Zebec Network" / "Zebec Protocol")
+    and symbols shared by many coins.
+
+    An exact (symbol, name) match wins. Otherwise, if the provider has
+    coins with the symbol, one of them is returned: a coin whose name has
+    a Dice trigram similarity of at least min_name_similarity with the
+    name, else the one with the highest market cap rank ("Binance Coin"
+    / BNB is BNB, not "Binance Coin (Wormhole)"). Such a match scores
+    NAME_WEIGHT * similarity (close names only) plus SYMBOL_WEIGHT and is
+    returned even below min_confidence, like the former lookup by symbol.
+    Only if no coin has the symbol, coins are matched by name alone: the
+    candidates share enough name trigrams with the name to reach
+    min_name_similarity (trigrams occurring in more than max_posting
+    names, like those of "token" or "network", don't select candidates
+    but still count in the similarity) and score NAME_WEIGHT * similarity.
+    Equal scores go to the higher market cap rank; the confidence of such
+    a tie is lowered by TIE_FACTOR. Name-only matches below
+    min_confidence are not returned. Resolutions are cached.
+
+    ranks: {(SYMBOL, normalized name) or CMC slug: rank}, lower is bigger.
+    """
+    def __init__(
+        self,
+        indexes: dict[str, CoinMappingIndex],
+        ranks: dict = None,
+        min_confidence: float = 0.4,
+        min_name_similarity: float = 0.8,
+        cache_size: int = 4096,
+        max_posting: int = 250,
+        min_shared_grams: int = 2
+    ):
+        self.ranks = ranks or {}
+        self.min_confidence = min_confidence
+        self.min_name_similarity = min_name_similarity
+        self.cache_size = cache_size
+        self.max_posting = max_posting
+        self.min_shared_grams = min_shared_grams
+        unranked = len(self.ranks) + 1
+        self._indexes = {
+            provider: _ProviderIndex(
+                index,
+                lambda row, name: self.ranks.get(
+                    row.coin_id, self.ranks.get(
+                        (row.abbreviation.upper(), name), unranked))
+            )
+            for provider, index in indexes.items()
+        }
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _candidates(
+        self,
+        index: _ProviderIndex,
+        grams: frozenset
+    ) -> set[int]:
+        """Positions that may reach min_name_similarity with grams."""
+        postings, skipped = [], 0
+        for posting in map(index.postings.get, grams):
+            if not posting:
+                continue
+            if len(posting) > self.max_posting:
+                skipped += 1
+            else:
+                postings.append(posting)
+        if not postings:
+            return set()
+        # A name needs a Dice similarity of at least d (min_name_similarity
+        # and min_confidence / NAME_WEIGHT), so it shares at least
+        # d*|A|/(2-d) of the name's trigrams, of which the skipped
+        # common trigrams may cover some
+        similarity = min(max(
+            self.min_name_similarity,
+            self.min_confidence / NAME_WEIGHT), 1.0)
+        needed = max(
+            self.min_shared_grams,
+            ceil(similarity * len(grams) / (2 - similarity)) - skipped)
+        shared: dict[int, int] = {}
+        for posting in postings:
+            for position in posting:
+                shared[position] = shared.get(position, 0) + 1
+        return {
+            position for position, count in shared.items()
+            if count >= needed
+        }
+
+    def _resolve_provider(
+        self,
+        index: _ProviderIndex,
+        name: str,
+        symbol: str
+    ) -> CoinMatch | None:
+        exact = index.by_symbol_name.get((symbol, name))
+        if exact and name:
+            # Nothing scores higher than an exact match
+            scored = [(-1.0, index.ranks[position], position)
+                      for position in exact]
+            return self._best_match(index, scored)
+        grams = trigrams(name) if name else frozenset()
+        with_symbol = index.by_symbol.get(symbol)
+        if with_symbol:
+            scored = []
+            for position in with_symbol:
+                if not grams:
+                    score = 1.0
+                else:
+                    similarity = dice(grams, index.grams[position])
+                    if similarity < self.min_name_similarity:
+                        # Let the market cap decide
+                        similarity = 0.0
+                    score = NAME_WEIGHT * similarity + SYMBOL_WEIGHT
+                scored.append((-score, index.ranks[position], position))
+            return self._best_match(index, scored, min_confidence=0.0)
+        scored = []
+        for position in self._candidates(index, grams):
+            similarity = dice(grams, index.grams[position])
+            if similarity < self.min_name_similarity:
+                continue
+            scored.append(
+                (-NAME_WEIGHT * similarity, index.ranks[position], position))
+        return self._best_match(index, scored)
+
+    def _best_match(
+        self,
+        index: _ProviderIndex,
+        scored: list[tuple],
+        min_confidence: float = None
+    ) -> CoinMatch | None:
+        """
+        Best of the (-score, rank, position) candidates, None if its
+        confidence is below min_confidence (default self.min_confidence).
+        """
+        if not scored:
+            return None
+        scored.sort()
+        best_score, best_rank, position = scored[0]
+        confidence = -best_score
+        if len(scored) > 1 and scored[1][0] == best_score:
+            confidence *= TIE_FACTOR
+        if min_confidence is None:
+            min_confidence = self.min_confidence
+        if confidence < min_confidence:
+            return None
+        row = index.rows[position]
+        return CoinMatch(
+            coin_id=row.coin_id,
+            name=row.name,
+            abbreviation=row.abbreviation,
+            confidence=round(confidence, 3)
+        )
+
+    def resolve(
+        self,
+        name: str,
+        abbreviation: str
+    ) -> dict[str, CoinMatch | None]:
+        """The best match per provider, None where nothing matched."""
+        name = normalize_name(name)
+        symbol = (abbreviation or "").strip().upper()
+        key = (name, symbol)
+        with self._lock:
+            matches = self._cache.get(key)
+            if matches is not None:
+                self._cache.move_to_end(key)
+                return dict(matches)
+        matches = {
+            provider: self._resolve_provider(index, name, symbol)
+            for provider, index in self._indexes.items()
+        }
+        with self._lock:
+            self._cache[key] = matches
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(matches)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def build_ranks(
+    cmc_index: CoinMappingIndex,
+    listings: list = None
+) -> dict:
+    """
+    Market cap ranks for CoinResolver: the position in the CMC listings
+    (highest market cap first) if given, then the order of the CMC mapping
+    for unlisted coins (by CMC ID in the CSV, so older coins first; by CMC
+    rank in refreshed mapping artifacts).
+    """
+    ranks = {}
+    for rank, listing in enumerate(listings or []):
+        ranks.setdefault(listing.slug, rank)
+        ranks.setdefault(
+            (listing.symbol.upper(), normalize_name(listing.name)), rank)
+    offset = len(ranks)
+    for position, row in enumerate(cmc_index.rows):
+        ranks.setdefault(row.coin_id, offset + position)
+        ranks.setdefault(
+            (row.abbreviation.upper(), normalize_name(row.name)),
+            offset + position)
+    return ranks
+
+
+# (mapping version, resolver)
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_coin_resolver(
+    mapping_files: dict[str, tuple[str, str]]
+) -> CoinResolver:
+    """
+    The process-wide CoinResolver over the provider mappings
+    ({provider: (csv_path, id_column)}, see get_coin_mapping_index),
+    configured in COIN_RESOLVER. With use_listings_rank the CMC listings
+    snapshot provides the market cap ranks.
+    When a new mapping version is published, the next lookup builds a new
+    resolver and swaps it in; until then the previous one keeps serving.
+    """
+    global _resolver
+    version = get_mapping_version()
+    with _resolver_lock:
+        if _resolver is not None and _resolver[0] == version:
+            return _resolver[1]
+    settings = dict(app_config.get("coin_resolver", {}))
+    use_listings_rank = settings.pop("use_listings_rank", False)
+    indexes = {
+        provider: get_coin_mapping_index(provider, csv_path, id_column)
+        for provider, (csv_path, id_column) in mapping_files.items()
+    }
+    listings = get_cmc_listings().get_all() if use_listings_rank else None
+    resolver = CoinResolver(
+        indexes,
+        ranks=build_ranks(indexes["coin_market_cap"], listings),
+        **settings
+    )
+    with _resolver_lock:
+        _resolver = (version, resolver)
+    if version is not None:
+        logger.info(f"Coin resolver built for mapping version {version}.")
+    return resolver
+
+
+def clear_coin_resolver():
+    """Drops the resolver, so the next lookup rebuilds it."""
+    global _resolver
+    with _resolver_lock:
+        _resolver = None
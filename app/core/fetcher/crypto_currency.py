@@ -1,11 +1,16 @@
 import requests
-from requests import Session
 import pandas as pd
 from datetime import datetime
 import json
 
 from app.core.utils.utils import set_logger
 from app.core.app_config import get_config
+from app.core.fetcher.cmc_listings import get_cmc_listings
+from app.core.fetcher.coin_mapping import get_coin_mapping_index
+from app.core.fetcher.coin_resolver import get_coin_resolver
+from app.core.fetcher.provider_stats import provider_stats
+from app.core.utils import http_client
+from app.core.utils.response_cache import get_response_cache
 from datetime import timedelta
 import app.core.secret_handler as secrets
 
@@ -25,7 +30,21 @@ class CryptoCurrencyFetcher():
                     "localization": {localization},
                     "date": "{date}"
                 }}""",
-                "mapping_file": "coingecko_mapping.csv"
+                "mapping_file": "coingecko_mapping.csv",
+                "id_column": "id"
+            },
+            "coin_gecko_range": {
+                "url": "https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart/range"
+            },
+            "coin_gecko_simple_price": {
+                "url": "https://api.coingecko.com/api/v3/simple/price",
+                # Max. coin ids per request
+                "max_ids": 250
+            },
+            "coin_market_cap_quotes": {
+                "url": "https://pro-api.coinmarketcap.com/v2/cryptocurrency/quotes/latest",
+                # Max. slugs per request
+                "max_ids": 100
             },
             "coin_market_cap": {
                 "url": 'https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest',#"https://pro-api.coinmarketcap.com/v2/cryptocurrency/quotes/latest",
@@ -38,7 +57,8 @@ class CryptoCurrencyFetcher():
                     "Accepts": "application/json",
                     "X-CMC_PRO_API_KEY": None,
                 },
-                "mapping_file": "coinmarketcap_mapping.csv"
+                "mapping_file": "coinmarketcap_mapping.csv",
+                "id_column": "slug"
             }
         }
         self.providers = ["coin_gecko", "coin_market_cap"]
@@ -49,76 +69,71 @@ class CryptoCurrencyFetcher():
         abbreviation: str,
         provider: str
     ):
-        mapping_df = pd.read_csv(
-            f"./data/{self.request_info[provider]['mapping_file']}"
-        )
-        mapping_df["name"] = mapping_df["name"].str.capitalize()
-        mapping_df["abbreviation"] = mapping_df["abbreviation"].str.upper()
-        coin_match = mapping_df[
-                (mapping_df["abbreviation"] == abbreviation.upper()) &
-                (mapping_df["name"] == name.capitalize())
-        ]
-        if coin_match.empty:
-            coin_match = mapping_df[
-                (mapping_df["abbreviation"] == abbreviation.upper())
-            ]
-        if provider == "coin_gecko":
-            try:
-                coin_id = coin_match["id"].iloc[0]
-            except IndexError:
-                logger.warning(
-                    f"Warning: Coin ID for {name} ({abbreviation}) not found in mapping file.")
-                coin_id = None
-        elif provider == "coin_market_cap":
-            try:
-                coin_id = coin_match["slug"].iloc[0]
-            except IndexError:
-                logger.warning(
-                    f"Warning: Coin ID for {name} ({abbreviation}) not found in mapping file.")
-                coin_id = None
+        """
+        Provider coin ID (CoinGecko id, CMC slug) of a coin, from the
+        mapping index of the provider: the row matching abbreviation and
+        name, else the first row with the abbreviation. None if not found.
+        """
+        coin_id = get_coin_mapping_index(
+            provider,
+            f"./data/{self.request_info[provider]['mapping_file']}",
+            self.request_info[provider]["id_column"]
+        ).find_coin_id(name, abbreviation)
+        if coin_id is None:
+            logger.warning(
+                f"Warning: Coin ID for {name} ({abbreviation}) not found in mapping file.")
         return coin_id
 
+    def resolve_coin_ids(
+        self,
+        name: str,
+        abbreviation: str
+    ) -> dict[str, str | None]:
+        """
+        Provider coin IDs of a coin as extracted by the LLM, resolved with
+        the fuzzy CoinResolver (tolerates name variants and picks the
+        biggest coin among those sharing a symbol). None for providers
+        without a confident match.
+        """
+        matches = get_coin_resolver({
+            provider: (
+                f"./data/{self.request_info[provider]['mapping_file']}",
+                self.request_info[provider]["id_column"]
+            ) for provider in self.providers
+        }).resolve(name, abbreviation)
+        coin_ids = {}
+        for provider in self.providers:
+            match = matches.get(provider)
+            if match is None:
+                logger.warning(
+                    f"Warning: Coin ID for {name} ({abbreviation}) not found "
+                    f"for {provider}.")
+                coin_ids[provider] = None
+                continue
+            if match.confidence < 1.0:
+                logger.info(
+                    f"Resolved {name} ({abbreviation}) to {match.name} "
+                    f"({match.abbreviation}) for {provider} with confidence "
+                    f"{match.confidence}.")
+            coin_ids[provider] = match.coin_id
+        return coin_ids
+
     def get_current_price_from_cmc(
         self,
         coin_id: str,
         vs_currency='USD'
     ):
-        price = None
-        api_url = self.request_info["coin_market_cap"]["url"].format(
-                    coin_id=coin_id)
-        params = self.request_info["coin_market_cap"]["params_dict"]
-        params['convert'] = vs_currency.upper()
-
-        headers = self.request_info["coin_market_cap"]["headers"]
-        headers["X-CMC_PRO_API_KEY"] = \
-            secret_config.get("COINMARKETCAP_API_KEY")
-        try:
-            session = Session()
-            session.headers.update(headers)
-
-            # Make the API request
-            response = session.get(
-                api_url,
-                params=params
-            )
-            response.raise_for_status()
-
-            data = pd.DataFrame(response.json()["data"])
-            coin_data = data[data["slug"] == coin_id]
-            try:
-                price = coin_data["quote"].iloc[0][vs_currency.upper()]["price"]
-            except KeyError:
-                price = coin_data["quote"].iloc[0][vs_currency]["price"]
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching data from CoinMarketCap: {e}")
-            price = None
-        except KeyError as e:
-            logger.error(f"Key error: {e}")
-            price = None
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            price = None
-        return price
+        """
+        Gets the current price of a cryptocurrency by its CoinMarketCap
+        slug from the shared listings snapshot (see cmc_listings).
+        """
+        listing = get_cmc_listings().get_by_slug(
+            coin_id, vs_currency=vs_currency)
+        if listing is None:
+            logger.warning(
+                f"Warning: {coin_id} not found in CoinMarketCap listings.")
+            return None
+        return listing.price
 
     def get_current_price_from_coin_gecko(
         self,
@@ -153,13 +168,13 @@ class CryptoCurrencyFetcher():
             headers = {
                 'accept': 'application/json',
             }
-            response = requests.get(
+            response = http_client.get(
                 api_url,
+                provider="coin_gecko",
                 params=params_dict,
-                headers=headers,
-                timeout=10
+                headers=headers
             )
-            response.raise_for_status() 
+            response.raise_for_status()
             data = response.json()
             if 'market_data' in data and 'current_price' in data['market_data']:
                 if vs_currency.lower() in data['market_data']['current_price']:
@@ -173,13 +188,265 @@ class CryptoCurrencyFetcher():
             price = None
         return price
 
+    def get_current_prices_from_coin_gecko(
+        self,
+        coin_ids: list[str],
+        vs_currency: str = 'usd'
+    ) -> dict[str, float]:
+        """
+        Gets the current prices of many cryptocurrencies from the CoinGecko
+        /simple/price endpoint, with one request per max_ids coin ids.
+
+        Args:
+            coin_ids (list[str]): CoinGecko IDs (e.g., ['bitcoin', 'ethereum']).
+            vs_currency (str): The currency to get the prices in.
+
+        Returns:
+            dict: CoinGecko ID -> price. Coins without a price are missing.
+        """
+        prices = {}
+        request_info = self.request_info["coin_gecko_simple_price"]
+        coin_ids = list(dict.fromkeys(
+            coin_id for coin_id in coin_ids if coin_id))
+        for start in range(0, len(coin_ids), request_info["max_ids"]):
+            chunk = coin_ids[start:start + request_info["max_ids"]]
+            try:
+                response = http_client.get(
+                    request_info["url"],
+                    provider="coin_gecko",
+                    params={
+                        "ids": ",".join(chunk),
+                        "vs_currencies": vs_currency.lower()
+                    },
+                    headers={'accept': 'application/json'}
+                )
+                response.raise_for_status()
+                data = response.json()
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Error fetching data from CoinGecko: {e}")
+                continue
+            for coin_id in chunk:
+                price = data.get(coin_id, {}).get(vs_currency.lower())
+                if price is not None:
+                    prices[coin_id] = price
+        return prices
+
+    def get_current_prices_from_cmc(
+        self,
+        slugs: list[str],
+        vs_currency: str = 'USD'
+    ) -> dict[str, float]:
+        """
+        Gets the current prices of many cryptocurrencies from the
+        CoinMarketCap listings snapshot. Slugs outside the listings are
+        resolved with the quotes endpoint, one request per max_ids slugs.
+
+        Args:
+            slugs (list[str]): CoinMarketCap slugs (e.g., ['bitcoin']).
+            vs_currency (str): The currency to get the prices in.
+
+        Returns:
+            dict: Slug -> price. Coins without a price are missing.
+        """
+        request_info = self.request_info["coin_market_cap_quotes"]
+        prices, slugs = self.get_prices_from_cmc_listings(
+            slugs, vs_currency=vs_currency)
+        if not slugs:
+            return prices
+        headers = {
+            "Accepts": "application/json",
+            "X-CMC_PRO_API_KEY": secret_config.get("COINMARKETCAP_API_KEY")
+        }
+        for start in range(0, len(slugs), request_info["max_ids"]):
+            chunk = slugs[start:start + request_info["max_ids"]]
+            try:
+                response = http_client.get(
+                    request_info["url"],
+                    provider="coin_market_cap",
+                    params={
+                        "slug": ",".join(chunk),
+                        "convert": vs_currency.upper()
+                    },
+                    headers=headers
+                )
+                response.raise_for_status()
+                data = response.json()
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Error fetching data from CoinMarketCap: {e}")
+                continue
+            prices.update(self.parse_cmc_quotes(data, chunk, vs_currency))
+        return prices
+
+    def get_prices_from_cmc_listings(
+        self,
+        slugs: list[str],
+        vs_currency: str = 'USD'
+    ) -> tuple[dict[str, float], list[str]]:
+        """
+        Looks slugs up in the shared CoinMarketCap listings snapshot, which
+        covers the top coins without a request of its own once loaded.
+        Returns (slug -> price, slugs not in the listings).
+        """
+        prices = {}
+        missing_slugs = []
+        listings = get_cmc_listings()
+        for slug in dict.fromkeys(slug for slug in slugs if slug):
+            listing = listings.get_by_slug(slug, vs_currency=vs_currency)
+            if listing is not None and listing.price is not None:
+                prices[slug] = listing.price
+            else:
+                missing_slugs.append(slug)
+        return prices, missing_slugs
+
+    def parse_cmc_quotes(
+        self,
+        data: dict,
+        slugs: list[str],
+        vs_currency: str = 'USD'
+    ) -> dict[str, float]:
+        """Slug -> price from a CoinMarketCap quotes/latest response."""
+        prices = {}
+        for coins in data.get("data", {}).values():
+            # Keyed by CMC id; some lookups return a list per id
+            for coin in coins if isinstance(coins, list) else [coins]:
+                try:
+                    price = coin["quote"][vs_currency.upper()]["price"]
+                except (KeyError, TypeError):
+                    continue
+                if coin.get("slug") in slugs and price is not None:
+                    prices[coin["slug"]] = price
+        return prices
+
+    def get_provider_order(self) -> list[str]:
+        """Providers in request order, the recent hedging winner first."""
+        if app_config.get("hedged_requests", {}).get("adaptive_order"):
+            return provider_stats.order(self.providers)
+        return list(self.providers)
+
+    def get_current_prices_by_index(
+        self,
+        provider: str,
+        coin_ids: list[dict],
+        indexes: list[int],
+        vs_currency: str = 'usd'
+    ) -> dict[int, float]:
+        """
+        Current prices from one provider for the coin_ids at indexes.
+        Returns index -> price; coins without a price are missing.
+        """
+        if provider == "coin_gecko":
+            get_prices = self.get_current_prices_from_coin_gecko
+        else:
+            get_prices = self.get_current_prices_from_cmc
+        provider_ids = {
+            index: coin_ids[index].get(provider) for index in indexes
+        }
+        prices = get_prices(
+            [provider_id for provider_id in provider_ids.values()
+             if provider_id],
+            vs_currency
+        )
+        return {
+            index: prices[provider_id]
+            for index, provider_id in provider_ids.items()
+            if provider_id in prices
+        }
+
+    def fetch_current_coin_prices(
+        self,
+        coin_ids: list[dict],
+        vs_currency='usd'
+    ) -> list[dict]:
+        """
+        Fetches the current prices of many cryptocurrencies at once, with
+        one batched request per provider (CoinGecko /simple/price and
+        CoinMarketCap). The second provider is only asked for the coins the
+        first did not return; with hedged requests enabled it is asked
+        in parallel once the first is slower than hedge_delay.
+        Args:
+            coin_ids (list[dict]): Provider IDs per cryptocurrency, like
+                {"coin_gecko": "bitcoin", "coin_market_cap": "bitcoin"}.
+            vs_currency (str): The currency to get the prices in
+            (default is 'usd').
+        Returns:
+            list[dict]: One result per entry of coin_ids, in the same order
+                and format as fetch_current_coin_price.
+        """
+        if app_config.get("hedged_requests", {}).get("enabled"):
+            return self._fetch_current_prices_hedged(coin_ids, vs_currency)
+        prices = {}
+        for provider in self.get_provider_order():
+            missing = [
+                index for index in range(len(coin_ids))
+                if index not in prices
+            ]
+            if not missing:
+                break
+            prices.update(self.get_current_prices_by_index(
+                provider, coin_ids, missing, vs_currency))
+        return self.build_current_price_results(coin_ids, prices)
+
+    def _fetch_current_prices_hedged(
+        self,
+        coin_ids: list[dict],
+        vs_currency: str
+    ) -> list[dict]:
+        """
+        Races the providers with AsyncCryptoCurrencyFetcher, which can
+        cancel the requests of the provider that lost.
+        """
+        # Imported here, the async fetcher subclasses this one
+        from app.core.fetcher.async_crypto_currency import (
+            AsyncCryptoCurrencyFetcher,
+            run_sync
+        )
+        return run_sync(
+            AsyncCryptoCurrencyFetcher().fetch_current_coin_prices_async(
+                coin_ids, vs_currency=vs_currency))
+
+    def build_current_price_results(
+        self,
+        coin_ids: list[dict],
+        prices: dict[int, float]
+    ) -> list[dict]:
+        """
+        One fetch_current_coin_price result per entry of coin_ids, from the
+        prices by index in coin_ids.
+        """
+        logger.info(
+            f"Fetched {len(prices)} prices for {len(coin_ids)} coins."
+        )
+        date = datetime.today().strftime(
+            app_config.get("mysql_column_format").get('date'))
+        results = []
+        for index, ids in enumerate(coin_ids):
+            price = prices.get(index)
+            if price is None:
+                results.append({
+                    "price": None,
+                    "date": None,
+                    "is_error": True,
+                    "error_message": (
+                        f"Failed to fetch price for {ids.get('coin_gecko')} "
+                        f"from both CoinGecko and CoinMarketCap."
+                    )
+                })
+                continue
+            results.append({
+                "price": price,
+                "date": date,
+                "is_error": False,
+                "error_message": None
+            })
+        return results
+
     def fetch_current_coin_price(
         self,
         coin_ids: dict,
         vs_currency='usd'
     ) -> dict:
         """
-        Fetches the current week's price for a cryptocurrency from CoinGecko or CoinMarketCap.
+        Fetches the current price for a cryptocurrency from CoinGecko or CoinMarketCap.
         Args:
             coin_ids (dict): A dictionary containing the CoinGecko and
                 CoinMarketCap IDs of the cryptocurrency.
@@ -196,71 +463,205 @@ class CryptoCurrencyFetcher():
                       "error_message": None
                   }
         """
-        result_dict = {
-            "price": None,
-            "date": None,
-            "is_error": False,
-            "error_message": None
-        }
-
-        coin_gecko_price = self.get_current_price_from_coin_gecko(
-            coin_id=coin_ids["coin_gecko"],
+        return self.fetch_current_coin_prices(
+            [coin_ids],
             vs_currency=vs_currency
-        )
-        if coin_gecko_price is None:
-            cmc_price = self.get_current_price_from_cmc(
-                coin_id=coin_ids["coin_market_cap"],
-                vs_currency=vs_currency
-            )
-            if cmc_price:
-                logger.info(
-                    f"Fetched price from CoinMarketCap for {coin_ids['coin_market_cap']}: {cmc_price}"
-                )
-                price = cmc_price
-        else:
-            price = coin_gecko_price
-            logger.info(
-                f"Fetched price from CoinGecko for {coin_ids['coin_gecko']}: {price}"
-            )
-        if price is None:
-            result_dict["is_error"] = True
-            result_dict["error_message"] = (
-                f"Failed to fetch price for {coin_ids['coin_gecko']} "
-                f"from both CoinGecko and CoinMarketCap."
+        )[0]
+
+    def fetch_cc_prices_for_date_range_from_coin_gecko(
+        self,
+        coin_id: str,
+        start_date,
+        end_date,
+        vs_currency: str = 'usd'
+    ) -> pd.DataFrame:
+        """
+        Fetches every price of a cryptocurrency between start_date and
+        end_date (both inclusive) with a single /market_chart/range request.
+        CoinGecko returns hourly points for ranges up to 90 days and daily
+        points (00:00 UTC) for longer ones.
+
+        :param coin_id: The CoinGecko ID of the cryptocurrency.
+        :param start_date: First date (date or datetime) of the range.
+        :param end_date: Last date (date or datetime) of the range.
+        :param vs_currency: The currency to get the prices in.
+        :return: A DataFrame with the columns "timestamp" (UTC) and
+            "price", empty if the request failed.
+        """
+        prices = pd.DataFrame(columns=["timestamp", "price"])
+        api_url, params = self.get_price_range_request(
+            coin_id, start_date, end_date, vs_currency)
+
+        def fetch():
+            response = http_client.get(
+                api_url,
+                provider="coin_gecko",
+                params=params,
+                headers={'accept': 'application/json'}
             )
-            return result_dict
-        result_dict["date"] = datetime.today().strftime(
-            app_config.get("mysql_column_format").get('date'))
-        result_dict["price"] = price
-        return result_dict
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            data = get_response_cache().get_or_fetch(
+                "coin_gecko", api_url, params, fetch,
+                ttl=self.get_price_range_ttl(params))
+        except requests.exceptions.RequestException as e:
+            logger.warning(
+                f"Error fetching price range of {coin_id} from CoinGecko: {e}")
+            return prices
+        return self.parse_price_range(data, coin_id, params)
+
+    def get_price_range_request(
+        self,
+        coin_id: str,
+        start_date,
+        end_date,
+        vs_currency: str = 'usd'
+    ) -> tuple[str, dict]:
+        """URL and params of a /market_chart/range request."""
+        start = pd.Timestamp(start_date).normalize().tz_localize("UTC")
+        end = pd.Timestamp(end_date).normalize().tz_localize("UTC") + \
+            pd.Timedelta(days=1)
+        api_url = self.request_info["coin_gecko_range"]["url"].format(
+            coin_id=coin_id)
+        params = {
+            "vs_currency": vs_currency.lower(),
+            "from": int(start.timestamp()),
+            "to": int(end.timestamp())
+        }
+        return api_url, params
+
+    def get_price_range_ttl(self, params: dict) -> float | None:
+        """
+        Response cache ttl of a /market_chart/range request: permanent if
+        the range ended before today.
+        """
+        last_day = pd.Timestamp(params["to"] - 1, unit="s").date()
+        return get_response_cache().ttl_for_date(last_day)
+
+    def parse_price_range(
+        self,
+        data: dict,
+        coin_id: str,
+        params: dict
+    ) -> pd.DataFrame:
+        """Prices DataFrame of a /market_chart/range response."""
+        if not data.get("prices"):
+            logger.warning(
+                f"No prices found for {coin_id} between "
+                f"{pd.Timestamp(params['from'], unit='s').date()} and "
+                f"{pd.Timestamp(params['to'], unit='s').date()}.")
+            return pd.DataFrame(columns=["timestamp", "price"])
+        prices = pd.DataFrame(data["prices"], columns=["timestamp", "price"])
+        prices["timestamp"] = pd.to_datetime(
+            prices["timestamp"], unit="ms", utc=True)
+        end = pd.Timestamp(params["to"], unit="s", tz="UTC")
+        return prices[prices["timestamp"] < end]
+
+    def resample_prices_to_days(
+        self,
+        prices: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Resamples a price range (see
+        fetch_cc_prices_for_date_range_from_coin_gecko) to one price per UTC
+        day, the first one of the day, as /coins/{id}/history reports it.
+
+        :return: A DataFrame with the columns "date" (datetime.date) and
+            "price", sorted by date.
+        """
+        if prices.empty:
+            return pd.DataFrame(columns=["date", "price"])
+        prices = prices.sort_values("timestamp")
+        daily = prices.groupby(prices["timestamp"].dt.date)["price"].first()
+        return daily.rename_axis("date").reset_index()
+
+    def resample_prices_to_iso_weeks(
+        self,
+        prices: pd.DataFrame
+    ) -> dict[tuple, dict]:
+        """
+        Resamples a price range to one price per ISO week: the price of the
+        Monday, or of the first day of the week the range covers.
+
+        :return: A dictionary with (iso_year, iso_week) as keys and
+            {"iso_year", "iso_week", "date" (Monday), "price"} as values.
+        """
+        results = {}
+        daily = self.resample_prices_to_days(prices)
+        for day, price in zip(daily["date"], daily["price"]):
+            iso_year, iso_week, _ = day.isocalendar()
+            if (iso_year, iso_week) in results:
+                continue
+            monday = datetime.fromisocalendar(iso_year, iso_week, 1)
+            results[(iso_year, iso_week)] = {
+                "iso_year": iso_year,
+                "iso_week": iso_week,
+                "date": monday.strftime(
+                    app_config.get("mysql_column_format").get('date')),
+                "price": float(price)
+            }
+        return results
 
     def fetch_cc_data_for_last_52_weeks_from_coin_gecko(
         self,
         coin_id: str,
+        vs_currency: str = 'usd'
     ):
         """
-        Fetches the price of a given cryptocurrency for the last 52 weeks from the CoinGecko API.
+        Fetches the price of a given cryptocurrency for the last 52 weeks
+        from the CoinGecko API with one range request.
 
         :param coin_id: The CoinGecko ID of the cryptocurrency (e.g., 'bitcoin', 'ethereum').
-        :return: A dictionary with dates as keys and prices in USD as values.
+        :param vs_currency: The currency to get the prices in.
+        :return: A dictionary with (iso_year, iso_week) as keys and
+            {"iso_year", "iso_week", "date", "price"} as values. The price
+            is None for weeks without data.
         """
-        results = {}
         today = datetime.today()
+        return self.get_last_52_weeks(
+            self.resample_prices_to_iso_weeks(
+                self.fetch_cc_prices_for_date_range_from_coin_gecko(
+                    coin_id=coin_id,
+                    start_date=self.get_last_52_weeks_start(today),
+                    end_date=today,
+                    vs_currency=vs_currency
+                )
+            ),
+            today
+        )
+
+    def get_last_52_weeks_start(self, today: datetime) -> datetime:
+        """Monday of the oldest of the last 52 weeks."""
+        first_week = today - timedelta(weeks=51)
+        return first_week - timedelta(days=first_week.weekday())
+
+    def get_last_52_weeks(
+        self,
+        weekly_prices: dict[tuple, dict],
+        today: datetime
+    ) -> dict[tuple, dict]:
+        """
+        The last 52 weeks of weekly_prices (see resample_prices_to_iso_weeks),
+        newest first. Missing weeks get a None price.
+        """
+        results = {}
         for i in range(52):
             week_date = today - timedelta(weeks=i)
             # Get Monday of the week
             monday = week_date - timedelta(days=week_date.weekday())
             iso_year, iso_week, _ = monday.isocalendar()
-            results[(iso_year, iso_week)] = {
-                "iso_year": iso_year,
-                "iso_week": iso_week,
-                "date": monday.strftime(app_config.get("mysql_column_format").get('date')),
-                "price": self.fetch_cc_data_for_iso_week_from_coin_gecko(
-                    coin_id=coin_id,
-                    iso_week=iso_week,
-                    iso_year=iso_year
-                )
-            }
+            results[(iso_year, iso_week)] = weekly_prices.get(
+                (iso_year, iso_week),
+                {
+                    "iso_year": iso_year,
+                    "iso_week": iso_week,
+                    "date": monday.strftime(
+                        app_config.get("mysql_column_format").get('date')),
+                    "price": None
+                }
+            )
         return results
 
     def fetch_cc_data_for_iso_week_from_coin_gecko(
@@ -282,17 +683,22 @@ class CryptoCurrencyFetcher():
         :return: The price in USD or an error message.
         """
 
-        target_date = datetime.fromisocalendar(iso_year, iso_week, 1)
-        target_date = target_date.strftime("%d-%m-%Y")  # Format as dd-mm-yyyy
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/history?date={target_date}"
+        week_start = datetime.fromisocalendar(iso_year, iso_week, 1)
+        target_date = week_start.strftime("%d-%m-%Y")  # Format as dd-mm-yyyy
+        url = self.request_info["coin_gecko"]["url"].format(coin_id=coin_id)
+        params = {"localization": "false", "date": target_date}
 
-        try:
-            # Make the API request
-            response = requests.get(url)
+        def fetch():
+            response = http_client.get(url, provider="coin_gecko", params=params)
             response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
+            return response.json()
 
-            # Parse the JSON response
-            data = response.json()
+        try:
+            # Past dates never change, so re-runs are served from disk
+            response_cache = get_response_cache()
+            data = response_cache.get_or_fetch(
+                "coin_gecko", url, params, fetch,
+                ttl=response_cache.ttl_for_date(week_start))
 
             # The data can be empty if the coin didn't exist yet
             if not data or 'market_data' not in data:
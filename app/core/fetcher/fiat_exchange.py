@@ -4,6 +4,8 @@ from datetime import date, timedelta
 
 import app.core.secret_handler as secrets
 from app.core.app_config import get_config
+from app.core.utils import http_client
+from app.core.utils.response_cache import get_response_cache
 
 secret_config = secrets.get_config()
 app_config = get_config()
@@ -38,11 +40,18 @@ def get_historical_exchange_rate_for_usd(date_str, base_currency):
         'to': target_currency
     }
 
-    try:
-        response = requests.get(api_url, params=params)
+    def fetch():
+        response = http_client.get(
+            api_url, provider="frankfurter", params=params)
         response.raise_for_status()
+        return response.json()
 
-        data = response.json()
+    try:
+        # Rates of past dates are final, so they are cached permanently
+        response_cache = get_response_cache()
+        data = response_cache.get_or_fetch(
+            "frankfurter", api_url, params, fetch,
+            ttl=response_cache.ttl_for_date(date_str))
 
         # Check if rates are present and the target currency is in the rates
         if 'rates' in data and target_currency in data['rates']:
@@ -0,0 +1,68 @@
+import threading
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+
+class ProviderStats:
+    """
+    Which price provider answers first in hedged requests. Every race
+    updates an exponentially weighted share of the coins each provider won
+    (1.0: won all, 0.0: lost or failed) and its latency, and order() puts
+    the current winner first so it becomes the primary request.
+    """
+    def __init__(self, ewma_alpha: float = 0.2):
+        self.ewma_alpha = ewma_alpha
+        # {provider: {"score", "latency", "wins", "races"}}
+        self._stats: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        provider: str,
+        won_share: float,
+        latency: float = None
+    ):
+        """Records a race: the share of coins provider delivered first."""
+        with self._lock:
+            stats = self._stats.setdefault(provider, {
+                "score": won_share,
+                "latency": latency,
+                "wins": 0,
+                "races": 0
+            })
+            stats["score"] += self.ewma_alpha * (won_share - stats["score"])
+            if latency is not None:
+                stats["latency"] = latency if stats["latency"] is None else \
+                    stats["latency"] + self.ewma_alpha * (
+                        latency - stats["latency"])
+            stats["races"] += 1
+            stats["wins"] += won_share > 0
+
+    def order(self, providers: list[str]) -> list[str]:
+        """
+        providers sorted by score, best first. Providers without races
+        keep their configured position.
+        """
+        with self._lock:
+            scores = {
+                provider: self._stats[provider]["score"]
+                for provider in providers if provider in self._stats
+            }
+        if len(scores) < len(providers):
+            return list(providers)
+        return sorted(providers, key=lambda provider: -scores[provider])
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                provider: dict(stats)
+                for provider, stats in self._stats.items()
+            }
+
+
+provider_stats = ProviderStats(
+    ewma_alpha=app_config.get("hedged_requests", {}).get("ewma_alpha", 0.2))
@@ -6,6 +6,7 @@ import os
 from typing import List
 import pandas as pd
 from app.core.app_config import get_config
+from app.core.utils.rate_limiter import get_rate_limiter
 
 app_config = get_config()
 
@@ -82,6 +83,7 @@ class RedditFetcher():
             self,
             url: str) -> dict:
         try:
+            get_rate_limiter("reddit").acquire()
             submission = self.client.submission(url=url)
             fetched_post_data = self.get_post_data(submission)
             logging.info(f"Fetched post: {fetched_post_data['title']}")
@@ -97,6 +99,11 @@ class RedditFetcher():
         logging.info(
             f"Fetching new posts from subreddit: {subreddit_name}")
         try:
+            # praw pages listings by 100 posts per request, up to the
+            # 1000 posts Reddit serves when limit is None
+            get_rate_limiter("reddit").acquire(
+                tokens=10 if limit is None
+                else min(max(-(-limit // 100), 1), 10))
             submissions = self.client.subreddit(
                     subreddit_name).new(limit=limit)
             post_data = []
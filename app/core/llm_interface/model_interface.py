@@ -2,6 +2,7 @@ import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 from app.core.app_config import get_config
+from app.core.utils.rate_limiter import get_rate_limiter
 import app.core.secret_handler as secrets
 import logging
 
@@ -49,6 +50,7 @@ class GeminiProVision():
         """
         try:
             input_parts = [prompt_text, img]
+            get_rate_limiter("gemini").acquire()
             response = self.client.generate_content(input_parts)
         except Exception as e:
             logging.error(f"google.generativeai API error: {e}")
@@ -88,6 +90,7 @@ class GeminiProText():
         """
         try:
             input_parts = [prompt_text]
+            get_rate_limiter("gemini").acquire()
             response = self.client.generate_content(
                 input_parts,
                 generation_config=config
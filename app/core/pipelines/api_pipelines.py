@@ -1,13 +1,18 @@
+import asyncio
+
 from app.core.utils.utils import set_logger
 from app.core.services.process_reddit_posts import RedditPostProcessor
 from app.core.services.process_portfolio import PortfolioProcessor
 from app.core.services.process_asset import AssetProcessor
 from app.core.fetcher.reddit import RedditFetcher
 from app.core.database.db_interface import DatabaseInterface
+from app.core.database.async_db_interface import AsyncDatabaseInterface
 from app.core.fetcher.crypto_currency import CryptoCurrencyFetcher
 from app.core.database.reddit_post_db_handler import (
-    insert_reddit_posts_to_db
+    get_reddit_post_statuses,
+    insert_reddit_posts_to_db_async
 )
+from app.core.database.portfolio_db_handler import portfolio_already_exists
 from app.core.pipelines.pipelines import (
     fetch_reddit_post_and_upload_to_db_pipeline,
     reddit_posts_to_portfolio_processor_pipeline,
@@ -17,8 +22,23 @@ from app.core.pipelines.pipelines import (
 logger = set_logger(name=__name__)
 
 
-async def redditpost_url_evaluation_pipeline(
+def get_reddit_post_status(
+    db_interface: DatabaseInterface,
+    reddit_post_id: str,
+    use_cache: bool = True
+) -> tuple[bool, bool]:
+    """Returns (processed, is_portfolio) of a post with a single query."""
+    statuses = get_reddit_post_statuses(
+        db_interface, [reddit_post_id], use_cache=use_cache)
+    status = statuses.get(reddit_post_id)
+    if not status:
+        return False, False
+    return status["processed"], status["is_portfolio"]
+
+
+def redditpost_url_evaluation_pipeline(
     url: str,
+    db_interface: DatabaseInterface,
     rp_processor: RedditPostProcessor,
     portfolio_processor: PortfolioProcessor,
     asset_processor:  AssetProcessor,
@@ -28,17 +48,19 @@ async def redditpost_url_evaluation_pipeline(
 ) -> dict:
     "Start with a reddit url, fetch the post, upload it to the db and"
     "evaluate the portfolio based on the post."
+    # Blocking from start to end (Reddit, LLM, DB): the API runs it in a
+    # worker thread. db_interface is the interface the processors use.
 
     reddit_post_id = reddit_fetcher.get_reddit_post_id_from_url(
         url=url
     )
-    if not rp_processor.reddit_post_processed(reddit_post_id=reddit_post_id) \
-            and not rp_processor.reddit_post_is_portfolio(
-                reddit_post_id=reddit_post_id) \
-            or overwrite:
-        if not portfolio_processor.portfolio_already_exists(
-                "reddit",
-                reddit_post_id
+    processed, is_portfolio = get_reddit_post_status(
+        db_interface, reddit_post_id)
+    if not processed and not is_portfolio or overwrite:
+        if not portfolio_already_exists(
+                db_interface,
+                source="reddit",
+                source_id=reddit_post_id
         ):
             uploaded_reddit_id = fetch_reddit_post_and_upload_to_db_pipeline(
                 url=url,
@@ -54,15 +76,18 @@ async def redditpost_url_evaluation_pipeline(
             asset_processor=asset_processor,
             cc_fetcher=cc_fetcher
         )
-        processed_reddit_post_id = uploaded_reddit_id     
+        processed_reddit_post_id = uploaded_reddit_id
     else:
         logger.info(
             f"Reddit post with ID {reddit_post_id} has already been processed."
         )
         processed_reddit_post_id = reddit_post_id
 
-    if rp_processor.reddit_post_is_portfolio(
-                reddit_post_id=processed_reddit_post_id):
+    # The processing above may have changed the status, so skip the
+    # cached result of the first read
+    _, is_portfolio = get_reddit_post_status(
+        db_interface, processed_reddit_post_id, use_cache=False)
+    if is_portfolio:
         portfolio = evaluate_portfolio_pipeline(
             source="reddit",
             source_id=processed_reddit_post_id,
@@ -83,14 +108,15 @@ async def redditpost_url_evaluation_pipeline(
 
 async def redditpost_url2db_pipeline(
         url: str,
-        db_interface: DatabaseInterface,
+        db_interface: AsyncDatabaseInterface,
         reddit_fetcher: RedditFetcher
 ):
 
     fetched_posts_data = None
 
     try:
-        fetched_posts_data = reddit_fetcher.fetch_posts_by_post_url(
+        fetched_posts_data = await asyncio.to_thread(
+            reddit_fetcher.fetch_posts_by_post_url,
             url=url
         )
         # --- Insert data into Database ---
@@ -99,7 +125,7 @@ async def redditpost_url2db_pipeline(
                 f"""Attempting to insert
                 {len(fetched_posts_data)} posts into database...""")
             try:
-                inserted_count = insert_reddit_posts_to_db(
+                inserted_count = await insert_reddit_posts_to_db_async(
                     db_interface=db_interface,
                     reddit_post=fetched_posts_data
                 )
@@ -1,6 +1,6 @@
-from datetime import timedelta
 from datetime import datetime
-import time
+
+import requests
 
 from app.core.entities.portfolio import Portfolio
 from app.core.utils.utils import set_logger
@@ -11,9 +11,24 @@ from app.core.services.process_asset import AssetProcessor
 from app.core.fetcher.reddit import RedditFetcher
 from app.core.database.db_interface import DatabaseInterface
 from app.core.fetcher.crypto_currency import CryptoCurrencyFetcher
+from app.core.fetcher.async_crypto_currency import AsyncCryptoCurrencyFetcher
+from app.core.fetcher.coin_mapping import (
+    diff_mappings,
+    get_coin_mapping_index,
+    get_mapping_version,
+    write_mapping_artifact
+)
+from app.core.scrapers.coingecko import (
+    fetch_cmc_coin_map,
+    fetch_coin_gecko_coin_map
+)
 from app.core.entities.purchase import Purchase
 from app.core.database.asset_db_handler import (
-    get_tracked_crypto_currency_in_db
+    get_tracked_crypto_currency_in_db,
+    get_price_key
+)
+from app.core.database.reddit_post_db_handler import (
+    get_unprocessed_reddit_post_ids
 )
 from app.core.entities.portfolio import Portfolio
 from app.core.app_config import get_config
@@ -35,21 +50,26 @@ def reddit_posts_to_portfolio_processor_pipeline(
     a portfolio process on it and uploads the portfolio to the DB.
     """
     reddit_process_result = rp_processor.process(
-        reddit_post_id=reddit_id
+        reddit_post_id=reddit_id,
+        update_status=False
     )
 
-    portfolio_processor.upload_reddit_post_purchase_data_to_db_pipeline(
-        reddit_post_result_dict=reddit_process_result
-    )
+    # Purchases, portfolio and post status are stored atomically
+    with portfolio_processor.db_interface.transaction():
+        portfolio_processor.upload_reddit_post_purchase_data_to_db_pipeline(
+            reddit_post_result_dict=reddit_process_result
+        )
 
-    # Initialize portfolios in the database for each processed Reddit post
-    if not app_config["debug"]["is_debug"]:
-        if reddit_process_result['result']["is_portfolio"]:
-            portfolio_processor.initialize_portfolio_in_db(
-                source="reddit",
-                source_id=reddit_process_result["source_id"],
-                created_date=reddit_process_result["created_date"]
-            )
+        # Initialize portfolios in the database for each processed Reddit post
+        if not app_config["debug"]["is_debug"]:
+            if reddit_process_result['result']["is_portfolio"]:
+                portfolio_processor.initialize_portfolio_in_db(
+                    source="reddit",
+                    source_id=reddit_process_result["source_id"],
+                    created_date=reddit_process_result["created_date"]
+                )
+            if reddit_process_result.get("result") is not None:
+                rp_processor.update_post_status_in_db(reddit_process_result)
     if reddit_process_result["result"]["is_portfolio"]:
         init_asset_into_db_pipeline(
             asset_data=reddit_process_result["result"]["purchases"],
@@ -59,6 +79,48 @@ def reddit_posts_to_portfolio_processor_pipeline(
     logger.info(f"Initialized portfolio from reddit for id: {reddit_id}.")
 
 
+def redditposts_processor_pipeline(
+    rp_processor: RedditPostProcessor,
+    portfolio_processor: PortfolioProcessor,
+    asset_processor: AssetProcessor,
+    cc_fetcher: CryptoCurrencyFetcher,
+    reddit_ids: list[str] = None,
+    n_posts: int = 10
+):
+    """
+    Runs the portfolio processor on a batch of reddit posts. Without
+    reddit_ids the n_posts oldest unprocessed posts are taken. The work left
+    is decided with one status query for the whole batch.
+    """
+    if reddit_ids is None:
+        reddit_ids = get_unprocessed_reddit_post_ids(
+            rp_processor.db_interface, n_posts=n_posts)
+    statuses = rp_processor.get_post_statuses(reddit_ids)
+    pending_ids = [
+        reddit_id for reddit_id in reddit_ids
+        if reddit_id in statuses and not statuses[reddit_id]["processed"]
+    ]
+    skipped = len(reddit_ids) - len(pending_ids)
+    if skipped:
+        logger.info(
+            f"Skipping {skipped} reddit posts that are processed or unknown.")
+    for reddit_id in pending_ids:
+        try:
+            reddit_posts_to_portfolio_processor_pipeline(
+                reddit_id=reddit_id,
+                rp_processor=rp_processor,
+                portfolio_processor=portfolio_processor,
+                asset_processor=asset_processor,
+                cc_fetcher=cc_fetcher
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to process reddit post {reddit_id}: {e}",
+                exc_info=True
+            )
+    return pending_ids
+
+
 def run_url_to_portfolio_evaluation_pipeline(
     url: str,
     rp_processor: RedditPostProcessor,
@@ -109,44 +171,32 @@ def process_purchases_pipeline(
     cc_fetcher: CryptoCurrencyFetcher
 ) -> list[Purchase]:
     current_date = datetime.today()
-    for purchase in purchases:
+    iso_year, iso_week, _ = current_date.isocalendar()
+    price_keys = [
+        get_price_key(purchase.name, purchase.abbreviation, iso_week, iso_year)
+        for purchase in purchases
+    ]
+    # One query for all prices of the current week that are already stored
+    current_prices = {
+        price_key: row["price"] for price_key, row in
+        asset_processor.get_asset_prices_from_db_by_keys(price_keys).items()
+    }
+    # Only the missing prices are fetched from the API
+    missing_assets = [
+        (purchase.name, purchase.abbreviation)
+        for purchase, price_key in zip(purchases, price_keys)
+        if price_key not in current_prices
+    ]
+    if missing_assets:
+        current_prices.update(
+            asset_processor.fetch_and_upload_current_prices(missing_assets)
+        )
 
-        if asset_processor.cc_price_of_current_iso_week_is_tracked(
-            name=purchase.name,
-            abbreviation=purchase.abbreviation,
-            iso_week=current_date.isocalendar()[1],
-            iso_year=current_date.isocalendar()[0]
-        ):
-            current_asset_price_data = asset_processor.\
-                get_asset_price_from_db_by_iso_week_year(
-                    name=purchase.name,
-                    abbreviation=purchase.abbreviation,
-                    iso_week=current_date.isocalendar()[1],
-                    iso_year=current_date.isocalendar()[0]
-                )
-            current_asset_price = current_asset_price_data["price"]
-        else:
-            coinids = asset_processor.get_provider_coin_ids(
-                name=purchase.name,
-                abbreviation=purchase.abbreviation
-            )
-            if not coinids:
-                logger.error(
-                    f"Coin IDs for {purchase.name} ({purchase.abbreviation}) "
-                    f"not found in the database."
-                )
-                continue
-            current_value_dict = cc_fetcher.fetch_current_coin_price(coinids)
-            _ = asset_processor.upload_crypto_currency_price_to_db(
-                name=purchase.name,
-                abbreviation=purchase.abbreviation,
-                price=current_value_dict["price"],
-                date=current_date,
-                iso_week=current_date.isocalendar()[1],
-                iso_year=current_date.isocalendar()[0],
-                currency=current_value_dict.get("currency", "usd")
-            )
-            current_asset_price = current_value_dict["price"]
+    for purchase, price_key in zip(purchases, price_keys):
+        if price_key not in current_prices:
+            # No provider coin IDs for this asset
+            continue
+        current_asset_price = current_prices[price_key]
         if current_asset_price is None:
             logger.warning(
                 f"Can't fetch current {purchase.name} price."
@@ -231,20 +281,20 @@ def get_current_and_past_btc_price(
     current_date = datetime.today()
     current_btc_price = None
     past_btc_price_data = None
+    current_price_key = get_price_key(
+        'bitcoin', 'btc',
+        current_date.isocalendar()[1],
+        current_date.isocalendar()[0]
+    )
+    past_price_key = get_price_key(
+        'bitcoin', 'btc', past_iso_week, past_iso_year)
+    # Current and past BTC price in one query
+    btc_prices = asset_processor.get_asset_prices_from_db_by_keys(
+        [current_price_key, past_price_key]
+    )
     # Get current BTC price data
-    if asset_processor.cc_price_of_current_iso_week_is_tracked(
-            name='bitcoin',
-            abbreviation='btc',
-            iso_week=current_date.isocalendar()[1],
-            iso_year=current_date.isocalendar()[0]
-    ):
-        current_asset_price_data = asset_processor.\
-                get_asset_price_from_db_by_iso_week_year(
-                    name='bitcoin',
-                    abbreviation='btc',
-                    iso_week=current_date.isocalendar()[1],
-                    iso_year=current_date.isocalendar()[0]
-                )
+    if current_price_key in btc_prices:
+        current_asset_price_data = btc_prices[current_price_key]
     else:
         current_asset_price_data = cc_fetcher.fetch_current_coin_price(
             asset_processor.get_provider_coin_ids(
@@ -262,13 +312,7 @@ def get_current_and_past_btc_price(
         return None, None
 
     # Get past BTC price data
-    past_btc_price_data = asset_processor.\
-        get_asset_price_from_db_by_iso_week_year(
-            name="bitcoin",
-            abbreviation="btc",
-            iso_week=past_iso_week,
-            iso_year=past_iso_year
-        )
+    past_btc_price_data = btc_prices.get(past_price_key)
     if not past_btc_price_data:
         logger.error(
             f"""Bitcoin price for week
@@ -281,6 +325,48 @@ def get_current_and_past_btc_price(
     return current_btc_price, past_btc_price_data
 
 
+def _get_missing_weekly_price_rows(
+    asset_processor: AssetProcessor,
+    name: str,
+    abbreviation: str,
+    weekly_prices: dict[tuple, dict],
+    currency: str
+) -> list[dict]:
+    """
+    Price rows of the weeks in weekly_prices that are not stored yet,
+    checked with one keyed query.
+    """
+    tracked_prices = asset_processor.get_asset_prices_from_db_by_keys([
+        (name, abbreviation, iso_week, iso_year)
+        for iso_year, iso_week in weekly_prices
+    ])
+    price_rows = []
+    for (iso_year, iso_week), week_data in weekly_prices.items():
+        price_key = get_price_key(name, abbreviation, iso_week, iso_year)
+        if price_key in tracked_prices:
+            logger.info(
+                f"Crypto currency {name} ({abbreviation}) price for "
+                f"week {iso_week} of {iso_year} is already tracked."
+            )
+            continue
+        if week_data["price"] is None:
+            logger.warning(
+                f"No price for {name} ({abbreviation}) in "
+                f"week {iso_week} of {iso_year}."
+            )
+            continue
+        price_rows.append({
+            "name": name,
+            "abbreviation": abbreviation,
+            "price": week_data["price"],
+            "currency": currency,
+            "date": week_data["date"],
+            "iso_week": iso_week,
+            "iso_year": iso_year
+        })
+    return price_rows
+
+
 def extract_and_save_cc_prices_of_past_year_pipeline(
     asset_processor: AssetProcessor,
     cc_fetcher: CryptoCurrencyFetcher,
@@ -288,7 +374,10 @@ def extract_and_save_cc_prices_of_past_year_pipeline(
     abbreviation: str,
     currency: str
 ):
-    today = datetime.today()
+    """
+    Backfills the weekly prices of the past year of an asset with one
+    CoinGecko range request and one bulk upsert of the missing weeks.
+    """
     asset_data = asset_processor.get_asset_from_db(
         name=name,
         abbreviation=abbreviation
@@ -298,38 +387,76 @@ def extract_and_save_cc_prices_of_past_year_pipeline(
             f"Asset {name} ({abbreviation}) not found in the database."
         )
         return None
-    for i in range(52):
-        week_date = today - timedelta(weeks=i)
-        # Get Monday of the week
-        monday = week_date - timedelta(days=week_date.weekday())
-        iso_year, iso_week, _ = monday.isocalendar()
-        cc_price = \
-            cc_fetcher.fetch_cc_data_for_iso_week_from_coin_gecko(
-                coin_id=asset_data["coin_gecko_id"],
-                iso_week=iso_week,
-                iso_year=iso_year
-            )
-        if asset_processor.cc_price_is_tracked(
+    weekly_prices = cc_fetcher.fetch_cc_data_for_last_52_weeks_from_coin_gecko(
+        coin_id=asset_data["coin_gecko_id"],
+        vs_currency=currency
+    )
+    upload_report = asset_processor.upload_crypto_currency_prices_to_db(
+        _get_missing_weekly_price_rows(
+            asset_processor=asset_processor,
             name=name,
             abbreviation=asset_data["abbreviation"],
-            iso_week=iso_week,
-            iso_year=iso_year
-        ):
-            logger.info(
-                f"Crypto currency {name} ({abbreviation}) price for "
-                f"week {iso_week} of {iso_year} is already tracked."
+            weekly_prices=weekly_prices,
+            currency=currency
+        )
+    )
+    if upload_report["failed"]:
+        logger.warning(
+            f"Failed to upload {len(upload_report['failed'])} weekly prices "
+            f"of {name} ({abbreviation})."
+        )
+    return upload_report
+
+
+def extract_and_save_cc_prices_of_past_year_for_assets_pipeline(
+    asset_processor: AssetProcessor,
+    cc_fetcher: AsyncCryptoCurrencyFetcher,
+    assets: list[tuple],
+    currency: str
+):
+    """
+    Backfills the weekly prices of the past year of many (name,
+    abbreviation) assets. The range requests run concurrently within the
+    CoinGecko limits and all missing weeks are written in one bulk upsert.
+    """
+    assets_data = []
+    for name, abbreviation in dict.fromkeys(assets):
+        asset_data = asset_processor.get_asset_from_db(
+            name=name,
+            abbreviation=abbreviation
+        )
+        if not asset_data or not asset_data.get("coin_gecko_id"):
+            logger.error(
+                f"Asset {name} ({abbreviation}) not found in the database."
             )
             continue
-        asset_processor.upload_crypto_currency_price_to_db(
-                name=name,
-                abbreviation=asset_data["abbreviation"],
-                price=cc_price,
-                date=monday,
-                iso_week=iso_week,
-                iso_year=iso_year,
-                currency=currency
-            )
-        time.sleep(10)
+        assets_data.append((name, asset_data))
+    if not assets_data:
+        return None
+    weekly_prices_by_coin = \
+        cc_fetcher.fetch_cc_data_for_last_52_weeks_for_coins(
+            coin_ids=[
+                asset_data["coin_gecko_id"] for _, asset_data in assets_data
+            ],
+            vs_currency=currency
+        )
+    price_rows = []
+    for name, asset_data in assets_data:
+        price_rows.extend(_get_missing_weekly_price_rows(
+            asset_processor=asset_processor,
+            name=name,
+            abbreviation=asset_data["abbreviation"],
+            weekly_prices=weekly_prices_by_coin[asset_data["coin_gecko_id"]],
+            currency=currency
+        ))
+    upload_report = asset_processor.upload_crypto_currency_prices_to_db(
+        price_rows
+    )
+    if upload_report["failed"]:
+        logger.warning(
+            f"Failed to upload {len(upload_report['failed'])} weekly prices."
+        )
+    return upload_report
 
 
 def upload_portfolio_purchases_to_db_pipeline(
@@ -363,34 +490,30 @@ def init_asset_into_db_pipeline(
     """
     Initialize assets into the database.
     """
-    for asset in asset_data:
-        if asset_processor.crypto_currency_is_tracked(
-            name=asset["name"],
-            abbreviation=asset["abbreviation"]
-        ):
-            logger.info(
-                f"Crypto currency {asset['name']} ({asset['abbreviation']})"
-                " is already tracked."
+    # All newly tracked assets are committed together
+    with asset_processor.db_interface.transaction():
+        for asset in asset_data:
+            if asset_processor.crypto_currency_is_tracked(
+                name=asset["name"],
+                abbreviation=asset["abbreviation"]
+            ):
+                logger.info(
+                    f"Crypto currency {asset['name']} ({asset['abbreviation']})"
+                    " is already tracked."
+                )
+                continue
+            coin_ids = cc_fetcher.resolve_coin_ids(
+                name=asset["name"],
+                abbreviation=asset["abbreviation"]
+            )
+            asset_processor.insert_or_update_asset(
+                name=asset["name"],
+                abbreviation=asset["abbreviation"],
+                provider_coin_id={
+                    "coin_market_cap": coin_ids["coin_market_cap"],
+                    "coin_gecko": coin_ids["coin_gecko"]
+                }
             )
-            continue
-        cmc_coin_id = cc_fetcher.find_coin_id(
-            name=asset["name"],
-            abbreviation=asset["abbreviation"],
-            provider="coin_market_cap"
-        )
-        gecko_coin_id = cc_fetcher.find_coin_id(
-            name=asset["name"],
-            abbreviation=asset["abbreviation"],
-            provider="coin_gecko"
-        )
-        asset_processor.insert_or_update_asset(
-            name=asset["name"],
-            abbreviation=asset["abbreviation"],
-            provider_coin_id={
-                "coin_market_cap": cmc_coin_id,
-                "coin_gecko": gecko_coin_id
-            }
-        )
 
 
 def fetch_and_upload_weeklsy_crypto_prices_to_db_pipeline(
@@ -404,23 +527,107 @@ def fetch_and_upload_weeklsy_crypto_prices_to_db_pipeline(
     tracked_ccs = get_tracked_crypto_currency_in_db(
         db_interface=db_interface
     )
-    failed_assets = []
     if not tracked_ccs:
         logger.warning("No tracked crypto currencies found in the database.")
         return
-    else:
-        for coin_data in tracked_ccs:
-            asset_processed = asset_processor.process_asset(
-                name=coin_data["name"],
-                abbreviation=coin_data["abbreviation"]
-            )
-            if not asset_processed:
-                failed_assets.append(coin_data["abbreviation"])
+    # Gather every price first, then write them in one transaction
+    price_rows, failed_fetches = asset_processor.fetch_current_prices(
+        assets=[
+            (coin_data["name"], coin_data["abbreviation"])
+            for coin_data in tracked_ccs
+        ]
+    )
+    upload_report = asset_processor.upload_crypto_currency_prices_to_db(
+        price_rows
+    )
+    failed_assets = [
+        failed["abbreviation"] for failed in failed_fetches
+    ] + [
+        failed["row"].get("abbreviation")
+        for failed in upload_report["failed"]
+    ]
     if len(failed_assets) > 0:
         logger.warning(
             f"Failed to process the following assets: {failed_assets}"
         )
-    logger.info("Uploaded weekly crypto prices to the database.")
+    logger.info(
+        f"Uploaded {len(upload_report['uploaded'])} weekly crypto prices "
+        "to the database."
+    )
+
+
+def refresh_coin_mapping_pipeline(
+    cc_fetcher: CryptoCurrencyFetcher
+) -> dict:
+    """
+    Downloads the coin lists of CoinGecko and CoinMarketCap, diffs them
+    against the current mapping and publishes a new mapping artifact if
+    anything changed. Running processes pick the new version up on their
+    next lookup. A provider whose download fails, or that would lose more
+    than max_delisted_share of its coins, keeps its current rows.
+    Returns {"version", "providers": {provider: {"added", "delisted",
+    "total", "kept_current"}}} with the added and delisted coin IDs.
+    """
+    settings = app_config.get("mapping_artifact", {})
+    coin_map_fetchers = {
+        "coin_gecko": fetch_coin_gecko_coin_map,
+        "coin_market_cap": fetch_cmc_coin_map
+    }
+    version = get_mapping_version(refresh=True)
+    # The first refresh moves the CSV mappings to an artifact
+    changed = version is None
+    rows_by_provider = {}
+    report = {"version": version, "providers": {}}
+    for provider, fetch_coin_map in coin_map_fetchers.items():
+        request_info = cc_fetcher.request_info[provider]
+        current = get_coin_mapping_index(
+            provider,
+            f"./data/{request_info['mapping_file']}",
+            request_info["id_column"]
+        ).rows
+        try:
+            new = fetch_coin_map()
+        except (requests.exceptions.RequestException, ValueError,
+                KeyError) as e:
+            logger.error(f"Error fetching the {provider} coin list: {e}")
+            new = []
+        added, delisted = diff_mappings(current, new)
+        kept_current = not new or len(delisted) > \
+            settings.get("max_delisted_share", 0.2) * len(current)
+        if kept_current:
+            if new:
+                logger.error(
+                    f"{provider} would delist {len(delisted)} of "
+                    f"{len(current)} coins, keeping the current mapping.")
+            rows_by_provider[provider] = current
+            added, delisted = [], []
+        else:
+            rows_by_provider[provider] = new
+            changed = changed or new != current
+        report["providers"][provider] = {
+            "added": [row.coin_id for row in added],
+            "delisted": [row.coin_id for row in delisted],
+            "total": len(rows_by_provider[provider]),
+            "kept_current": kept_current
+        }
+        logger.info(
+            f"{provider} mapping: {len(added)} added, {len(delisted)} "
+            f"delisted, {len(rows_by_provider[provider])} coins.")
+        if delisted:
+            logger.info(
+                f"Delisted from {provider}: "
+                f"{[row.coin_id for row in delisted[:20]]}")
+    if not changed:
+        logger.info(f"Coin mapping version {version} is up to date.")
+        return report
+    report["version"] = write_mapping_artifact(
+        settings.get("dir", "data/coin_mapping"),
+        rows_by_provider,
+        keep_versions=settings.get("keep_versions", 3)
+    )
+    # Swap this process over right away
+    get_mapping_version(refresh=True)
+    return report
 
 
 def fetch_reddit_posts_from_url_pipeline(
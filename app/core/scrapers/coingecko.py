@@ -9,6 +9,12 @@ import pandas as pd
 import os
 from dotenv import load_dotenv # To load the API key from .env file
 
+from app.core.utils import http_client
+from app.core.fetcher.coin_mapping import CoinMapping
+import app.core.secret_handler as secrets
+
+secret_config = secrets.get_config()
+
 def get_cmc_map_from_api():
     """
     Fetches the cryptocurrency map from the CoinMarketCap API.
@@ -42,7 +48,8 @@ def get_cmc_map_from_api():
     print("Fetching data from CoinMarketCap API (/v1/cryptocurrency/map)...")
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=20)
+        response = http_client.get(
+            url, provider="coin_market_cap", headers=headers, params=params)
         response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
 
         data = response.json()
@@ -77,6 +84,62 @@ def get_cmc_map_from_api():
         print(f"An unexpected error occurred: {e}")
         return None
 
+def fetch_coin_gecko_coin_map() -> list[CoinMapping]:
+    """
+    All active coins of CoinGecko /coins/list as mapping rows (coin_id is
+    the CoinGecko id). Raises requests exceptions on failure.
+    """
+    response = http_client.get(
+        "https://api.coingecko.com/api/v3/coins/list",
+        provider="coin_gecko",
+        headers={'accept': 'application/json'}
+    )
+    response.raise_for_status()
+    return [
+        CoinMapping(
+            abbreviation=coin["symbol"],
+            name=coin["name"],
+            coin_id=coin["id"]
+        )
+        for coin in response.json() if coin.get("symbol") and coin.get("id")
+    ]
+
+
+def fetch_cmc_coin_map() -> list[CoinMapping]:
+    """
+    All active coins of CoinMarketCap /v1/cryptocurrency/map as mapping
+    rows (coin_id is the slug), highest market cap rank first and unranked
+    coins by CMC ID. Raises requests exceptions on failure and ValueError
+    if CMC reports an error.
+    """
+    response = http_client.get(
+        'https://pro-api.coinmarketcap.com/v1/cryptocurrency/map',
+        provider="coin_market_cap",
+        headers={
+            'Accepts': 'application/json',
+            'X-CMC_PRO_API_KEY': secret_config.get('COINMARKETCAP_API_KEY'),
+        }
+    )
+    response.raise_for_status()
+    data = response.json()
+    status = data.get('status') or {}
+    if status.get('error_code'):
+        raise ValueError(
+            f"CoinMarketCap API error: {status.get('error_message')}")
+    coins = sorted(
+        data.get('data', []),
+        key=lambda coin: (coin.get("rank") is None, coin.get("rank") or 0,
+                          coin["id"])
+    )
+    return [
+        CoinMapping(
+            abbreviation=coin["symbol"],
+            name=coin["name"],
+            coin_id=coin["slug"]
+        )
+        for coin in coins if coin.get("symbol") and coin.get("slug")
+    ]
+
 # --- Main Execution ---
 if __name__ == "__main__":
     cmc_map_df = get_cmc_map_from_api()
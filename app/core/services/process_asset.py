@@ -5,14 +5,15 @@ from app.core.app_config import get_config
 from app.core.database.db_interface import DatabaseInterface
 from app.core.database.asset_db_handler import (
     insert_crypto_currency_price_to_db,
-    crypto_currency_is_tracked_in_db,
+    insert_crypto_currency_prices_to_db,
     track_crypto_currency_in_db,
-    get_coin_ids_for_providers,
-    crypto_currency_is_tracked_in_db,
     get_single_asset_from_db,
     get_asset_price_from_db_by_iso_week_year,
+    get_asset_prices_from_db_by_keys,
+    get_price_key,
     cc_price_is_tracked_in_db
 )
+from app.core.database.asset_registry import get_asset_registry
 from app.core.fetcher.crypto_currency import CryptoCurrencyFetcher
 
 app_config = get_config()
@@ -22,10 +23,14 @@ logger = set_logger(name=__name__)
 class AssetProcessor:
     def __init__(
         self,
-        db_interface: DatabaseInterface
+        db_interface: DatabaseInterface,
+        cc_fetcher: CryptoCurrencyFetcher = None
     ):
         self.db_interface = db_interface  # Placeholder for database interface
-        self.cc_fetcher = CryptoCurrencyFetcher()
+        # Batch jobs pass an AsyncCryptoCurrencyFetcher for concurrent requests
+        self.cc_fetcher = cc_fetcher or CryptoCurrencyFetcher()
+        # Shared in-memory view of CCAssets
+        self.asset_registry = get_asset_registry(db_interface)
 
     def upload_crypto_currency_price_to_db(
         self,
@@ -50,49 +55,82 @@ class AssetProcessor:
         )
         return uploaded_status
 
+    def upload_crypto_currency_prices_to_db(
+        self,
+        price_rows: list[dict]
+    ) -> dict:
+        """
+        Upsert many prices in one transaction. See
+        insert_crypto_currency_prices_to_db for the row and report format.
+        """
+        return insert_crypto_currency_prices_to_db(
+            self.db_interface,
+            price_rows=price_rows
+        )
+
     def get_provider_coin_ids(
         self,
         name: str,
         abbreviation: str
     ) -> dict:
-        if not self.crypto_currency_is_tracked(
-                name=name,
-                abbreviation=abbreviation
-        ):
-            coin_ids = {}
-            for provider in self.cc_fetcher.providers:
-                coin_ids[provider] = self.cc_fetcher.find_coin_id(
-                    name=name,
-                    abbreviation=abbreviation,
-                    provider=provider
-                )
-            # Check if the coin_ids are empty
-            # If all providers failed to find the coin ID, log an error
-            if not any(coin_ids.values()):
-                logger.error(
-                    f"Failed to find coin IDs for {name} ({abbreviation}) "
-                    "from all providers."
-                )
-                return None
-            else:
-                # Track the crypto currency in the database
-                _ = track_crypto_currency_in_db(
-                    self.db_interface,
-                    name=name,
-                    abbreviation=abbreviation,
-                    provider_coin_id=coin_ids
-                )
-
-        else:
+        asset = self.asset_registry.get(
+            self.db_interface,
+            name=name,
+            abbreviation=abbreviation
+        )
+        if asset is not None:
             # Get the provider coin_ids from CMC and Coin Gecko to
             # get the price from API
-            coin_ids = get_coin_ids_for_providers(
-                self.db_interface,
-                name=name,
-                abbreviation=abbreviation
+            return {
+                "coin_market_cap": asset["coin_market_cap"],
+                "coin_gecko": asset["coin_gecko"]
+            }
+
+        coin_ids = self.cc_fetcher.resolve_coin_ids(
+            name=name,
+            abbreviation=abbreviation
+        )
+        # Check if the coin_ids are empty
+        # If all providers failed to find the coin ID, log an error
+        if not any(coin_ids.values()):
+            logger.error(
+                f"Failed to find coin IDs for {name} ({abbreviation}) "
+                "from all providers."
             )
+            return None
+        # Track the crypto currency in the database
+        self.track_crypto_currency(
+            name=name,
+            abbreviation=abbreviation,
+            provider_coin_id=coin_ids
+        )
         return coin_ids
 
+    def track_crypto_currency(
+        self,
+        name: str,
+        abbreviation: str,
+        provider_coin_id: dict
+    ):
+        """
+        Track the crypto currency in the database and in the asset registry.
+        """
+        result = track_crypto_currency_in_db(
+            self.db_interface,
+            name=name,
+            abbreviation=abbreviation,
+            provider_coin_id=provider_coin_id
+        )
+        if result is not False:
+            self.db_interface.call_on_commit(
+                lambda: self.asset_registry.register(
+                    name=name,
+                    abbreviation=abbreviation,
+                    provider_coin_id=provider_coin_id
+                )
+            )
+        return result
+
     def get_asset_price_from_db_by_iso_week_year(
         self,
         name: str,
@@ -112,6 +150,111 @@ class AssetProcessor:
             dictionary_cursor=True
         )
 
+    def get_asset_prices_from_db_by_keys(
+        self,
+        price_keys: list[tuple]
+    ) -> dict[tuple, dict]:
+        """
+        Get the prices of many assets from the database in one query.
+        price_keys are (name, abbreviation, iso_week, iso_year) tuples.
+        """
+        return get_asset_prices_from_db_by_keys(
+            db_interface=self.db_interface,
+            price_keys=price_keys
+        )
+
+    def fetch_and_upload_current_prices(
+        self,
+        assets: list[tuple],
+        currency: str = 'usd'
+    ) -> dict[tuple, float | None]:
+        """
+        Fetch the current price of every (name, abbreviation) in assets
+        from the API and store it for the current ISO week.
+        Returns a dictionary mapping the normalized price key to the price.
+        Assets without provider coin IDs are left out of the result, assets
+        whose price could not be fetched map to None.
+        """
+        iso_year, iso_week, _ = dt.date.today().isocalendar()
+        price_rows, failed = self.fetch_current_prices(
+            assets=assets,
+            currency=currency
+        )
+        self.upload_crypto_currency_prices_to_db(price_rows)
+        prices = {
+            get_price_key(
+                row["name"], row["abbreviation"],
+                row["iso_week"], row["iso_year"]
+            ): row["price"] for row in price_rows
+        }
+        for failed_asset in failed:
+            if failed_asset["coin_ids"]:
+                prices[get_price_key(
+                    failed_asset["name"], failed_asset["abbreviation"],
+                    iso_week, iso_year
+                )] = None
+        return prices
+
+    def fetch_current_prices(
+        self,
+        assets: list[tuple],
+        currency: str = 'usd'
+    ) -> tuple[list[dict], list[dict]]:
+        """
+        Fetch the current price of every (name, abbreviation) in assets
+        with one batched API call, without writing to the database.
+        Returns (price_rows, failed): price_rows are ready for
+        upload_crypto_currency_prices_to_db, failed lists the assets
+        without coin IDs or price as
+        {"name", "abbreviation", "coin_ids", "error"}.
+        """
+        failed = []
+        resolved_assets = []
+        for name, abbreviation in dict.fromkeys(assets):
+            coin_ids = self.get_provider_coin_ids(
+                name=name,
+                abbreviation=abbreviation
+            )
+            if not coin_ids:
+                failed.append({
+                    "name": name,
+                    "abbreviation": abbreviation,
+                    "coin_ids": None,
+                    "error": "Coin IDs not found"
+                })
+                continue
+            resolved_assets.append((name, abbreviation, coin_ids))
+        if not resolved_assets:
+            return [], failed
+
+        coin_data_list = self.cc_fetcher.fetch_current_coin_prices(
+            coin_ids=[coin_ids for _, _, coin_ids in resolved_assets],
+            vs_currency=currency
+        )
+        price_rows = []
+        for (name, abbreviation, coin_ids), coin_data in zip(
+                resolved_assets, coin_data_list):
+            if coin_data["is_error"]:
+                failed.append({
+                    "name": name,
+                    "abbreviation": abbreviation,
+                    "coin_ids": coin_ids,
+                    "error": coin_data["error_message"]
+                })
+                continue
+            iso_year, iso_week, _ = dt.date.fromisoformat(
+                coin_data["date"]).isocalendar()
+            price_rows.append({
+                "name": name,
+                "abbreviation": abbreviation,
+                "price": coin_data["price"],
+                "currency": currency,
+                "date": coin_data["date"],
+                "iso_week": iso_week,
+                "iso_year": iso_year
+            })
+        return price_rows, failed
+
     def process_asset(
         self,
         name: str,
@@ -208,8 +351,7 @@ class AssetProcessor:
             logger.info(
                 f"Tracking new crypto currency: {name} ({abbreviation})"
             )
-            track_crypto_currency_in_db(
-                db_interface=self.db_interface,
+            self.track_crypto_currency(
                 name=name,
                 abbreviation=abbreviation,
                 provider_coin_id=provider_coin_id
@@ -241,11 +383,11 @@ class AssetProcessor:
         """
         Check if the crypto currency is tracked in the database.
         """
-        return crypto_currency_is_tracked_in_db(
-            db_interface=self.db_interface,
+        return self.asset_registry.get(
+            self.db_interface,
             name=name,
             abbreviation=abbreviation
-        )
+        ) is not None
 
     def get_asset_from_db(
         self,
@@ -7,12 +7,13 @@ import PIL
 import io
 
 from app.core.utils.utils import set_logger
+from app.core.utils import http_client
 from .service_prompts import (
     INTERPRET_IMAGE_FROM_REDDIT_POST,
     IMAGE_PORTFOLIO_REASONING_PROMPT
 )
 from app.core.database.reddit_post_db_handler import (
-    get_reddit_posts,
+    get_reddit_post_statuses,
     get_reddit_post_by_id_from_db,
     update_portfolio_status_in_db,
     insert_reddit_posts_to_db
@@ -56,13 +57,8 @@ class RedditPostProcessor:
         Returns:
             bool: True if the post has been processed, False otherwise.
         """
-        posts = get_reddit_posts(
-            db_interface=self.db_interface,
-            post_ids=[reddit_post_id]
-        )
-        if not posts:
-            return False
-        return True if posts[0].processed else False
+        status = self.get_post_statuses([reddit_post_id]).get(reddit_post_id)
+        return status["processed"] if status else False
 
     def reddit_post_is_portfolio(
             self,
@@ -75,13 +71,22 @@ class RedditPostProcessor:
         Returns:
             bool: True if the post is a portfolio, False otherwise.
         """
-        posts = get_reddit_posts(
+        status = self.get_post_statuses([reddit_post_id]).get(reddit_post_id)
+        return status["is_portfolio"] if status else False
+
+    def get_post_statuses(self, reddit_post_ids: list[str]) -> dict[str, dict]:
+        """
+        Processing state of many posts in one query.
+        Args:
+            reddit_post_ids (list[str]): The IDs of the Reddit posts.
+        Returns:
+            dict: {post_id: {"processed", "is_portfolio", "failed"}} for
+            the posts that are in the database.
+        """
+        return get_reddit_post_statuses(
             db_interface=self.db_interface,
-            post_ids=[reddit_post_id]
+            post_ids=reddit_post_ids
         )
-        if not posts:
-            return False
-        return True if posts[0].is_portfolio else False
 
     def read_image_from_url(
             self,
@@ -95,7 +100,7 @@ class RedditPostProcessor:
             dict: The image data.
         """
         try:
-            response = requests.get(image_url, stream=True)
+            response = http_client.get(image_url)
             response.raise_for_status()
 
             content_type = response.headers.get('content-type')
@@ -213,9 +218,27 @@ class RedditPostProcessor:
         process_result_dict = json_process.get("result")
         return error, process_result_dict
 
+    def update_post_status_in_db(
+        self,
+        process_result_dict: dict
+    ):
+        """
+        Store the outcome of process() (processed, is_portfolio, failed)
+        for the processed reddit post.
+        """
+        update_portfolio_status_in_db(
+            db_interface=self.db_interface,
+            post_id=process_result_dict["source_id"],
+            is_portfolio=process_result_dict.get("result").get(
+                "is_portfolio"),
+            failed=process_result_dict.get("error"),
+            processed=True
+        )
+
     def process(
         self,
-        reddit_post_id: str
+        reddit_post_id: str,
+        update_status: bool = True
     ) -> dict:
         """
         Process a list of Reddit post IDs to extract information from images
@@ -229,6 +252,9 @@ class RedditPostProcessor:
 
         Args:
             reddit_post_ids (list[str]): A list of Reddit post IDs to process.
+            update_status (bool): Store the processing status of the post.
+                Pass False to store it later via update_post_status_in_db,
+                e.g. inside a transaction.
         Returns:
             list[dict]: A list of dictionaries containing the
             results and errors for each processed Reddit post.
@@ -269,14 +295,8 @@ class RedditPostProcessor:
                 result_dict["error"] = error
                 result_dict["result"] = img_process_result_dict
 
-                update_portfolio_status_in_db(
-                    db_interface=self.db_interface,
-                    post_id=reddit_post_data.post_id,
-                    is_portfolio=result_dict.get("result").get(
-                        "is_portfolio"),
-                    failed=result_dict.get("error"),
-                    processed=True
-                )
+                if update_status:
+                    self.update_post_status_in_db(result_dict)
 
             except Exception as e:
                 result_dict["error"] = \
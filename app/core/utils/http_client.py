@@ -0,0 +1,108 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+from app.core.utils.rate_limiter import get_rate_limiter
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _settings() -> dict:
+    return app_config.get("http_client", {})
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Returns the process-wide keep-alive session for the host of url, so
+    repeated calls to the same API reuse warm TCP/TLS connections.
+    """
+    host = urlsplit(url).netloc.lower()
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            # Retries are done in request(), together with the rate limits
+            adapter = HTTPAdapter(
+                pool_maxsize=_settings().get("pool_maxsize", 10),
+                max_retries=0
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return session
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff in seconds."""
+    settings = _settings()
+    return random.uniform(0, min(
+        settings.get("backoff_max", 30),
+        settings.get("backoff_factor", 0.5) * 2 ** attempt))
+
+
+def request(
+    method: str,
+    url: str,
+    provider: str = None,
+    retries: int = None,
+    **kwargs
+) -> requests.Response:
+    """
+    Sends a request on the pooled session of the host, with the default
+    (connect, read) timeout unless one is given. Connection errors,
+    timeouts and the retry statuses (429/5xx) are retried with jittered
+    exponential backoff. With a provider, every attempt also waits for the
+    provider's rate limiter and reports the response to it, so a
+    Retry-After is honored by all callers.
+    Returns the last response (the caller checks its status), raises the
+    last requests exception if no response was received.
+    """
+    settings = _settings()
+    retries = settings.get("retries", 3) if retries is None else retries
+    retry_statuses = set(settings.get("retry_statuses", []))
+    kwargs.setdefault("timeout", tuple(settings.get("timeout", (5, 30))))
+    rate_limiter = get_rate_limiter(provider) if provider else None
+    session = get_session(url)
+    for attempt in range(retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout) as e:
+            if attempt == retries:
+                raise
+            wait = backoff_delay(attempt)
+            logger.warning(
+                f"{method} {url} failed ({e}), retrying in {wait:.1f}s.")
+            time.sleep(wait)
+            continue
+        back_off = None
+        if rate_limiter is not None:
+            back_off = rate_limiter.record_response(
+                response.status_code, response.headers)
+        if response.status_code not in retry_statuses or attempt == retries:
+            return response
+        response.close()
+        # The rate limiter waits out a Retry-After on the next acquire
+        wait = backoff_delay(attempt) if back_off is None else 0.0
+        logger.warning(
+            f"{method} {url} returned {response.status_code}, retrying "
+            f"in {wait or back_off:.1f}s.")
+        time.sleep(wait)
+    return response
+
+
+def get(url: str, provider: str = None, **kwargs) -> requests.Response:
+    """GET with request()."""
+    return request("GET", url, provider=provider, **kwargs)
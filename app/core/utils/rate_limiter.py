@@ -0,0 +1,220 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+
+try:
+    import fcntl
+except ImportError:  # Windows: buckets are shared per process only
+    fcntl = None
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+
+def parse_retry_after(value: str) -> float | None:
+    """
+    Seconds to wait from a Retry-After header, which is either a number
+    of seconds or an HTTP date. None if the value can't be parsed.
+    """
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _header(headers, *names: str):
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+class TokenBucket:
+    """
+    Token bucket for one external provider: up to burst requests at once,
+    refilled with rate tokens per second. A provider that asks us to back
+    off (429, Retry-After, exhausted rate-limit headers) blocks the bucket
+    until the given time.
+    With a lock_path the bucket state lives in that file and is updated
+    under an exclusive fcntl lock, so every process on the host shares one
+    budget per provider.
+    """
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int = 1,
+        default_retry_after: float = 30,
+        lock_path: str = None
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.default_retry_after = default_retry_after
+        if lock_path is not None and fcntl is None:
+            logger.warning(
+                f"fcntl is not available, the {name} rate limit is not "
+                "shared with other processes.")
+            lock_path = None
+        self.lock_path = lock_path
+        self._lock = threading.Lock()
+        self._local_state = self._new_state()
+
+    def _new_state(self) -> dict:
+        return {
+            "tokens": float(self.burst),
+            "updated_at": time.time(),
+            "blocked_until": 0.0
+        }
+
+    @contextmanager
+    def _state(self):
+        """Yields the bucket state for a read-modify-write."""
+        with self._lock:
+            if self.lock_path is None:
+                yield self._local_state
+                return
+            directory = os.path.dirname(self.lock_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.lock_path, "a+") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    lock_file.seek(0)
+                    try:
+                        state = json.loads(lock_file.read())
+                    except ValueError:
+                        state = self._new_state()
+                    yield state
+                    lock_file.seek(0)
+                    lock_file.truncate()
+                    lock_file.write(json.dumps(state))
+                    lock_file.flush()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _take(self, tokens: float) -> float:
+        """Takes tokens if available. Returns the seconds to wait if not."""
+        with self._state() as state:
+            now = time.time()
+            if state["blocked_until"] > now:
+                return state["blocked_until"] - now
+            state["tokens"] = min(
+                float(self.burst),
+                state["tokens"] + (now - state["updated_at"]) * self.rate)
+            state["updated_at"] = now
+            if state["tokens"] >= tokens:
+                state["tokens"] -= tokens
+                return 0.0
+            return (tokens - state["tokens"]) / self.rate
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        """
+        Blocks until tokens are available and takes them. Returns False
+        (without taking any) if that would take longer than timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None and \
+                    time.monotonic() + wait > deadline:
+                return False
+            logger.debug(f"Rate limit {self.name}: waiting {wait:.2f}s.")
+            time.sleep(wait)
+
+    async def acquire_async(
+        self,
+        tokens: float = 1,
+        timeout: float = None
+    ) -> bool:
+        """acquire() for coroutines: waits without blocking the loop."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None and \
+                    time.monotonic() + wait > deadline:
+                return False
+            logger.debug(f"Rate limit {self.name}: waiting {wait:.2f}s.")
+            await asyncio.sleep(wait)
+
+    def block_for(self, seconds: float):
+        """Lets no request through for the next seconds."""
+        with self._state() as state:
+            state["blocked_until"] = max(
+                state["blocked_until"], time.time() + seconds)
+            state["tokens"] = 0.0
+            state["updated_at"] = time.time()
+        logger.warning(f"Rate limit {self.name}: backing off {seconds:.1f}s.")
+
+    def record_response(self, status_code: int, headers) -> float | None:
+        """
+        Applies the back-off a provider asked for in a response: Retry-After,
+        or exhausted X-RateLimit-Remaining / X-RateLimit-Reset headers, or
+        the default back-off for a bare 429. Returns the back-off in seconds,
+        None if there was none.
+        """
+        retry_after = parse_retry_after(_header(
+            headers, "Retry-After", "retry-after"))
+        if retry_after is None:
+            remaining = _header(
+                headers, "X-RateLimit-Remaining", "x-ratelimit-remaining")
+            reset = _header(headers, "X-RateLimit-Reset", "x-ratelimit-reset")
+            try:
+                if remaining is not None and reset is not None and \
+                        float(remaining) < 1:
+                    reset = float(reset)
+                    # Either seconds until the reset or an epoch timestamp
+                    retry_after = reset - time.time() if reset > 1e9 else reset
+            except ValueError:
+                pass
+        if retry_after is None and status_code == 429:
+            retry_after = self.default_retry_after
+        if retry_after is None or retry_after <= 0:
+            return None
+        self.block_for(retry_after)
+        return retry_after
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> TokenBucket:
+    """
+    Returns the process-wide token bucket of a provider configured in
+    app_config RATE_LIMITS.
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(provider)
+        if bucket is None:
+            rate_limit_config = app_config.get("rate_limits", {})
+            settings = rate_limit_config.get("providers", {}).get(provider)
+            if settings is None:
+                raise ValueError(f"No rate limit configured for {provider}.")
+            lock_dir = rate_limit_config.get("lock_dir")
+            bucket = TokenBucket(
+                name=provider,
+                lock_path=os.path.join(lock_dir, f"{provider}.bucket")
+                if lock_dir else None,
+                **settings
+            )
+            _buckets[provider] = bucket
+        return bucket
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timezone
+
+from app.core.utils.utils import set_logger
+from app.core.app_config import get_config
+
+app_config = get_config()
+logger = set_logger(name=__name__)
+
+
+def make_key(provider: str, url: str, params: dict = None) -> str:
+    """
+    Content address of a request: sha256 of the provider, the URL and the
+    params with sorted keys and string values, so equal requests built in
+    different places share one entry.
+    """
+    request = json.dumps({
+        "provider": provider,
+        "url": url,
+        "params": {
+            str(key): str(value) for key, value in (params or {}).items()
+        }
+    }, sort_keys=True)
+    return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk SQLite cache of decoded JSON responses of external APIs.
+    Entries without a ttl never expire (prices and rates of past dates
+    don't change); the others expire after ttl seconds. Once the stored
+    bodies exceed max_bytes the least recently used entries are evicted.
+    Every process using the same path shares the entries.
+    """
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        today_ttl: float = 300,
+        enabled: bool = True
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.today_ttl = today_ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, provider TEXT NOT NULL, "
+                "body TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL)")
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at "
+                "ON responses (accessed_at)")
+            connection.commit()
+            self._local.connection = connection
+        return connection
+
+    def ttl_for_date(self, day) -> float | None:
+        """
+        ttl of a response for a date (date, datetime or 'YYYY-MM-DD'):
+        None (permanent) before today (UTC), today_ttl otherwise and for
+        strings that aren't dates (e.g. 'latest').
+        """
+        if isinstance(day, str):
+            try:
+                day = date.fromisoformat(day[:10])
+            except ValueError:
+                return self.today_ttl
+        elif isinstance(day, datetime):
+            day = day.date()
+        if day < datetime.now(timezone.utc).date():
+            return None
+        return self.today_ttl
+
+    def get(self, provider: str, url: str, params: dict = None):
+        """The cached response, None on a miss or if it expired."""
+        if not self.enabled:
+            return None
+        key = make_key(provider, url, params)
+        now = time.time()
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?",
+                (key,)).fetchone()
+            if row is not None and \
+                    (row[1] is None or row[1] > now):
+                connection.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                    (now, key))
+                connection.commit()
+                with self._lock:
+                    self.hits += 1
+                return json.loads(row[0])
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache read failed: {e}")
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(
+        self,
+        provider: str,
+        url: str,
+        params: dict,
+        data,
+        ttl: float = None
+    ):
+        """Stores a response, permanently if ttl is None."""
+        if not self.enabled:
+            return
+        body = json.dumps(data, separators=(",", ":"))
+        now = time.time()
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, provider, body, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (make_key(provider, url, params), provider, body, len(body),
+                 None if ttl is None else now + ttl, now))
+            connection.commit()
+            self._evict(connection)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def _evict(self, connection: sqlite3.Connection):
+        """
+        Drops expired entries, then the least recently used ones, until the
+        bodies fit in 90% of max_bytes.
+        """
+        total = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        connection.execute(
+            "DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        target = self.max_bytes * 0.9
+        total = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        evicted = 0
+        for key, size in connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            if total <= target:
+                break
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        connection.commit()
+        logger.info(f"Response cache: evicted {evicted} entries.")
+
+    def get_or_fetch(
+        self,
+        provider: str,
+        url: str,
+        params: dict,
+        fetch,
+        ttl: float = None
+    ):
+        """
+        The cached response, or fetch() stored with ttl. Exceptions of
+        fetch() propagate and nothing is cached.
+        """
+        data = self.get(provider, url, params)
+        if data is None:
+            data = fetch()
+            self.set(provider, url, params, data, ttl=ttl)
+        return data
+
+    def clear(self):
+        try:
+            connection = self._connection()
+            connection.execute("DELETE FROM responses")
+            connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache clear failed: {e}")
+
+    def stats(self) -> dict:
+        """Hit/miss counters of this process plus the stored entries."""
+        entries, size = 0, 0
+        if self.enabled:
+            try:
+                entries, size = self._connection().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache stats failed: {e}")
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": entries,
+            "bytes": size
+        }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """The process-wide ResponseCache configured in RESPONSE_CACHE."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                **app_config.get("response_cache", {}))
+        return _response_cache
@@ -1,6 +1,15 @@
 from .fetch_weekly_cc_prices import pipeline as weekly_prices_pipeline
+from .refresh_coin_mapping import pipeline as coin_mapping_pipeline
+from app.core.utils.utils import set_logger
+
+logger = set_logger(name=__name__)
 
 if __name__ == "__main__":
     print("Executing daily pipeline from top-level entry point...")
+    try:
+        coin_mapping_pipeline()
+    except Exception as e:
+        # The prices are fetched with the current mapping
+        logger.error(f"Coin mapping refresh failed: {e}", exc_info=True)
     weekly_prices_pipeline()
     print("Pipeline execution finished.")
\ No newline at end of file
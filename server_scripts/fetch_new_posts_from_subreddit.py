@@ -2,7 +2,7 @@ from app.core.app_config import get_config
 import praw
 from app.core.database.db_interface import DatabaseInterface
 from app.core.database.reddit_post_db_handler import (
-    insert_reddit_posts_to_db
+    insert_reddit_posts_bulk_to_db
 )
 from app.core.fetcher.reddit import RedditFetcher
 import app.core.secret_handler as secrets
@@ -91,12 +91,13 @@ def pipeline():
                 f"""Attempting to insert
                 {len(fetched_posts_data)} posts into database...""")
             try:
-                inserted_count = insert_reddit_posts_to_db(
+                upsert_counts = insert_reddit_posts_bulk_to_db(
                     db_interface=db_interface,
                     reddit_posts=fetched_posts_data
                 )
                 logger.info(
-                    f"Successfully inserted/updated {inserted_count} records.")
+                    f"Successfully inserted {upsert_counts['inserted']} "
+                    f"and updated {upsert_counts['updated']} records.")
             except Exception as e:
                 logger.error(
                     f"""An unexpected error occurred
@@ -3,6 +3,7 @@ from app.core.pipelines.pipelines import (
 )
 import app.core.secret_handler as secrets
 from app.core.services.process_asset import AssetProcessor
+from app.core.fetcher.async_crypto_currency import AsyncCryptoCurrencyFetcher
 from app.core.database.db_interface import DatabaseInterface
 from app.core.utils.utils import set_logger
 
@@ -25,7 +26,9 @@ except Exception as e:
 
 
 asset_processor = AssetProcessor(
-        db_interface=db_interface
+        db_interface=db_interface,
+        # Requests the prices of all tracked assets concurrently
+        cc_fetcher=AsyncCryptoCurrencyFetcher()
 )
 
 
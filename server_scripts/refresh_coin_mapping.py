@@ -0,0 +1,27 @@
+from app.core.pipelines.pipelines import refresh_coin_mapping_pipeline
+from app.core.fetcher.crypto_currency import CryptoCurrencyFetcher
+from app.core.utils.utils import set_logger
+
+logger = set_logger(name=__name__)
+
+cc_fetcher = CryptoCurrencyFetcher()
+
+
+def pipeline():
+
+    logger.info("--- Starting coin mapping refresh execution ---")
+    report = refresh_coin_mapping_pipeline(cc_fetcher=cc_fetcher)
+    summary = {
+        provider: {
+            "added": len(provider_report["added"]),
+            "delisted": len(provider_report["delisted"]),
+            "total": provider_report["total"]
+        }
+        for provider, provider_report in report["providers"].items()
+    }
+    logger.info(
+        f"Coin mapping version {report['version']} is current: {summary}")
+    return {
+        "statusCode": 200,
+        "body": f"Coin mapping version {report['version']} is current."
+    }
@@ -0,0 +1,23 @@
+import os
+
+# Modules read their secrets on import. Unit tests never reach the real
+# services, so placeholders are enough where no .env provides them.
+for secret_name in [
+    "REDDIT_CLIENT_ID",
+    "REDDIT_CLIENT_SECRET",
+    "REDDIT_USER_AGENT",
+    "REDDIT_USERNAME",
+    "REDDIT_PASSWORD",
+    "MYSQL_HOST",
+    "MYSQL_PORT",
+    "MYSQL_DBNAME",
+    "MYSQL_USERNAME",
+    "MYSQL_KEY",
+    "SSH_PRIVATE_KEY_PATH",
+    "SSH_TUNNEL_PORT",
+    "DROPLET_SSH_HOST",
+    "DROPLET_SSH_USER",
+    "COINMARKETCAP_API_KEY"
+]:
+    os.environ.setdefault(secret_name, "test")
+os.environ.setdefault("ENVIRONMENT", "test")
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.core.database import async_db_interface
+from app.core.database.async_db_interface import get_async_pool
+
+DB_CONFIG = {
+    "db_host": "db", "db_port": 3306, "db_username": "user",
+    "database": "test", "is_ssh_tunnel": True}
+
+
+class StubPool:
+    def __init__(self, port):
+        self.port = port
+        self.closing = False
+        self.closed = False
+
+    def close(self):
+        self.closing = True
+
+    async def wait_closed(self):
+        self.closed = True
+
+
+class StubTunnelManager:
+    def __init__(self):
+        self.port = 40001
+
+    def get_local_address(self, db_config):
+        return "127.0.0.1", self.port
+
+
+@pytest.fixture
+def tunnel_manager(monkeypatch):
+    tunnel_manager = StubTunnelManager()
+
+    async def create_pool(**kwargs):
+        return StubPool(kwargs["port"])
+
+    monkeypatch.setattr(async_db_interface, "_async_pools", {})
+    monkeypatch.setattr(
+        async_db_interface, "get_tunnel_manager", lambda: tunnel_manager)
+    monkeypatch.setattr(
+        async_db_interface.aiomysql, "create_pool", create_pool)
+    return tunnel_manager
+
+
+def test_pool_is_reused_for_the_same_tunnel_port(tunnel_manager):
+    async def get_twice():
+        return await get_async_pool(DB_CONFIG), \
+            await get_async_pool(DB_CONFIG)
+
+    first, second = asyncio.run(get_twice())
+    assert first is second
+
+
+def test_restarted_tunnel_replaces_the_pool(tunnel_manager):
+    async def get_before_and_after_restart():
+        before = await get_async_pool(DB_CONFIG)
+        # Restarted tunnels bind a new random local port
+        tunnel_manager.port = 40002
+        after = await get_async_pool(DB_CONFIG)
+        await asyncio.sleep(0)
+        return before, after
+
+    before, after = asyncio.run(get_before_and_after_restart())
+    assert (before.port, after.port) == (40001, 40002)
+    assert before.closing and before.closed
+    assert not after.closing
@@ -0,0 +1,166 @@
+import threading
+
+import pymysql
+import pytest
+
+from app.core.database import connection_pool
+from app.core.database.connection_pool import ConnectionPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.alive = True
+        self.pings = 0
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.alive:
+            raise pymysql.err.OperationalError(2006, "gone away")
+
+    def close(self):
+        self.closed = True
+
+
+class StubConnect:
+    def __init__(self):
+        self.created = []
+
+    def __call__(self, db_config):
+        connection = StubConnection(len(self.created))
+        self.created.append(connection)
+        return connection
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(connection_pool.time, "monotonic", clock)
+    return clock
+
+
+def make_pool(**settings):
+    connect = StubConnect()
+    settings.setdefault("min_size", 0)
+    settings.setdefault("max_size", 2)
+    pool = ConnectionPool({"db_host": "test"}, connect=connect, **settings)
+    return pool, connect
+
+
+def test_invalid_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        ConnectionPool({}, min_size=3, max_size=2, connect=StubConnect())
+    with pytest.raises(ValueError):
+        ConnectionPool({}, max_size=0, connect=StubConnect())
+
+
+def test_warm_up_opens_min_size_connections():
+    pool, connect = make_pool(min_size=2, max_size=3)
+    pool.warm_up()
+    assert len(connect.created) == 2
+    assert pool.size == 2
+    assert pool.idle_count == 2
+
+
+def test_released_connection_is_reused_lifo(clock):
+    pool, connect = make_pool(max_size=3)
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first)
+    pool.release(second)
+    # The most recently returned connection comes back first
+    assert pool.acquire() is second
+    assert pool.acquire() is first
+    assert len(connect.created) == 2
+
+
+def test_acquire_times_out_at_max_size():
+    pool, connect = make_pool(max_size=1, acquire_timeout=0.05)
+    pool.acquire()
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+    assert pool.size == 1
+    assert len(connect.created) == 1
+
+
+def test_acquire_waits_for_release():
+    pool, connect = make_pool(max_size=1, acquire_timeout=5)
+    pooled = pool.acquire()
+    timer = threading.Timer(0.05, pool.release, args=(pooled,))
+    timer.start()
+    assert pool.acquire() is pooled
+    timer.join()
+    assert len(connect.created) == 1
+
+
+def test_idle_connections_are_pruned_down_to_min_size(clock):
+    pool, connect = make_pool(min_size=1, max_size=3, idle_timeout=60)
+    pooled = [pool.acquire() for _ in range(3)]
+    for connection in pooled:
+        pool.release(connection)
+    clock.now += 61
+    kept = pool.acquire()
+    # Two stale connections were closed, min_size of them is kept
+    assert [c.closed for c in connect.created].count(True) == 2
+    assert kept.connection.closed is False
+    assert pool.size == 1
+
+
+def test_recently_used_connection_is_not_pinged(clock):
+    pool, connect = make_pool(ping_interval=30)
+    pool.release(pool.acquire())
+    clock.now += 10
+    pool.acquire()
+    assert connect.created[0].pings == 0
+
+
+def test_failed_pre_ping_discards_connection(clock):
+    pool, connect = make_pool(ping_interval=30, idle_timeout=300)
+    pooled = pool.acquire()
+    pool.release(pooled)
+    pooled.connection.alive = False
+    clock.now += 31
+    fresh = pool.acquire()
+    assert fresh is not pooled
+    assert pooled.connection.closed is True
+    assert len(connect.created) == 2
+    assert pool.size == 1
+
+
+def test_discarded_connection_frees_a_slot():
+    pool, connect = make_pool(max_size=1, acquire_timeout=0.05)
+    pooled = pool.acquire()
+    pool.release(pooled, discard=True)
+    assert pooled.connection.closed is True
+    assert pool.size == 0
+    pool.acquire()
+    assert len(connect.created) == 2
+
+
+def test_failed_connect_does_not_leak_a_slot():
+    def failing_connect(db_config):
+        raise pymysql.err.OperationalError(2003, "refused")
+
+    pool = ConnectionPool(
+        {}, min_size=0, max_size=1, connect=failing_connect)
+    with pytest.raises(pymysql.Error):
+        pool.acquire()
+    assert pool.size == 0
+
+
+def test_closed_pool_rejects_checkouts():
+    pool, connect = make_pool()
+    pool.release(pool.acquire())
+    pool.close_all()
+    assert connect.created[0].closed is True
+    with pytest.raises(ConnectionError):
+        pool.acquire()
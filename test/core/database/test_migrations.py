@@ -0,0 +1,71 @@
+import pytest
+
+from app.core.database.db_interface import DatabaseInterface
+from app.core.database.migrations import (
+    Index,
+    MIGRATIONS,
+    MigrationRunner
+)
+
+LEGACY_CCASSETS_TABLE = """
+    CREATE TABLE CCAssets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name VARCHAR(128) NOT NULL,
+        abbreviation VARCHAR(32) NOT NULL,
+        cmc_id VARCHAR(128),
+        coin_gecko_id VARCHAR(128)
+    )
+"""
+
+
+@pytest.fixture
+def db_interface(tmp_path):
+    return DatabaseInterface(
+        host=None, user=None, password=None, database="test",
+        backend="sqlite", sqlite_path=str(tmp_path / "test.db"))
+
+
+def test_migrate_creates_upsert_keys(db_interface):
+    runner = MigrationRunner(db_interface)
+    assert runner.migrate() == [m.version for m in MIGRATIONS]
+    unique_columns = [
+        sorted(columns) for columns in
+        db_interface.get_indexes("CCAssets", unique_only=True).values()
+    ]
+    assert sorted(["name", "abbreviation"]) in unique_columns
+    assert runner.migrate() == []
+
+
+def test_unique_index_not_skipped_for_non_unique_prefix(db_interface):
+    db_interface.execute_query(LEGACY_CCASSETS_TABLE)
+    db_interface.execute_query(
+        "CREATE INDEX ix_ccassets_name ON CCAssets (name, abbreviation)")
+    runner = MigrationRunner(db_interface)
+    runner.create_index(Index(
+        "crypto_assets", "uq_ccassets_asset", ["name", "abbreviation"],
+        unique=True))
+    assert "uq_ccassets_asset" in \
+        db_interface.get_indexes("CCAssets", unique_only=True)
+
+
+def test_unique_index_with_duplicates_raises(db_interface):
+    db_interface.execute_query(LEGACY_CCASSETS_TABLE)
+    for _ in range(2):
+        db_interface.execute_query(
+            "INSERT INTO CCAssets (name, abbreviation) VALUES (%s, %s)",
+            ("Bitcoin", "BTC"))
+    runner = MigrationRunner(db_interface)
+    with pytest.raises(ValueError, match="duplicate rows"):
+        runner.create_index(Index(
+            "crypto_assets", "uq_ccassets_asset", ["name", "abbreviation"],
+            unique=True))
+    assert "uq_ccassets_asset" not in db_interface.get_indexes("CCAssets")
+
+
+def test_get_schema_returns_stored_ddl(db_interface):
+    runner = MigrationRunner(db_interface)
+    runner.migrate()
+    schema = runner.get_schema()
+    assert set(schema) == {
+        "RedditPosts", "Portfolios", "Purchases", "CCPrices", "CCAssets"}
+    assert "uq_ccassets_asset" in schema["CCAssets"]
@@ -0,0 +1,163 @@
+import pytest
+
+import app.core.database.query_cache as query_cache_module
+from app.core.database.query_cache import (
+    ALL_TABLES,
+    QueryCache,
+    get_written_table,
+    make_cache_key
+)
+from app.core.database.db_interface import DatabaseInterface
+from app.core.database.migrations import MigrationRunner
+from app.core.database.reddit_post_db_handler import get_reddit_post_statuses
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(query_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def _key(table_name: str = "Posts", params: tuple = (1,)) -> tuple:
+    return make_cache_key(
+        "db", table_name, "SELECT * FROM t WHERE id = %s", params, False)
+
+
+def _put(cache: QueryCache, key: tuple, result, request_scope=None):
+    cache.put(key, "posts", result, cache.generation(key), request_scope)
+
+
+@pytest.mark.parametrize("query, table", [
+    ("INSERT INTO Posts (a) VALUES (%s)", "Posts"),
+    ("  insert ignore into `Posts` (a) VALUES (%s)", "Posts"),
+    ("UPDATE Posts SET a = 1", "Posts"),
+    ("DELETE FROM Posts WHERE a = 1", "Posts"),
+    ("REPLACE INTO Posts (a) VALUES (1)", "Posts"),
+    ("CREATE INDEX ix ON Posts (a)", ALL_TABLES),
+    ("ALTER TABLE Posts ADD COLUMN b INT", ALL_TABLES),
+    ("DROP TABLE Posts", ALL_TABLES),
+    ("TRUNCATE Posts", ALL_TABLES),
+    ("SELECT * FROM Posts", None),
+])
+def test_get_written_table(query, table):
+    assert get_written_table(query) == table
+
+
+def test_make_cache_key_normalizes_whitespace_and_table():
+    assert make_cache_key("db", "Posts", "SELECT  *\n FROM t", [1], False) \
+        == make_cache_key("db", "posts", "SELECT * FROM t", (1,), False)
+
+
+def test_entries_expire_after_table_ttl(clock):
+    cache = QueryCache(ttl={"posts": 10})
+    key = _key()
+    _put(cache, key, [(1,)])
+    assert cache.get(key) == (True, [(1,)])
+    clock.now += 9.9
+    assert cache.get(key) == (True, [(1,)])
+    clock.now += 0.2
+    assert cache.get(key) == (False, None)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_tables_without_ttl_are_request_scoped_only(clock):
+    cache = QueryCache(ttl={})
+    key = _key()
+    request_scope = {}
+    _put(cache, key, [(1,)], request_scope)
+    assert cache.get(key) == (False, None)
+    assert cache.get(key, request_scope) == (True, [(1,)])
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = QueryCache(max_entries=2, ttl={"posts": 60})
+    first, second, third = _key(params=(1,)), _key(params=(2,)), \
+        _key(params=(3,))
+    _put(cache, first, [(1,)])
+    _put(cache, second, [(2,)])
+    assert cache.get(first)[0]
+    _put(cache, third, [(3,)])
+    assert cache.get(first)[0]
+    assert cache.get(second) == (False, None)
+    assert cache.get(third)[0]
+
+
+def test_dict_rows_are_copied(clock):
+    cache = QueryCache(ttl={"posts": 60})
+    key = _key()
+    _put(cache, key, [{"a": 1}])
+    cache.get(key)[1][0]["a"] = 2
+    assert cache.get(key) == (True, [{"a": 1}])
+
+
+def test_invalidate_drops_table_from_both_tiers(clock):
+    cache = QueryCache(ttl={"posts": 60})
+    posts, other = _key("Posts"), _key("Other")
+    request_scope = {}
+    _put(cache, posts, [(1,)], request_scope)
+    _put(cache, other, [(2,)], request_scope)
+    cache.invalidate("db", "POSTS", request_scope)
+    assert cache.get(posts, request_scope) == (False, None)
+    assert cache.get(other, request_scope) == (True, [(2,)])
+
+
+def test_schema_change_invalidates_all_tables(clock):
+    cache = QueryCache(ttl={"posts": 60})
+    posts, other = _key("Posts"), _key("Other")
+    _put(cache, posts, [(1,)])
+    _put(cache, other, [(2,)])
+    table_name = get_written_table("ALTER TABLE Posts ADD COLUMN b INT")
+    cache.invalidate("db", table_name)
+    assert cache.get(posts) == (False, None)
+    assert cache.get(other) == (False, None)
+
+
+@pytest.mark.parametrize("written_table", ["Posts", ALL_TABLES])
+def test_read_racing_a_write_is_not_cached(clock, written_table):
+    cache = QueryCache(ttl={"posts": 60})
+    key = _key("Posts")
+    request_scope = {}
+    generation = cache.generation(key)
+    # The write commits while the read is still running
+    cache.invalidate("db", written_table)
+    cache.put(key, "posts", [(1,)], generation, request_scope)
+    assert cache.get(key, request_scope) == (False, None)
+
+
+def test_disabled_cache_stores_nothing(clock):
+    cache = QueryCache(enabled=False, ttl={"posts": 60})
+    key = _key()
+    request_scope = {}
+    _put(cache, key, [(1,)], request_scope)
+    assert request_scope == {}
+    assert cache.get(key, request_scope) == (False, None)
+
+
+def test_uncached_status_read_sees_write_of_other_interface(tmp_path):
+    def connect():
+        return DatabaseInterface(
+            host=None, user=None, password=None, database="status_test",
+            backend="sqlite", sqlite_path=str(tmp_path / "test.db"))
+
+    db_interface, other_interface = connect(), connect()
+    MigrationRunner(db_interface).migrate()
+    table_name = db_interface.tables["reddit_posts"].name
+    db_interface.execute_query(
+        f"INSERT INTO {table_name} (post_id) VALUES (%s)", ("p1",))
+    with db_interface.request_scope():
+        assert not get_reddit_post_statuses(
+            db_interface, ["p1"])["p1"]["is_portfolio"]
+        other_interface.execute_query(
+            f"UPDATE {table_name} SET is_portfolio = 1 WHERE post_id = %s",
+            ("p1",))
+        assert get_reddit_post_statuses(
+            db_interface, ["p1"], use_cache=False)["p1"]["is_portfolio"]
@@ -0,0 +1,48 @@
+from app.core.database.schema_cache import SchemaCache
+
+COLUMNS = {"RedditPosts": {"post_id": "varchar(32)"}}
+MIGRATED_COLUMNS = {
+    "RedditPosts": {"post_id": "varchar(32)", "failed": "tinyint(1)"}}
+
+
+def test_get_returns_copies_of_cached_tables():
+    cache = SchemaCache()
+    cache.put("test", COLUMNS)
+    assert cache.get("test", ["RedditPosts"]) == COLUMNS
+    cache.get("test", ["RedditPosts"])["RedditPosts"]["x"] = "int"
+    assert cache.get("test", ["RedditPosts"]) == COLUMNS
+    assert cache.get("test", ["RedditPosts", "Portfolios"]) is None
+    assert cache.get("other", ["RedditPosts"]) is None
+
+
+def test_raising_schema_version_in_process_reloads():
+    cache = SchemaCache(schema_version=1)
+    cache.put("test", COLUMNS)
+    cache.schema_version = 2
+    assert cache.get("test", ["RedditPosts"]) is None
+    cache.put("test", MIGRATED_COLUMNS)
+    assert cache.get("test", ["RedditPosts"]) == MIGRATED_COLUMNS
+
+
+def test_snapshot_of_another_schema_version_is_ignored(tmp_path):
+    cache = SchemaCache(
+        schema_version=1, use_snapshot=True, snapshot_dir=str(tmp_path))
+    cache.put("test", COLUMNS)
+    assert SchemaCache(
+        schema_version=1, use_snapshot=True, snapshot_dir=str(tmp_path)
+    ).get("test", ["RedditPosts"]) == COLUMNS
+    assert SchemaCache(
+        schema_version=2, use_snapshot=True, snapshot_dir=str(tmp_path)
+    ).get("test", ["RedditPosts"]) is None
+
+
+def test_invalidate_drops_all_versions_and_the_snapshot(tmp_path):
+    cache = SchemaCache(use_snapshot=True, snapshot_dir=str(tmp_path))
+    cache.put("test", COLUMNS)
+    cache.put("other", COLUMNS)
+    cache.invalidate("test")
+    assert cache.get("test", ["RedditPosts"]) is None
+    assert not (tmp_path / "schema_test.json").exists()
+    assert cache.get("other", ["RedditPosts"]) == COLUMNS
+    cache.invalidate()
+    assert cache.get("other", ["RedditPosts"]) is None
@@ -0,0 +1,137 @@
+import datetime as dt
+import sqlite3
+
+import pymysql
+import pytest
+
+from app.core.database.backends.sqlite_backend import (
+    SQLiteCursor,
+    translate_query
+)
+from app.core.database.db_interface import DatabaseInterface
+from app.core.database.migrations import MigrationRunner
+from app.core.database.queries import (
+    GET_CRYPTO_CURRENCY_PRICES_BY_KEYS_TEMPLATE,
+    INSERT_CRYPTO_CURRENCY_PRICE_TEMPLATE
+)
+
+
+@pytest.mark.parametrize("query, expected", [
+    (
+        "SELECT * FROM t WHERE a = %s AND b = %s",
+        "SELECT * FROM t WHERE a = ? AND b = ?"
+    ),
+    (
+        "INSERT INTO t (a, b) VALUES (%s, %s) "
+        "ON DUPLICATE KEY UPDATE b = VALUES(b)",
+        "INSERT INTO t (a, b) VALUES (?, ?) "
+        "ON CONFLICT DO UPDATE SET b = excluded.b"
+    ),
+    (
+        "INSERT INTO t (a, b, c) VALUES (%s, %s, %s)\n"
+        "  on duplicate key update\n  b = values(b),\n  c = VALUES(c)",
+        "INSERT INTO t (a, b, c) VALUES (?, ?, ?)\n"
+        "  ON CONFLICT DO UPDATE SET\n  b = excluded.b,\n  c = excluded.c"
+    ),
+    (
+        "SELECT * FROM t WHERE (a, b) IN ((%s, %s), (%s, %s))",
+        "SELECT * FROM t WHERE ((a = ? AND b = ?) OR (a = ? AND b = ?))"
+    ),
+    (
+        "SELECT * FROM t WHERE (a, b) IN ((%s, %s))",
+        "SELECT * FROM t WHERE ((a = ? AND b = ?))"
+    ),
+    (
+        "CREATE TABLE t (id INT NOT NULL AUTO_INCREMENT PRIMARY KEY)",
+        "CREATE TABLE t (id INTEGER PRIMARY KEY AUTOINCREMENT)"
+    ),
+    (
+        "SELECT * FROM t WHERE a IN (%s, %s)",
+        "SELECT * FROM t WHERE a IN (?, ?)"
+    ),
+])
+def test_translate_query(query, expected):
+    assert translate_query(query) == expected
+
+
+@pytest.mark.parametrize("query, params, error", [
+    ("INSERT INTO t (a) VALUES (?)", (1,), pymysql.IntegrityError),
+    ("SELECT * FROM missing", (), pymysql.OperationalError),
+    ("SELECT ?", (1, 2), pymysql.ProgrammingError),
+])
+def test_sqlite_errors_raise_pymysql_errors(query, params, error):
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE t (a INTEGER PRIMARY KEY)")
+    connection.execute("INSERT INTO t (a) VALUES (1)")
+    cursor = SQLiteCursor(connection.cursor())
+    with pytest.raises(error):
+        cursor.execute(query, params)
+
+
+def test_dictionary_cursor_returns_dicts():
+    connection = sqlite3.connect(":memory:")
+    cursor = SQLiteCursor(connection.cursor(), dictionary_cursor=True)
+    cursor.execute("SELECT %s AS a, %s AS b", (1, "x"))
+    assert cursor.fetchall() == [{"a": 1, "b": "x"}]
+
+
+@pytest.fixture
+def db_interface(tmp_path):
+    db_interface = DatabaseInterface(
+        host=None, user=None, password=None, database="test",
+        backend="sqlite", sqlite_path=str(tmp_path / "test.db"))
+    MigrationRunner(db_interface).migrate()
+    return db_interface
+
+
+def _price_row(name: str, price: float, iso_week: int = 1) -> tuple:
+    return (name, name[:3].upper(), price, "usd", dt.date(2024, 1, 1),
+            iso_week, 2024)
+
+
+def _get_prices(db_interface, keys: list[tuple]) -> dict:
+    query = GET_CRYPTO_CURRENCY_PRICES_BY_KEYS_TEMPLATE.format(
+        table_name=db_interface.tables["crypto_currency_prices"].name,
+        placeholders=", ".join(["(%s, %s, %s, %s)"] * len(keys)))
+    params = tuple(value for key in keys for value in key)
+    return {
+        row["name"]: row for row in db_interface.execute_query(
+            query, params, dictionary_cursor=True)
+    }
+
+
+def test_interface_upserts_and_reads_back(db_interface):
+    query = INSERT_CRYPTO_CURRENCY_PRICE_TEMPLATE.format(
+        table_name=db_interface.tables["crypto_currency_prices"].name)
+    db_interface.execute_query(query, _price_row("Bitcoin", 1.0))
+    assert db_interface.execute_many(
+        query, [_price_row("Bitcoin", 2.0), _price_row("Ethereum", 3.0)]
+    ) == 2
+
+    prices = _get_prices(db_interface, [
+        ("Bitcoin", "BIT", 1, 2024), ("Ethereum", "ETH", 1, 2024)])
+    assert prices["Bitcoin"]["price"] == 2.0
+    assert prices["Ethereum"]["price"] == 3.0
+    assert prices["Bitcoin"]["date"] == dt.date(2024, 1, 1)
+    table_name = db_interface.tables["crypto_currency_prices"].name
+    assert db_interface.execute_query(
+        f"SELECT COUNT(*) FROM {table_name}") == [(2,)]
+
+
+def test_interface_transaction_rolls_back(db_interface):
+    query = INSERT_CRYPTO_CURRENCY_PRICE_TEMPLATE.format(
+        table_name=db_interface.tables["crypto_currency_prices"].name)
+    with pytest.raises(RuntimeError):
+        with db_interface.transaction():
+            db_interface.execute_query(query, _price_row("Bitcoin", 1.0))
+            db_interface.execute_many(query, [_price_row("Ethereum", 3.0)])
+            raise RuntimeError("abort")
+    assert _get_prices(db_interface, [("Bitcoin", "BIT", 1, 2024)]) == {}
+
+    committed = []
+    with db_interface.transaction():
+        db_interface.execute_query(query, _price_row("Bitcoin", 1.0))
+        db_interface.call_on_commit(lambda: committed.append(True))
+    assert committed == [True]
+    assert list(_get_prices(
+        db_interface, [("Bitcoin", "BIT", 1, 2024)])) == ["Bitcoin"]
@@ -0,0 +1,178 @@
+import asyncio
+import datetime as dt
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import app.core.fetcher.async_crypto_currency as async_crypto_currency
+import app.core.fetcher.crypto_currency as crypto_currency
+from app.core.fetcher.async_crypto_currency import (
+    AsyncCryptoCurrencyFetcher,
+    run_sync
+)
+from app.core.fetcher.crypto_currency import CryptoCurrencyFetcher
+from app.core.fetcher.provider_stats import ProviderStats
+from app.core.utils.response_cache import ResponseCache
+
+
+async def _current_thread_name() -> str:
+    await asyncio.sleep(0)
+    return threading.current_thread().name
+
+
+def test_run_sync_without_running_loop():
+    assert run_sync(_current_thread_name()) == \
+        threading.current_thread().name
+
+
+def test_run_sync_inside_running_loop():
+    async def handler():
+        # A sync wrapper called from a coroutine, as in a FastAPI endpoint
+        return run_sync(_current_thread_name())
+
+    assert asyncio.run(handler()).startswith("async-fetcher")
+
+
+class StubSession:
+    def __init__(self, data: dict):
+        self.data = data
+        self.requests = []
+
+    async def get_json(self, provider, url, params=None, headers=None):
+        self.requests.append((provider, url, params))
+        return self.data
+
+
+class RecordingCache(ResponseCache):
+    """ResponseCache that records the threads doing its IO."""
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.threads = []
+
+    def get(self, provider, url, params=None):
+        self.threads.append(threading.current_thread().name)
+        return super().get(provider, url, params)
+
+    def set(self, provider, url, params, data, ttl=None):
+        self.threads.append(threading.current_thread().name)
+        super().set(provider, url, params, data, ttl=ttl)
+
+
+def test_price_on_date_cache_io_runs_off_the_loop(monkeypatch, tmp_path):
+    response_cache = RecordingCache(str(tmp_path / "responses.sqlite3"))
+    monkeypatch.setattr(
+        async_crypto_currency, "get_response_cache", lambda: response_cache)
+    fetcher = AsyncCryptoCurrencyFetcher()
+    session = StubSession(
+        {"market_data": {"current_price": {"usd": 42.0}}})
+
+    async def fetch_twice():
+        loop_thread = threading.current_thread().name
+        results = [
+            await fetcher._fetch_price_on_date(
+                session, "bitcoin", dt.date(2024, 1, 1), "usd")
+            for _ in range(2)
+        ]
+        return loop_thread, results
+
+    loop_thread, results = asyncio.run(fetch_twice())
+    assert [result["price"] for result in results] == [42.0, 42.0]
+    # get, set, then a cache hit
+    assert len(session.requests) == 1
+    assert len(response_cache.threads) == 3
+    assert loop_thread not in response_cache.threads
+
+
+COIN_IDS = [
+    {"coin_gecko": "bitcoin", "coin_market_cap": "bitcoin"},
+    {"coin_gecko": "ethereum", "coin_market_cap": "ethereum"},
+    {"coin_gecko": None, "coin_market_cap": "cmc-only"},
+]
+
+
+@pytest.fixture
+def race(monkeypatch):
+    """
+    Hedged requests against stub providers: {provider: (delay, prices by
+    coin index)}. Returns the stats and the requests made.
+    """
+    stats = ProviderStats(ewma_alpha=0.5)
+    monkeypatch.setattr(async_crypto_currency, "provider_stats", stats)
+    monkeypatch.setattr(crypto_currency, "provider_stats", stats)
+    monkeypatch.setitem(
+        async_crypto_currency.app_config, "hedged_requests", {
+            "enabled": True, "hedge_delay": 0.05, "adaptive_order": False})
+    providers = {}
+    requests = []
+
+    async def get_current_prices_by_index(
+            self, session, provider, coin_ids, indexes, vs_currency):
+        delay, prices = providers[provider]
+        requests.append((provider, indexes))
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            requests.append((provider, "cancelled"))
+            raise
+        return {index: prices[index] for index in indexes if index in prices}
+
+    monkeypatch.setattr(
+        AsyncCryptoCurrencyFetcher, "_get_current_prices_by_index",
+        get_current_prices_by_index)
+    return SimpleNamespace(
+        providers=providers, requests=requests, stats=stats)
+
+
+def _prices(results: list[dict]) -> list:
+    return [result["price"] for result in results]
+
+
+def test_fast_primary_is_not_hedged(race):
+    race.providers.update({
+        "coin_gecko": (0, {0: 1.0, 1: 2.0}),
+        "coin_market_cap": (0, {0: 10.0, 1: 20.0, 2: 30.0}),
+    })
+    results = AsyncCryptoCurrencyFetcher().fetch_current_coin_prices(
+        COIN_IDS)
+    assert _prices(results) == [1.0, 2.0, 30.0]
+    # The secondary is only asked for the coin the primary had no price for
+    assert race.requests == [
+        ("coin_gecko", [0, 1, 2]), ("coin_market_cap", [2])]
+
+
+def test_slow_primary_loses_and_is_cancelled(race):
+    race.providers.update({
+        "coin_gecko": (5, {0: 1.0, 1: 2.0}),
+        "coin_market_cap": (0, {0: 10.0, 1: 20.0, 2: 30.0}),
+    })
+    results = AsyncCryptoCurrencyFetcher().fetch_current_coin_prices(
+        COIN_IDS)
+    assert _prices(results) == [10.0, 20.0, 30.0]
+    assert ("coin_gecko", "cancelled") in race.requests
+    snapshot = race.stats.snapshot()
+    assert snapshot["coin_market_cap"]["score"] == 1.0
+    assert snapshot["coin_gecko"]["score"] == 0.0
+    # The loser is recorded with the time it had been running
+    assert snapshot["coin_gecko"]["latency"] >= 0.05
+
+
+def test_failing_provider_falls_back(race):
+    race.providers.update({
+        "coin_gecko": (0, {}),
+        "coin_market_cap": (0, {1: 20.0}),
+    })
+    results = AsyncCryptoCurrencyFetcher().fetch_current_coin_prices(
+        COIN_IDS)
+    assert _prices(results) == [None, 20.0, None]
+    assert [result["is_error"] for result in results] == [True, False, True]
+
+
+def test_sync_fetcher_races_through_the_async_fetcher(race):
+    race.providers.update({
+        "coin_gecko": (5, {0: 1.0}),
+        "coin_market_cap": (0, {0: 10.0}),
+    })
+    results = CryptoCurrencyFetcher().fetch_current_coin_prices(COIN_IDS[:1])
+    assert _prices(results) == [10.0]
+    assert ("coin_gecko", "cancelled") in race.requests
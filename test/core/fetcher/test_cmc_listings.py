@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import app.core.fetcher.cmc_listings as cmc_listings
+from app.core.fetcher.cmc_listings import CMCListing, CMCListingsSnapshot
+
+BITCOIN = CMCListing(1, "Bitcoin", "BTC", "bitcoin", 60000.0)
+
+
+class StubDownload:
+    """CMCListingsSnapshot._download that fails while failing is set."""
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+
+    def __call__(self, vs_currency):
+        self.calls += 1
+        if self.failing:
+            raise requests.exceptions.HTTPError("401 Unauthorized")
+        return [BITCOIN]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cmc_listings, "time", SimpleNamespace(
+        monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def snapshot(monkeypatch):
+    snapshot = CMCListingsSnapshot(ttl=300, error_ttl=60)
+    monkeypatch.setattr(snapshot, "_download", StubDownload())
+    return snapshot
+
+
+def test_one_download_per_ttl(clock, snapshot):
+    assert snapshot.get_by_slug("bitcoin") == BITCOIN
+    assert snapshot.get_by_symbol("btc") == [BITCOIN]
+    assert snapshot.get_by_id("1") == BITCOIN
+    assert snapshot._download.calls == 1
+    clock.now += 300
+    snapshot.get_by_slug("bitcoin")
+    assert snapshot._download.calls == 2
+
+
+def test_failed_download_is_not_retried_within_error_ttl(clock, snapshot):
+    snapshot._download.failing = True
+    for _ in range(30):
+        assert snapshot.get_by_slug("bitcoin") is None
+    assert snapshot._download.calls == 1
+
+    clock.now += 60
+    snapshot._download.failing = False
+    assert snapshot.get_by_slug("bitcoin") == BITCOIN
+    assert snapshot._download.calls == 2
+
+
+def test_failed_refresh_serves_the_stale_snapshot(clock, snapshot):
+    snapshot.get_all()
+    clock.now += 300
+    snapshot._download.failing = True
+    assert snapshot.get_by_slug("bitcoin") == BITCOIN
+    assert snapshot.get_by_symbol("BTC") == [BITCOIN]
+    assert snapshot._download.calls == 2
+    clock.now += 59
+    assert snapshot.get_all() == [BITCOIN]
+    assert snapshot._download.calls == 2
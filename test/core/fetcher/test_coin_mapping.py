@@ -0,0 +1,84 @@
+import os
+import time
+from itertools import count
+from types import SimpleNamespace
+
+import pytest
+
+import app.core.fetcher.coin_mapping as coin_mapping
+from app.core.fetcher.coin_mapping import (
+    POINTER_FILE,
+    CoinMapping,
+    get_artifact_path,
+    read_mapping_artifact,
+    read_mapping_version,
+    write_mapping_artifact
+)
+
+ROWS = {
+    "coin_gecko": [
+        CoinMapping("btc", "Bitcoin", "bitcoin"),
+        CoinMapping("eth", "Ethereum", "ethereum"),
+    ],
+    "coin_market_cap": [CoinMapping("BTC", "Bitcoin", "bitcoin")],
+}
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    """A new second for every artifact version."""
+    seconds = count(1_700_000_000)
+    monkeypatch.setattr(coin_mapping, "time", SimpleNamespace(
+        strftime=time.strftime, monotonic=time.monotonic,
+        gmtime=lambda: time.gmtime(next(seconds))))
+
+
+def _artifacts(directory) -> list[str]:
+    return sorted(
+        file_name for file_name in os.listdir(directory)
+        if file_name.endswith(".sqlite3"))
+
+
+def test_write_points_at_the_new_version(tmp_path):
+    assert read_mapping_version(str(tmp_path)) is None
+    version = write_mapping_artifact(str(tmp_path), ROWS)
+    assert read_mapping_version(str(tmp_path)) == version
+    path = get_artifact_path(str(tmp_path), version)
+    assert read_mapping_artifact(path, "coin_gecko") == ROWS["coin_gecko"]
+    assert read_mapping_artifact(path, "unknown") == []
+    # No temporary files are left behind
+    assert sorted(os.listdir(tmp_path)) == \
+        sorted([POINTER_FILE, os.path.basename(path)])
+
+
+def test_pointer_swap_keeps_the_previous_version_readable(tmp_path):
+    first = write_mapping_artifact(str(tmp_path), ROWS)
+    second = write_mapping_artifact(
+        str(tmp_path), {"coin_gecko": ROWS["coin_gecko"][:1]})
+    assert read_mapping_version(str(tmp_path)) == second
+    assert read_mapping_artifact(
+        get_artifact_path(str(tmp_path), first), "coin_gecko") \
+        == ROWS["coin_gecko"]
+
+
+def test_same_second_gets_a_new_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(coin_mapping.time, "gmtime",
+                        lambda: time.gmtime(1_700_000_000))
+    first = write_mapping_artifact(str(tmp_path), ROWS)
+    second = write_mapping_artifact(str(tmp_path), ROWS)
+    assert first != second
+    assert len(_artifacts(tmp_path)) == 2
+
+
+@pytest.mark.parametrize("keep_versions, kept", [(3, 3), (1, 1), (0, 1)])
+def test_old_versions_are_pruned(tmp_path, keep_versions, kept):
+    versions = [
+        write_mapping_artifact(
+            str(tmp_path), ROWS, keep_versions=keep_versions)
+        for _ in range(4)
+    ]
+    assert _artifacts(tmp_path) == [
+        os.path.basename(get_artifact_path(str(tmp_path), version))
+        for version in versions[-kept:]
+    ]
+    assert read_mapping_version(str(tmp_path)) == versions[-1]
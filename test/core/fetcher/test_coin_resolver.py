@@ -0,0 +1,228 @@
+import statistics
+import time
+
+import pytest
+
+from app.core.fetcher.cmc_listings import CMCListing
+from app.core.fetcher.coin_mapping import CoinMapping, CoinMappingIndex
+from app.core.fetcher.coin_resolver import (
+    NAME_WEIGHT,
+    SYMBOL_WEIGHT,
+    TIE_FACTOR,
+    CoinResolver,
+    build_ranks,
+    dice,
+    normalize_name,
+    trigrams
+)
+
+# Rows in CMC ID order, so the first rows have the highest rank
+CMC_ROWS = [
+    CoinMapping("XRP", "XRP", "xrp"),
+    CoinMapping("BNB", "BNB", "bnb"),
+    CoinMapping("PI", "Pi [IOU]", "pi-iou"),
+    CoinMapping("ZBC", "Zebec Protocol", "zebec-protocol"),
+    CoinMapping("CULO", "CULO (Polygon)", "culo"),
+    CoinMapping("RPLS", "Ripples", "ripples"),
+    CoinMapping("PI", "Pi", "pi"),
+    CoinMapping("ZBCN", "Zebec Network", "zebec-network"),
+]
+
+GECKO_ROWS = [
+    CoinMapping("gib", "༼ つ ◕_◕ ༽つ", "_"),
+    CoinMapping("bnb", "Bifrost Bridged BNB (Bifrost)",
+                "bifrost-bridged-bnb-bifrost"),
+    CoinMapping("bnb", "BNB", "binancecoin"),
+    CoinMapping("bnb", "Binance Coin (Wormhole)", "binance-coin-wormhole"),
+    CoinMapping("gib", "gib", "gib-2"),
+    CoinMapping("gib", "Gibape", "gibape"),
+    CoinMapping("pi", "Plian", "pchain"),
+    CoinMapping("pi", "Pi Network", "pi-network"),
+    CoinMapping("pi", "Pi Network [IOU]", "pi-network-iou"),
+    CoinMapping("xrp", "XRP", "ripple"),
+    CoinMapping("rpls", "Ripples", "ripples"),
+    CoinMapping("zbcn", "Zebec Network", "zebec-network"),
+    CoinMapping("zbc", "Zebec Protocol", "zebec-protocol"),
+]
+
+
+def _coin_ids(matches: dict) -> dict:
+    return {
+        provider: None if match is None else match.coin_id
+        for provider, match in matches.items()
+    }
+
+
+@pytest.fixture
+def resolver():
+    cmc_index = CoinMappingIndex(CMC_ROWS)
+    return CoinResolver(
+        {
+            "coin_gecko": CoinMappingIndex(GECKO_ROWS),
+            "coin_market_cap": cmc_index
+        },
+        ranks=build_ranks(cmc_index)
+    )
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Zebec Network", "zebec network"),
+    ("  Pi Network [IOU] ", "pi network iou"),
+    ("CULO (Polygon)", "culo polygon"),
+    ("༼ つ ◕_◕ ༽つ", ""),
+    (None, ""),
+])
+def test_normalize_name(name, expected):
+    assert normalize_name(name) == expected
+
+
+def test_trigrams_are_padded():
+    assert trigrams("pi") == {"  p", " pi", "pi "}
+    assert trigrams("") == {"   "}
+
+
+def test_dice():
+    assert dice(trigrams("zebec"), trigrams("zebec")) == 1.0
+    assert dice(trigrams("xrp"), trigrams("ripple")) == 0.0
+    assert dice(frozenset(), trigrams("xrp")) == 0.0
+    # 6 of 7 and 8 trigrams shared
+    assert dice(trigrams("ripple"), trigrams("ripples")) == \
+        pytest.approx(0.8)
+
+
+def test_candidates_need_enough_shared_trigrams(resolver):
+    index = resolver._indexes["coin_gecko"]
+    names = {
+        index.rows[position].coin_id
+        for position in resolver._candidates(index, trigrams("ripple"))
+    }
+    assert names == {"ripples"}
+    assert resolver._candidates(index, trigrams("zzz")) == set()
+
+
+def test_candidates_skip_common_trigrams(resolver):
+    resolver.max_posting = 1
+    index = resolver._indexes["coin_gecko"]
+    # Every trigram of "network" is in several names
+    assert resolver._candidates(index, trigrams("network")) == set()
+
+
+def test_exact_match(resolver):
+    matches = resolver.resolve("Zebec Network", "ZBCN")
+    assert _coin_ids(matches) == {
+        "coin_gecko": "zebec-network", "coin_market_cap": "zebec-network"}
+    assert matches["coin_gecko"].confidence == 1.0
+
+
+@pytest.mark.parametrize("name, symbol, coin_gecko, coin_market_cap", [
+    # The symbol beats name-only matches ("Ripples")
+    ("Ripple", "XRP", "ripple", "xrp"),
+    # A similar name (Wormhole) doesn't beat the market cap
+    ("Binance Coin", "BNB", "binancecoin", "bnb"),
+    # Collisions on PI: exact names, else the market cap
+    ("Plian", "PI", "pchain", "pi-iou"),
+    ("Pi Network", "PI", "pi-network", "pi-iou"),
+    # Collisions on GIB
+    ("GIB", "GIB", "gib-2", None),
+    ("Gibape", "GIB", "gibape", None),
+    # Name variant with the symbol of another coin
+    ("Zebec Network", "ZBC", "zebec-protocol", "zebec-protocol"),
+    # No coin has the symbol: the name alone decides
+    ("Zebec Networks", "ZBN", "zebec-network", "zebec-network"),
+    ("Polygon", "MATIC", None, None),
+])
+def test_resolve(resolver, name, symbol, coin_gecko, coin_market_cap):
+    assert _coin_ids(resolver.resolve(name, symbol)) == {
+        "coin_gecko": coin_gecko, "coin_market_cap": coin_market_cap}
+
+
+def test_symbol_match_below_min_confidence_is_returned(resolver):
+    match = resolver.resolve("Ripple", "XRP")["coin_market_cap"]
+    assert match.confidence == pytest.approx(SYMBOL_WEIGHT)
+    assert match.confidence < resolver.min_confidence
+
+
+def test_symbol_only_tie_goes_to_market_cap(resolver):
+    match = resolver.resolve("", "PI")["coin_market_cap"]
+    assert match.coin_id == "pi-iou"
+    assert match.confidence == pytest.approx(TIE_FACTOR)
+
+
+def test_close_name_beats_market_cap_among_symbol(resolver):
+    match = resolver.resolve("Pi Network IOU", "PI")["coin_gecko"]
+    assert match.coin_id == "pi-network-iou"
+    assert match.confidence == pytest.approx(NAME_WEIGHT + SYMBOL_WEIGHT)
+
+
+def test_listings_rank_breaks_ties():
+    cmc_index = CoinMappingIndex(CMC_ROWS)
+    listings = [CMCListing(1, "Pi", "PI", "pi", 1.0)]
+    resolver = CoinResolver(
+        {"coin_market_cap": cmc_index},
+        ranks=build_ranks(cmc_index, listings))
+    assert resolver.resolve("Pi Network", "PI")["coin_market_cap"].coin_id \
+        == "pi"
+
+
+def test_build_ranks():
+    cmc_index = CoinMappingIndex(CMC_ROWS)
+    listings = [
+        CMCListing(2, "Pi", "PI", "pi", 1.0),
+        CMCListing(1, "XRP", "XRP", "xrp", 1.0),
+    ]
+    ranks = build_ranks(cmc_index, listings)
+    assert ranks["pi"] == 0
+    assert ranks[("PI", "pi")] == 0
+    assert ranks["xrp"] == 1
+    # Unlisted coins follow in mapping order
+    assert ranks["bnb"] == 4 + 1
+    assert ranks[("PI", "pi iou")] == 4 + 2
+    assert build_ranks(cmc_index)["xrp"] == 0
+
+
+def test_resolutions_are_cached(resolver):
+    first = resolver.resolve("Ripple", "xrp")
+    resolver._indexes.clear()
+    assert resolver.resolve(" ripple ", "XRP ") == first
+
+
+@pytest.fixture(scope="module")
+def mapping_resolver():
+    cmc_index = CoinMappingIndex.from_csv(
+        "data/coinmarketcap_mapping.csv", "slug")
+    return CoinResolver(
+        {
+            "coin_gecko": CoinMappingIndex.from_csv(
+                "data/coingecko_mapping.csv", "id"),
+            "coin_market_cap": cmc_index
+        },
+        ranks=build_ranks(cmc_index)
+    )
+
+
+@pytest.mark.parametrize("name, symbol, coin_gecko, coin_market_cap", [
+    ("Ripple", "XRP", "ripple", "xrp"),
+    ("Polygon", "MATIC", "matic-network", None),
+    ("Binance Coin", "BNB", "binancecoin", "bnb"),
+    ("Bitcoin", "BTC", "bitcoin", "bitcoin"),
+])
+def test_resolve_on_mapping_files(
+        mapping_resolver, name, symbol, coin_gecko, coin_market_cap):
+    assert _coin_ids(mapping_resolver.resolve(name, symbol)) == {
+        "coin_gecko": coin_gecko, "coin_market_cap": coin_market_cap}
+
+
+def test_resolve_takes_under_a_millisecond(mapping_resolver):
+    queries = [
+        ("Ripple", "XRP"), ("Binance Coin", "BNB"), ("Pi Network", "PI"),
+        ("Etherium", "ETH"), ("Zebec Network", "ZBC"), ("Polygon", "MATIC"),
+        ("Ripple", ""), ("Bitcon", ""), ("Solana Token", "SOLT"),
+        ("Dogecoin", "DOGE"), ("Chainlnk", "LINK"), ("Cardano", "ADA"),
+    ]
+    timings = []
+    for name, symbol in queries:
+        mapping_resolver.clear_cache()
+        started = time.perf_counter()
+        mapping_resolver.resolve(name, symbol)
+        timings.append(time.perf_counter() - started)
+    assert statistics.median(timings) < 0.001
@@ -0,0 +1,47 @@
+import pytest
+
+from app.core.fetcher.provider_stats import ProviderStats
+
+
+def test_first_race_sets_score_and_latency():
+    stats = ProviderStats(ewma_alpha=0.5)
+    stats.record("a", 1.0, 0.2)
+    assert stats.snapshot()["a"] == {
+        "score": 1.0, "latency": 0.2, "wins": 1, "races": 1}
+
+
+def test_score_and_latency_are_ewma():
+    stats = ProviderStats(ewma_alpha=0.5)
+    stats.record("a", 1.0, 1.0)
+    stats.record("a", 0.0, 3.0)
+    stats.record("a", 0.0)
+    snapshot = stats.snapshot()["a"]
+    assert snapshot["score"] == pytest.approx(0.25)
+    # A race without a latency sample keeps the latency
+    assert snapshot["latency"] == pytest.approx(2.0)
+    assert (snapshot["wins"], snapshot["races"]) == (1, 3)
+
+
+def test_order_keeps_configured_order_until_every_provider_raced():
+    stats = ProviderStats()
+    stats.record("b", 1.0)
+    assert stats.order(["a", "b"]) == ["a", "b"]
+
+
+def test_order_puts_recent_winner_first():
+    stats = ProviderStats(ewma_alpha=0.5)
+    stats.record("a", 1.0)
+    stats.record("b", 0.0)
+    assert stats.order(["a", "b"]) == ["a", "b"]
+    # b wins the next races and overtakes a
+    for _ in range(3):
+        stats.record("a", 0.0)
+        stats.record("b", 1.0)
+    assert stats.order(["a", "b"]) == ["b", "a"]
+
+
+def test_order_is_stable_on_equal_scores():
+    stats = ProviderStats()
+    stats.record("a", 0.5)
+    stats.record("b", 0.5)
+    assert stats.order(["b", "a"]) == ["b", "a"]
@@ -0,0 +1,45 @@
+import pytest
+
+import app.core.fetcher.reddit as reddit
+from app.core.fetcher.reddit import RedditFetcher
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.tokens = []
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        self.tokens.append(tokens)
+        return True
+
+
+class EmptyListing(list):
+    yielded = 0
+
+
+class StubSubreddit:
+    def new(self, limit=None):
+        return EmptyListing()
+
+
+class StubClient:
+    def subreddit(self, name: str) -> StubSubreddit:
+        return StubSubreddit()
+
+
+@pytest.mark.parametrize("limit, tokens", [
+    (None, 10),
+    (1, 1),
+    (100, 1),
+    (101, 2),
+    (250, 3),
+    (5000, 10),
+])
+def test_get_new_posts_takes_a_token_per_listing_page(
+        monkeypatch, limit, tokens):
+    limiter = RecordingLimiter()
+    monkeypatch.setattr(reddit, "get_rate_limiter", lambda name: limiter)
+    fetcher = RedditFetcher.__new__(RedditFetcher)
+    fetcher.client = StubClient()
+    assert fetcher.get_new_posts("CryptoCurrency", limit=limit) == []
+    assert limiter.tokens == [tokens]
@@ -0,0 +1,156 @@
+import time
+from itertools import count
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import app.core.fetcher.coin_mapping as coin_mapping
+import app.core.pipelines.pipelines as pipelines
+from app.core.fetcher.coin_mapping import (
+    CoinMapping,
+    get_artifact_path,
+    get_coin_mapping_index,
+    read_mapping_artifact,
+    read_mapping_version,
+    write_mapping_artifact
+)
+
+GECKO_ROWS = [
+    CoinMapping("btc", "Bitcoin", "bitcoin"),
+    CoinMapping("eth", "Ethereum", "ethereum"),
+    CoinMapping("xrp", "XRP", "ripple"),
+    CoinMapping("ada", "Cardano", "cardano"),
+    CoinMapping("sol", "Solana", "solana"),
+]
+CMC_ROWS = [
+    CoinMapping("BTC", "Bitcoin", "bitcoin"),
+    CoinMapping("ETH", "Ethereum", "ethereum"),
+]
+
+CC_FETCHER = SimpleNamespace(request_info={
+    "coin_gecko": {
+        "mapping_file": "coingecko_mapping.csv", "id_column": "id"},
+    "coin_market_cap": {
+        "mapping_file": "coinmarketcap_mapping.csv", "id_column": "slug"},
+})
+
+
+@pytest.fixture
+def mapping_dir(tmp_path, monkeypatch):
+    """An artifact directory with a current version of the rows above."""
+    seconds = count(1_700_000_000)
+    monkeypatch.setattr(coin_mapping, "time", SimpleNamespace(
+        strftime=time.strftime, monotonic=time.monotonic,
+        gmtime=lambda: time.gmtime(next(seconds))))
+    monkeypatch.setitem(pipelines.app_config, "mapping_artifact", {
+        "dir": str(tmp_path), "keep_versions": 3, "check_interval": 60,
+        "max_delisted_share": 0.2})
+    monkeypatch.setattr(coin_mapping, "_indexes", {})
+    monkeypatch.setattr(coin_mapping, "_version_checked_at", None)
+    write_mapping_artifact(
+        str(tmp_path), {"coin_gecko": GECKO_ROWS, "coin_market_cap": CMC_ROWS})
+    return tmp_path
+
+
+def _fetch_coin_maps(monkeypatch, coin_gecko, coin_market_cap):
+    def fetcher(rows):
+        def fetch_coin_map():
+            if isinstance(rows, Exception):
+                raise rows
+            return rows
+        return fetch_coin_map
+
+    monkeypatch.setattr(
+        pipelines, "fetch_coin_gecko_coin_map", fetcher(coin_gecko))
+    monkeypatch.setattr(
+        pipelines, "fetch_cmc_coin_map", fetcher(coin_market_cap))
+
+
+def test_unchanged_lists_keep_the_version(mapping_dir, monkeypatch):
+    version = read_mapping_version(str(mapping_dir))
+    _fetch_coin_maps(monkeypatch, GECKO_ROWS, CMC_ROWS)
+    report = pipelines.refresh_coin_mapping_pipeline(CC_FETCHER)
+    assert report["version"] == version
+    assert read_mapping_version(str(mapping_dir)) == version
+
+
+def test_new_coins_swap_the_pointer(mapping_dir, monkeypatch):
+    previous = read_mapping_version(str(mapping_dir))
+    new_cmc_rows = CMC_ROWS + [CoinMapping("XRP", "XRP", "xrp")]
+    _fetch_coin_maps(monkeypatch, GECKO_ROWS, new_cmc_rows)
+    # Index of the previous version, held by a lookup in progress
+    held = get_coin_mapping_index(
+        "coin_market_cap", "./data/coinmarketcap_mapping.csv", "slug")
+
+    report = pipelines.refresh_coin_mapping_pipeline(CC_FETCHER)
+    assert report["version"] != previous
+    assert read_mapping_version(str(mapping_dir)) == report["version"]
+    assert report["providers"]["coin_market_cap"]["added"] == ["xrp"]
+    assert get_coin_mapping_index(
+        "coin_market_cap", "./data/coinmarketcap_mapping.csv", "slug"
+    ).rows == new_cmc_rows
+    assert held.rows == CMC_ROWS
+    assert read_mapping_artifact(
+        get_artifact_path(str(mapping_dir), previous), "coin_market_cap"
+    ) == CMC_ROWS
+
+
+def test_failed_download_keeps_current(mapping_dir, monkeypatch):
+    new_cmc_rows = CMC_ROWS + [CoinMapping("XRP", "XRP", "xrp")]
+    _fetch_coin_maps(
+        monkeypatch, requests.exceptions.ConnectionError("down"),
+        new_cmc_rows)
+    report = pipelines.refresh_coin_mapping_pipeline(CC_FETCHER)
+    assert report["providers"]["coin_gecko"] == {
+        "added": [], "delisted": [], "total": len(GECKO_ROWS),
+        "kept_current": True}
+    assert report["providers"]["coin_market_cap"]["kept_current"] is False
+    path = get_artifact_path(str(mapping_dir), report["version"])
+    assert read_mapping_artifact(path, "coin_gecko") == GECKO_ROWS
+    assert read_mapping_artifact(path, "coin_market_cap") == new_cmc_rows
+
+
+def test_cmc_error_keeps_current(mapping_dir, monkeypatch):
+    version = read_mapping_version(str(mapping_dir))
+    _fetch_coin_maps(monkeypatch, GECKO_ROWS, ValueError("invalid key"))
+    report = pipelines.refresh_coin_mapping_pipeline(CC_FETCHER)
+    assert report["providers"]["coin_market_cap"]["kept_current"] is True
+    assert report["version"] == version
+
+
+@pytest.mark.parametrize("new_rows, kept_current", [
+    # 1 of 5 coins delisted is within max_delisted_share
+    (GECKO_ROWS[:4], False),
+    # 2 of 5 is not
+    (GECKO_ROWS[:3], True),
+])
+def test_max_delisted_share_guard(
+        mapping_dir, monkeypatch, new_rows, kept_current):
+    _fetch_coin_maps(monkeypatch, new_rows, CMC_ROWS)
+    report = pipelines.refresh_coin_mapping_pipeline(CC_FETCHER)
+    provider_report = report["providers"]["coin_gecko"]
+    assert provider_report["kept_current"] is kept_current
+    rows = read_mapping_artifact(
+        get_artifact_path(str(mapping_dir), report["version"]), "coin_gecko")
+    if kept_current:
+        assert provider_report["delisted"] == []
+        assert rows == GECKO_ROWS
+    else:
+        assert provider_report["delisted"] == ["solana"]
+        assert rows == new_rows
+
+
+def test_refreshes_prune_old_versions(mapping_dir, monkeypatch):
+    monkeypatch.setitem(
+        pipelines.app_config["mapping_artifact"], "keep_versions", 2)
+    for extra in ("a", "b", "c"):
+        _fetch_coin_maps(
+            monkeypatch, GECKO_ROWS, CMC_ROWS + [CoinMapping(
+                extra.upper(), extra, extra)])
+        version = pipelines.refresh_coin_mapping_pipeline(
+            CC_FETCHER)["version"]
+    artifacts = sorted(
+        path.name for path in mapping_dir.glob("coin_mapping_*.sqlite3"))
+    assert len(artifacts) == 2
+    assert artifacts[-1] == f"coin_mapping_{version}.sqlite3"
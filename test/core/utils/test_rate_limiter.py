@@ -0,0 +1,158 @@
+import asyncio
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+import app.core.utils.rate_limiter as rate_limiter
+from app.core.utils.rate_limiter import TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    """time.time/monotonic that only move when the code under test sleeps."""
+    def __init__(self):
+        self.now = 1_700_000_000.0
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float):
+        self.sleep(seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(
+        time=clock.time, monotonic=clock.monotonic, sleep=clock.sleep))
+    monkeypatch.setattr(rate_limiter, "asyncio", SimpleNamespace(
+        sleep=clock.async_sleep))
+    return clock
+
+
+def test_burst_is_available_at_once(clock):
+    bucket = TokenBucket("test", rate=1, burst=3)
+    for _ in range(3):
+        assert bucket.acquire()
+    assert clock.sleeps == []
+
+
+def test_refill_at_rate(clock):
+    bucket = TokenBucket("test", rate=2, burst=2)
+    bucket.acquire(tokens=2)
+    assert bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+    clock.now += 0.25
+    assert bucket.acquire()
+    assert clock.sleeps[-1] == pytest.approx(0.25)
+
+
+def test_refill_is_capped_at_burst(clock):
+    bucket = TokenBucket("test", rate=10, burst=2)
+    bucket.acquire(tokens=2)
+    clock.now += 60
+    assert bucket.acquire(tokens=2)
+    assert bucket.acquire(timeout=0) is False
+
+
+def test_acquire_timeout_takes_no_tokens(clock):
+    bucket = TokenBucket("test", rate=1, burst=1)
+    bucket.acquire()
+    assert bucket.acquire(timeout=0.5) is False
+    assert clock.sleeps == []
+    clock.now += 1
+    assert bucket.acquire(timeout=0)
+
+
+def test_acquire_async_waits_on_the_loop(clock):
+    bucket = TokenBucket("test", rate=4, burst=1)
+
+    async def acquire_twice():
+        return [await bucket.acquire_async(), await bucket.acquire_async()]
+
+    assert asyncio.run(acquire_twice()) == [True, True]
+    assert clock.sleeps == [pytest.approx(0.25)]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("120", 120.0),
+    ("1.5", 1.5),
+    ("-3", 0.0),
+    ("soon", None),
+    (None, None),
+])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date(clock):
+    value = formatdate(clock.now + 90, usegmt=True)
+    assert parse_retry_after(value) == pytest.approx(90)
+
+
+@pytest.mark.parametrize("status_code, headers, expected", [
+    (200, {}, None),
+    (429, {}, 30),
+    (429, {"Retry-After": "12"}, 12),
+    (503, {"retry-after": "7"}, 7),
+    (200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "20"}, 20),
+    (200, {"x-ratelimit-remaining": "0.4", "x-ratelimit-reset": "5"}, 5),
+    (200, {"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": "20"}, None),
+    (200, {"X-RateLimit-Remaining": "0"}, None),
+])
+def test_record_response_backoff(clock, status_code, headers, expected):
+    bucket = TokenBucket("test", rate=1, burst=5, default_retry_after=30)
+    assert bucket.record_response(status_code, headers) == expected
+
+
+def test_record_response_epoch_reset(clock):
+    bucket = TokenBucket("test", rate=1, burst=5)
+    backoff = bucket.record_response(200, {
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset": str(clock.now + 40)})
+    assert backoff == pytest.approx(40)
+
+
+def test_backoff_blocks_the_bucket(clock):
+    bucket = TokenBucket("test", rate=1, burst=5)
+    bucket.record_response(429, {"Retry-After": "10"})
+    assert bucket.acquire(timeout=5) is False
+    assert bucket.acquire()
+    assert clock.sleeps == [pytest.approx(10)]
+
+
+def test_lock_path_shares_state_between_buckets(clock, tmp_path):
+    lock_path = str(tmp_path / "locks" / "test.bucket")
+    first = TokenBucket("test", rate=1, burst=2, lock_path=lock_path)
+    second = TokenBucket("test", rate=1, burst=2, lock_path=lock_path)
+    assert first.acquire()
+    assert second.acquire()
+    assert first.acquire(timeout=0) is False
+    assert second.acquire(timeout=0) is False
+
+    first.record_response(429, {"Retry-After": "30"})
+    clock.now += 10
+    assert second.acquire(timeout=10) is False
+
+
+def test_corrupt_lock_file_starts_a_full_bucket(clock, tmp_path):
+    lock_path = tmp_path / "test.bucket"
+    lock_path.write_text("not json")
+    bucket = TokenBucket("test", rate=1, burst=2, lock_path=str(lock_path))
+    assert bucket.acquire(tokens=2)
+    assert bucket.acquire(timeout=0) is False
+
+
+def test_get_rate_limiter_is_per_provider():
+    assert rate_limiter.get_rate_limiter("reddit") is \
+        rate_limiter.get_rate_limiter("reddit")
+    with pytest.raises(ValueError):
+        rate_limiter.get_rate_limiter("unknown")